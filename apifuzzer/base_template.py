@@ -1,8 +1,34 @@
+from base64 import b64encode, b64decode
+
 from kitty.core import KittyException
 from kitty.model import Static, Template, Container
 
+from apifuzzer.custom_fuzzers import (
+    RandomBitsField,
+    Utf8Chars,
+    UnicodeStrings,
+    APIFuzzerGroup,
+)
 from apifuzzer.utils import get_logger
 
+FIELD_TYPES = {
+    field_type.__name__: field_type
+    for field_type in (RandomBitsField, Utf8Chars, UnicodeStrings, APIFuzzerGroup)
+}
+FIELD_PLACES = ["params", "headers", "data", "path_variables", "cookies", "query"]
+
+
+def _encode_value(value):
+    if isinstance(value, bytes):
+        return {"base64": b64encode(value).decode()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "base64" in value:
+        return b64decode(value["base64"])
+    return value
+
 
 class BaseTemplate(object):
     def __init__(self, name):
@@ -48,7 +74,7 @@ class BaseTemplate(object):
         total = 0
         for field in self.field_to_param.values():
             total += len(field)
-        self.logger.info(f"Template size: {total}, content: {self.field_to_param}")
+        self.logger.debug("Template %s size: %d", self.name, total)
         return total
 
     def compile_template(self):
@@ -58,7 +84,9 @@ class BaseTemplate(object):
         for name, field in self.field_to_param.items():
             if list(field):
                 try:
-                    template.append_fields([Container(name=name, fields=field)])
+                    # fields are ordered by name, so the test indexes mean the same in every process
+                    fields = sorted(field, key=lambda _field: _field.get_name())
+                    template.append_fields([Container(name=name, fields=fields)])
                 except KittyException as e:
                     self.logger.warning(
                         "Failed to add {} because {}, continue processing...".format(
@@ -67,5 +95,64 @@ class BaseTemplate(object):
                     )
         return template
 
+    def num_mutations(self):
+        """
+        :return: number of mutations of the compiled template, counted without compiling it
+        :rtype: int
+        """
+        total = 0
+        for place in FIELD_PLACES:
+            fields = self.field_to_param[place]
+            # compile_template leaves out the places with fields of the same name
+            if len({field.get_name() for field in fields}) == len(fields):
+                total += sum(field.num_mutations() for field in fields)
+        return total
+
     def get_content_type(self):
         return self.content_type
+
+    def to_dict(self):
+        """
+        Describes the template with JSON serializable data, the fields are listed with their constructor parameters
+        :rtype: dict
+        """
+        fields = dict()
+        for place in FIELD_PLACES:
+            fields[place] = list()
+            for field in sorted(self.field_to_param[place], key=lambda _field: _field.get_name()):
+                field_dict = {
+                    "type": type(field).__name__,
+                    "name": field.get_name(),
+                    "value": _encode_value(field.value),
+                }
+                if getattr(field, "seed", None) is not None:
+                    field_dict["seed"] = field.seed
+                fields[place].append(field_dict)
+        return {
+            "name": self.name,
+            "url": self.url,
+            "method": self.method,
+            "content_type": self.content_type,
+            "fields": fields,
+        }
+
+    @classmethod
+    def from_dict(cls, template_dict):
+        """
+        Creates the template from the description made by to_dict
+        :type template_dict: dict
+        :rtype: BaseTemplate
+        """
+        template = cls(name=template_dict["name"])
+        template.url = template_dict["url"]
+        template.method = template_dict["method"]
+        template.content_type = template_dict["content_type"]
+        for place, fields in template_dict["fields"].items():
+            for field in fields:
+                kwargs = {"seed": field["seed"]} if "seed" in field else {}
+                template.field_to_param[place].add(
+                    FIELD_TYPES[field["type"]](
+                        name=field["name"], value=_decode_value(field["value"]), **kwargs
+                    )
+                )
+        return template
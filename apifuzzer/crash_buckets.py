@@ -0,0 +1,129 @@
+import hashlib
+import json
+import re
+
+from apifuzzer.utils import get_logger
+
+# tokens which differ between the responses of the same failure, replaced before the signature is computed
+VOLATILE_TOKENS = [
+    (re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"), "<uuid>"),
+    (
+        re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"),
+        "<timestamp>",
+    ),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b|\b(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}\b"), "<hex>"),
+    (re.compile(r"\d+(?:\.\d+)?"), "<n>"),
+    # error messages often quote the fuzz value, long values may be cut off before the closing quote
+    (re.compile(r"'[^'\n]*'?"), "'<str>'"),
+]
+
+
+def normalize_response(response, max_length=4096):
+    """
+    Masks the volatile tokens of the response body, like ids, timestamps and the quoted values
+    :param response: response body from the report
+    :type response: str
+    :param max_length: only the beginning of longer responses is used
+    :type max_length: int
+    :rtype: str
+    """
+    if not response:
+        return ""
+    if isinstance(response, bytes):
+        response = response.decode(errors="replace")
+    response = response[:max_length]
+    for pattern, replacement in VOLATILE_TOKENS:
+        response = pattern.sub(replacement, response)
+    return response
+
+
+def report_signature(report):
+    """
+    :param report: report in dictionary format
+    :type report: dict
+    :return: status code, template name and the normalized response (or exception if the request was not sent)
+    :rtype: tuple
+    """
+    status_code = report.get("status_code")
+    body = report.get("response") if status_code else report.get("exception") or report.get("reason")
+    return status_code, report.get("template"), normalize_response(body if isinstance(body, str) else "")
+
+
+class CrashBucket(object):
+    def __init__(self, bucket_id, signature, test_number):
+        self.bucket_id = bucket_id
+        self.status_code, self.template, self.response = signature
+        self.first_test = test_number
+        self.count = 0
+        self.saved = 0
+
+    def to_dict(self):
+        return {
+            "bucket": self.bucket_id,
+            "status_code": self.status_code,
+            "template": self.template,
+            "first_test": self.first_test,
+            "count": self.count,
+            "saved": self.saved,
+            "response": self.response[:200],
+        }
+
+
+class CrashBuckets(object):
+    """
+    Groups the failed tests by the signature of their response. The full report is kept for the first few members of
+    a bucket, the rest are only counted.
+    """
+
+    def __init__(self, max_reports=10):
+        """
+        :param max_reports: number of full reports saved per bucket
+        :type max_reports: int
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.max_reports = max_reports
+        self.buckets = dict()
+
+    def add(self, test_number, report):
+        """
+        Registers the failed test in its bucket
+        :param test_number: number of the test
+        :type test_number: int
+        :param report: report in dictionary format
+        :type report: dict
+        :return: the bucket and whether the full report has to be saved
+        :rtype: tuple
+        """
+        signature = report_signature(report)
+        bucket = self.buckets.get(signature)
+        if bucket is None:
+            bucket_id = hashlib.sha1(json.dumps(signature).encode()).hexdigest()[:12]  # nosec: not for security
+            bucket = self.buckets[signature] = CrashBucket(bucket_id, signature, test_number)
+        bucket.count += 1
+        keep = bucket.saved < self.max_reports
+        if keep:
+            bucket.saved += 1
+        return bucket, keep
+
+    def summary(self):
+        """
+        :return: the buckets, the largest first
+        :rtype: list of dicts
+        """
+        return [bucket.to_dict() for bucket in sorted(self.buckets.values(), key=lambda b: (-b.count, b.first_test))]
+
+    def log_summary(self):
+        if not self.buckets:
+            return
+        summary = self.summary()
+        suppressed = sum(bucket["count"] - bucket["saved"] for bucket in summary)
+        self.logger.warning(
+            "%d failed tests in %d buckets, %d reports were not saved",
+            sum(bucket["count"] for bucket in summary), len(summary), suppressed,
+        )
+        for bucket in summary:
+            self.logger.warning(
+                "Bucket %s: %d tests (first: %d), status code: %s, template: %s, response: %r",
+                bucket["bucket"], bucket["count"], bucket["first_test"], bucket["status_code"], bucket["template"],
+                bucket["response"],
+            )
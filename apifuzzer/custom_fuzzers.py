@@ -1,3 +1,5 @@
+from random import Random
+
 import six
 from bitstring import Bits
 from kitty.core import kassert
@@ -6,9 +8,157 @@ from kitty.model.low_level.encoder import ENC_BITS_DEFAULT, strToBytes
 
 from apifuzzer.utils import secure_randint, get_logger
 
+# the outputs of the random generator are drawn in batches of this many 32-bit words
+RANDOM_WORD_BATCH = 256
+_utf8_chars = None
+_batched_randint = None
+
+
+def _utf8_offset(code_point):
+    """
+    :return: offset of the code point in the UTF-8 encoded table of all code points except the surrogates
+    :rtype: int
+    """
+    code_point = min(max(code_point, 0), Utf8Chars.MAX + 1)
+    if code_point <= 0x80:
+        return code_point
+    if code_point <= 0x800:
+        return 0x80 + (code_point - 0x80) * 2
+    if code_point <= 0xD800:
+        return 0x80 + 0x780 * 2 + (code_point - 0x800) * 3
+    # the surrogates (U+D800-U+DFFF) can't be encoded to UTF-8
+    if code_point <= 0xE000:
+        return 0x80 + 0x780 * 2 + 0xD000 * 3
+    if code_point <= 0x10000:
+        return 0x80 + 0x780 * 2 + 0xD000 * 3 + (code_point - 0xE000) * 3
+    return 0x80 + 0x780 * 2 + 0xF000 * 3 + (code_point - 0x10000) * 4
+
+
+def utf8_chars(start, stop):
+    """
+    :return: UTF-8 encoded characters of the code points from start to stop (exclusive), the surrogates and the code
+     points above Utf8Chars.MAX are left out
+    :rtype: bytes
+    """
+    global _utf8_chars
+    if _utf8_chars is None:
+        # about 4 MB, built when the first Utf8Chars field is mutated
+        _utf8_chars = (
+            "".join(map(chr, range(0xD800))) + "".join(map(chr, range(0xE000, Utf8Chars.MAX + 1)))
+        ).encode()
+    return _utf8_chars[_utf8_offset(start):_utf8_offset(stop)]
+
+
+class RandomStream(object):
+    """
+    Outputs of a random generator drawn in batches and consumed the same way as Random.randint calls would consume
+    them: randint(a, b) takes 32-bit words until the top bits of one are below b - a + 1.
+    """
+
+    # top byte of the word -> 1 if randint(0, 255) accepts the word
+    _ACCEPTED = bytes(int(byte < 0x80) for byte in range(0x100))
+    # top bytes of the words rejected by randint(0, 255)
+    _REJECTED = bytes(range(0x80, 0x100))
+    # the value is the top byte shifted by one and the highest bit of the byte below it
+    _SHIFTED = bytes((byte << 1) & 0xFF for byte in range(0x100))
+    _HIGHEST_BIT = bytes(byte >> 7 for byte in range(0x100))
+    _REJECTED_BIT = bytes(byte & 0x80 for byte in range(0x100))
+
+    def __init__(self, random):
+        """
+        :type random: Random
+        """
+        self.random = random
+        # little-endian 32-bit words, the ones before position are consumed
+        self.words = b""
+        self.position = 0
+
+    def _fill(self, count):
+        """
+        Draws a new batch if less than count words are left
+        """
+        left = len(self.words) // 4 - self.position
+        if left < count:
+            batch = max(count - left, RANDOM_WORD_BATCH)
+            self.words = self.words[self.position * 4:] + self.random.getrandbits(32 * batch).to_bytes(
+                4 * batch, "little"
+            )
+            self.position = 0
+
+    def randbelow(self, n):
+        """
+        :return: the same value as Random.randrange(n)
+        :rtype: int
+        """
+        shift = 32 - n.bit_length()
+        while True:
+            self._fill(1)
+            offset = self.position * 4
+            self.position += 1
+            value = int.from_bytes(self.words[offset:offset + 4], "little") >> shift
+            if value < n:
+                return value
+
+    def randbytes(self, count):
+        """
+        :return: the same bytes as count Random.randint(0, 255) calls
+        :rtype: bytes
+        """
+        if count <= 2:
+            # slicing the batch costs more than taking a few words one by one
+            return bytes([self.randbelow(0x100) for _ in range(count)])
+        result = b""
+        while len(result) < count:
+            needed = count - len(result)
+            # about half of the words are rejected
+            window = 2 * needed + 16
+            self._fill(window)
+            offset = self.position * 4
+            top = self.words[offset + 3:offset + 4 * window:4]
+            low = self.words[offset + 2:offset + 4 * window:4]
+            accepted = top.translate(self._ACCEPTED)
+            if accepted.count(1) >= needed:
+                # the words after the last needed one are left for the next calls
+                end = needed
+                found = accepted.count(1, 0, end)
+                while found < needed:
+                    step = needed - found
+                    found += accepted.count(1, end, end + step)
+                    end += step
+                top, low = top[:end], low[:end]
+            # the highest bits of the accepted words, the rejected ones are marked with 0x80 and removed
+            highest_bits = int.from_bytes(top.translate(self._REJECTED_BIT), "little") | int.from_bytes(
+                low.translate(self._HIGHEST_BIT), "little"
+            )
+            highest_bits = highest_bits.to_bytes(len(top), "little").translate(None, b"\x80\x81")
+            values = int.from_bytes(top.translate(self._SHIFTED, self._REJECTED), "little") | int.from_bytes(
+                highest_bits, "little"
+            )
+            result += values.to_bytes(len(highest_bits), "little")
+            self.position += len(top)
+        return result
+
+
+def batched_randint_supported():
+    """
+    RandomStream relies on how Random.randint uses the outputs of the generator, it is compared once to the randint of
+    the interpreter
+    :rtype: bool
+    """
+    global _batched_randint
+    if _batched_randint is None:
+        expected, stream = Random(1235), RandomStream(Random(1235))
+        _batched_randint = all(
+            expected.randint(0, maximum) == stream.randbelow(maximum + 1)
+            and bytes(expected.randint(0, 255) for _ in range(count)) == stream.randbytes(count)
+            for maximum, count in ((0, 1), (1, 3), (7, 100), (100, 7), (255, 1000), (5000, 64), (2 ** 31, 2))
+        )
+    return _batched_randint
+
 
 class APIFuzzerGroup(Group):
     def __init__(self, name, value):
+        self.value = value
         super().__init__(values=value, name=name, fuzzable=True)
 
     @staticmethod
@@ -41,7 +191,13 @@ class Utf8Chars(BaseField):
         min_length=20,
         max_length=None,
         num_mutations=80,
+        seed=None,
     ):
+        """
+        :param seed: seed of the positions and lengths of the mutations (--seed option), the mutations are repeated
+            after reset if it is set. SystemRandom is used if not set.
+        :type seed: int
+        """
         super(BaseField, self).__init__(name=name)  # pylint: disable=E1003
         self.logger = self.logger = get_logger(self.__class__.__name__)
         self.name = name
@@ -49,6 +205,8 @@ class Utf8Chars(BaseField):
         self.min_length = min_length
         self.max_length = max_length if max_length else len(value) * 2
         self._num_mutations = num_mutations
+        self.seed = seed
+        self._random = Random(seed) if seed is not None else None
         self.position = self.init_position()
         self._initialized = False
         self._default_value = self.to_bits(chr(self.MAX))
@@ -60,7 +218,13 @@ class Utf8Chars(BaseField):
         self._controlled = False
 
     def init_position(self):
-        return secure_randint(0, self.MAX)
+        return secure_randint(0, self.MAX, self._random)
+
+    def reset(self):
+        super(Utf8Chars, self).reset()
+        if self.seed is not None:
+            self._random.seed(self.seed)
+            self.position = self.init_position()
 
     @staticmethod
     def str_to_bytes(value):
@@ -79,11 +243,10 @@ class Utf8Chars(BaseField):
         return Bits(self.str_to_bytes(val))
 
     def _mutate(self):
-        current_value = list()
-        current_mutation_length = secure_randint(self.min_length, self.max_length)
-        for st in range(self.position, self.position + current_mutation_length):
-            current_value.append(chr(st))
-        self._current_value = self.to_bits("".join(current_value))
+        current_mutation_length = secure_randint(self.min_length, self.max_length, self._random)
+        # slice of the precomputed table instead of encoding the characters one by one, the surrogates and the code
+        # points above MAX are left out as they can't be encoded
+        self._current_value = self.to_bits(utf8_chars(self.position, self.position + current_mutation_length))
         self.position += current_mutation_length
         if self.position > self.MAX:
             self.position = self.init_position()
@@ -106,19 +269,46 @@ class RandomBitsField(RandomBits):
         _ = func_name
         pass
 
-    def __init__(self, value, name, fuzzable=True):
+    def __init__(self, value, name, fuzzable=True, seed=None):
+        """
+        :param seed: seed of the generator (--seed option), the default seed of RandomBits is used if not set
+        :type seed: int
+        """
         self.name = name
         self.value = value
+        self.seed = seed
         super(RandomBitsField, self).__init__(
             name=name,
             value=value,
             min_length=0,
             max_length=len(value) * 2,
+            seed=seed if seed is not None else 1235,
             fuzzable=fuzzable,
             num_mutations=80,
         )
+        self._random_stream = None
+
+    def reset(self):
+        super(RandomBitsField, self).reset()
+        # the generator is seeded again, the words drawn before are dropped
+        self._random_stream = None
 
     def _mutate(self):
+        """
+        Generates the same values as RandomBits, but the outputs of the generator are drawn in batches instead of a
+        randint call per byte
+        """
+        if not batched_randint_supported() or (self._max_length - self._min_length).bit_length() > 32:
+            return self._mutate_per_byte()
+        if self._random_stream is None:
+            self._random_stream = RandomStream(self._random)
+        if self._step:
+            length = self._min_length + self._step * self._current_index
+        else:
+            length = self._min_length + self._random_stream.randbelow(self._max_length - self._min_length + 1)
+        self._current_value = Bits(bytes=self._random_stream.randbytes(length // 8 + 1), length=length)
+
+    def _mutate_per_byte(self):
         if self._step:
             length = self._min_length + self._step * self._current_index
         else:
@@ -135,6 +325,10 @@ class RandomBitsField(RandomBits):
         return f"{self.name}->{self.value}"
 
 
+# fields which take the seed of the --seed option
+SEEDED_FIELD_TYPES = (Utf8Chars, RandomBitsField)
+
+
 class UnicodeStrings(String):
     def __init__(
         self,
@@ -0,0 +1,443 @@
+"""
+Coordinator / worker mode: the coordinator parses the API definition once and hands out test index ranges of the
+model to any number of workers over a small JSON over HTTP protocol. The workers send the reports back in batches
+while the range is fuzzed, work leased by a worker which stopped responding is given to another one.
+
+Endpoints of the coordinator:
+    GET  /job        templates, base url and request headers to build the same model as the coordinator
+    POST /lease      next work unit: {"unit": {"id", "first_test", "last_test", "env_test"} or null, "done": bool}
+    POST /heartbeat  extends the lease of the unit: {"valid": false} if the unit is not leased to the worker anymore
+    POST /reports    reports of the unit saved so far: {"unit_id", "worker", "reports": {name: base64 content}}
+    POST /complete   rest of the reports of the unit: {"unit_id", "worker", "failed", "reports", "junit", "profile"}
+"""
+import base64
+import json
+import math
+import multiprocessing
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from kitty.interfaces.base import EmptyInterface
+
+from apifuzzer.base_template import BaseTemplate
+from apifuzzer.report_store import merge_report_stores
+from apifuzzer.sharding import split_test_range, merge_junit_reports
+from apifuzzer.utils import get_logger
+
+# maximum number of reports sent in one request while the unit is fuzzed
+REPORT_BATCH_SIZE = 500
+
+
+def parse_address(address):
+    """
+    :param address: host:port
+    :type address: str
+    :rtype: tuple
+    """
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class WorkUnit(object):
+    def __init__(self, unit_id, first_test, last_test):
+        self.unit_id = unit_id
+        self.first_test = first_test
+        self.last_test = last_test
+        self.worker = None
+        self.lease_deadline = None
+        self.attempts = 0
+
+    def to_dict(self):
+        return {
+            "id": self.unit_id,
+            "first_test": self.first_test,
+            "last_test": self.last_test,
+            "env_test": self.first_test == 0,
+        }
+
+
+class Coordinator(object):
+    """
+    Distributes the tests of a prepared Fuzzer between the workers and collects their reports
+    """
+
+    def __init__(self, fuzzer, address, chunk_size=100, lease_timeout=60, max_attempts=3):
+        """
+        :param fuzzer: Fuzzer which already prepared the templates
+        :type fuzzer: apifuzzer.fuzzer.Fuzzer
+        :param address: host:port to listen on
+        :type address: str
+        :param chunk_size: number of tests in a work unit
+        :type chunk_size: int
+        :param lease_timeout: seconds without heartbeat after the unit is given to another worker
+        :type lease_timeout: float
+        :param max_attempts: the unit is given up after it was leased this many times without completion
+        :type max_attempts: int
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.fuzzer = fuzzer
+        self.address = parse_address(address)
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._work_dir = tempfile.mkdtemp(prefix="apifuzzer_coordinator_")
+        self.job = {
+            "base_url": fuzzer.base_url,
+            "auth_headers": fuzzer.auth_headers,
+            "junit": bool(fuzzer.junit_report_path),
+            "report_format": fuzzer.report_format,
+            "bucket_reports": fuzzer.bucket_reports,
+            "seed": fuzzer.seed,
+            "profile_file": fuzzer.profile_file,
+            "templates": [template.to_dict() for template in fuzzer.templates],
+        }
+        total = fuzzer._build_model().num_mutations()
+        self.units = [
+            WorkUnit(unit_id, first_test, last_test)
+            for unit_id, (first_test, last_test) in enumerate(
+                split_test_range(total, max(1, math.ceil(total / chunk_size)))
+            )
+        ]
+        self._queue = deque(self.units)
+        self._leased = dict()
+        self._completed = set()
+        self.logger.info("%d tests split to %d work units", total, len(self.units))
+        self.server = ThreadingHTTPServer(self.address, self._handler_class())
+
+    def _handler_class(self):
+        coordinator = self
+
+        class CoordinatorRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/job":
+                    self._send(coordinator.job)
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                handlers = {
+                    "/lease": coordinator.lease,
+                    "/heartbeat": coordinator.heartbeat,
+                    "/reports": coordinator.reports,
+                    "/complete": coordinator.complete,
+                }
+                if self.path not in handlers:
+                    self.send_error(404)
+                    return
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self._send(handlers[self.path](json.loads(body or b"{}")))
+
+            def _send(self, data):
+                body = json.dumps(data).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # pylint: disable=W0622
+                coordinator.logger.debug(format, *args)
+
+        return CoordinatorRequestHandler
+
+    def _requeue_expired_leases(self):
+        now = time.time()
+        for unit in list(self._leased.values()):
+            if unit.lease_deadline < now:
+                self.logger.warning(
+                    "Lease of unit %d expired on %s, re-queued", unit.unit_id, unit.worker
+                )
+                self._release(unit)
+
+    def _release(self, unit):
+        del self._leased[unit.unit_id]
+        unit.worker = None
+        if unit.attempts >= self.max_attempts:
+            self.logger.error(
+                "Unit %d (tests %d-%d) failed %d times, giving up",
+                unit.unit_id, unit.first_test, unit.last_test, unit.attempts,
+            )
+            self._unit_done(unit)
+        else:
+            self._queue.appendleft(unit)
+
+    def _unit_done(self, unit):
+        self._completed.add(unit.unit_id)
+        if len(self._completed) == len(self.units):
+            self._finished.set()
+
+    def lease(self, request):
+        with self._lock:
+            self._requeue_expired_leases()
+            if not self._queue:
+                return {"unit": None, "done": self._finished.is_set()}
+            unit = self._queue.popleft()
+            unit.worker = request.get("worker")
+            unit.lease_deadline = time.time() + self.lease_timeout
+            unit.attempts += 1
+            self._leased[unit.unit_id] = unit
+            # reports sent by an earlier worker of the unit
+            shutil.rmtree(self._unit_report_dir(unit), ignore_errors=True)
+            self.logger.info(
+                "Unit %d (tests %d-%d) leased to %s", unit.unit_id, unit.first_test, unit.last_test, unit.worker
+            )
+            return {"unit": unit.to_dict(), "done": False}
+
+    def heartbeat(self, request):
+        with self._lock:
+            unit = self._leased.get(request.get("unit_id"))
+            if unit is None or unit.worker != request.get("worker"):
+                return {"valid": False}
+            unit.lease_deadline = time.time() + self.lease_timeout
+            return {"valid": True}
+
+    def _leased_unit(self, request):
+        """
+        :return: the unit of the request if it is leased to the worker of the request, None otherwise
+        :rtype: WorkUnit
+        """
+        unit = self._leased.get(request.get("unit_id"))
+        if unit is None or unit.worker != request.get("worker"):
+            self.logger.warning(
+                "Ignoring result of unit %s from %s, it is not leased to it",
+                request.get("unit_id"), request.get("worker"),
+            )
+            return None
+        return unit
+
+    def _save_reports(self, unit, reports):
+        """
+        :param reports: report file name: base64 content
+        :type reports: dict
+        """
+        unit_report_dir = self._unit_report_dir(unit)
+        os.makedirs(unit_report_dir, exist_ok=True)
+        for report_name, report in reports.items():
+            with open(os.path.join(unit_report_dir, os.path.basename(report_name)), "wb") as f:
+                f.write(base64.b64decode(report))
+
+    def reports(self, request):
+        with self._lock:
+            unit = self._leased_unit(request)
+            if unit is None:
+                return {"accepted": False}
+            self._save_reports(unit, request.get("reports", {}))
+            return {"accepted": True}
+
+    def complete(self, request):
+        with self._lock:
+            unit = self._leased_unit(request)
+            if unit is None:
+                return {"accepted": False}
+            if request.get("failed"):
+                self.logger.warning("%s failed to process unit %d", unit.worker, unit.unit_id)
+                self._release(unit)
+                return {"accepted": True}
+            self._save_reports(unit, request.get("reports", {}))
+            if request.get("junit") is not None:
+                with open(self._unit_junit_path(unit), "w") as f:
+                    f.write(request["junit"])
+            if request.get("profile") is not None:
+                with open(self._unit_profile_path(unit), "w") as f:
+                    json.dump(request["profile"], f)
+            del self._leased[unit.unit_id]
+            self._unit_done(unit)
+            self.logger.info("Unit %d completed by %s", unit.unit_id, unit.worker)
+            return {"accepted": True}
+
+    def _unit_junit_path(self, unit):
+        return os.path.join(self._work_dir, f"{unit.unit_id}.xml")
+
+    def _unit_profile_path(self, unit):
+        return os.path.join(self._work_dir, f"{unit.unit_id}.profile.json")
+
+    def _unit_report_dir(self, unit):
+        return os.path.join(self._work_dir, str(unit.unit_id))
+
+    def run(self):
+        """
+        Serves the workers until all work units are completed, then merges the reports of the units
+        """
+        server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        server_thread.start()
+        self.logger.info("Coordinator listens on %s:%d", *self.server.server_address)
+        try:
+            while not self._finished.wait(timeout=1):
+                with self._lock:
+                    self._requeue_expired_leases()
+        finally:
+            self.server.shutdown()
+            self.server.server_close()
+        merge_report_stores(
+            [self._unit_report_dir(unit) for unit in self.units], self.fuzzer.report_dir, self.fuzzer.report_format
+        )
+        if self.fuzzer.junit_report_path:
+            merge_junit_reports(
+                [self._unit_junit_path(unit) for unit in self.units], self.fuzzer.junit_report_path
+            )
+        if self.fuzzer.profile_file:
+            self.fuzzer._merge_profiles([self._unit_profile_path(unit) for unit in self.units])
+        shutil.rmtree(self._work_dir, ignore_errors=True)
+
+
+class Worker(object):
+    """
+    Fetches work units from the coordinator, executes their tests and sends back the reports
+    """
+
+    def __init__(self, fuzzer, coordinator_address, poll_interval=1, heartbeat_interval=10):
+        """
+        :param fuzzer: Fuzzer which is not prepared, the templates are received from the coordinator
+        :type fuzzer: apifuzzer.fuzzer.Fuzzer
+        :param coordinator_address: host:port of the coordinator
+        :type coordinator_address: str
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.fuzzer = fuzzer
+        self.coordinator_url = "http://{}:{}".format(*parse_address(coordinator_address))
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.name = None
+        self.junit = False
+
+    def _call(self, path, data=None):
+        request = urllib.request.Request(
+            self.coordinator_url + path,
+            data=json.dumps(data).encode() if data is not None else None,
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=60) as response:  # nosec: url is set by the user
+            return json.loads(response.read())
+
+    def run(self):
+        self.name = f"{socket.gethostname()}-{os.getpid()}"
+        job = self._call("/job")
+        self.fuzzer.base_url = job["base_url"]
+        self.fuzzer.auth_headers = job["auth_headers"]
+        self.fuzzer.templates = [BaseTemplate.from_dict(template) for template in job["templates"]]
+        self.fuzzer.report_format = job["report_format"]
+        self.fuzzer.bucket_reports = job["bucket_reports"]
+        self.fuzzer.seed = job["seed"]
+        # the profiles of the units are merged and saved by the coordinator
+        self.fuzzer.profile_file = job["profile_file"]
+        self.junit = job["junit"]
+        while True:
+            try:
+                response = self._call("/lease", {"worker": self.name})
+            except urllib.error.URLError as e:
+                self.logger.info("Coordinator is not available (%s), stopping", e)
+                return
+            unit = response["unit"]
+            if unit is None:
+                if response["done"]:
+                    return
+                time.sleep(self.poll_interval)
+                continue
+            if not self._process(unit):
+                return
+
+    def _process(self, unit):
+        """
+        Fuzzes the tests of the unit in a child process, sends its reports in batches and keeps its lease alive.
+        The child process is stopped if the lease is lost or the coordinator is not available.
+        :return: False if the coordinator is not available
+        :rtype: bool
+        """
+        work_dir = tempfile.mkdtemp(prefix="apifuzzer_worker_")
+        report_dir = os.path.join(work_dir, "reports")
+        os.makedirs(report_dir)
+        junit_path = os.path.join(work_dir, "junit.xml") if self.junit else None
+        profile_path = os.path.join(work_dir, "profile.json") if self.fuzzer.profile_file else None
+        # each unit is fuzzed in a fresh process, so the model starts from the same state as on the coordinator
+        fuzz_process = multiprocessing.get_context("fork").Process(
+            target=self.fuzzer._fuzz,
+            kwargs=dict(
+                model=self.fuzzer._build_model(),
+                report_dir=report_dir,
+                junit_report_path=junit_path,
+                test_list="{}-{}".format(unit["first_test"], unit["last_test"]),
+                skip_env_test=not unit["env_test"],
+                interface=EmptyInterface(),
+                profile_path=profile_path,
+            ),
+        )
+        fuzz_process.start()
+        sent_reports = set()
+        try:
+            while fuzz_process.is_alive():
+                fuzz_process.join(timeout=self.heartbeat_interval)
+                if not fuzz_process.is_alive():
+                    break
+                if not self._call("/heartbeat", {"worker": self.name, "unit_id": unit["id"]})["valid"]:
+                    self.logger.warning("Lease of unit %d was lost, its tests are stopped", unit["id"])
+                    return True
+                self._send_report_batches(unit, report_dir, sent_reports)
+            result = {"worker": self.name, "unit_id": unit["id"], "failed": bool(fuzz_process.exitcode)}
+            if not result["failed"]:
+                result["reports"] = self._collect_reports(report_dir, sent_reports, finished=True)
+                if junit_path and os.path.exists(junit_path):
+                    with open(junit_path) as f:
+                        result["junit"] = f.read()
+                if profile_path and os.path.exists(profile_path):
+                    with open(profile_path) as f:
+                        result["profile"] = json.load(f)
+            self._call("/complete", result)
+            return True
+        except urllib.error.URLError as e:
+            self.logger.info("Coordinator is not available (%s), stopping", e)
+            return False
+        finally:
+            if fuzz_process.is_alive():
+                fuzz_process.terminate()
+            fuzz_process.join()
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _collect_reports(self, report_dir, sent_reports, finished):
+        """
+        :param sent_reports: names of the reports sent already, the collected ones are added
+        :type sent_reports: set
+        :param finished: True if the fuzzing of the unit is finished, otherwise only the complete report files of the
+                         file store are collected, the other stores are sent when the unit is finished
+        :type finished: bool
+        :return: report file name: base64 content
+        :rtype: dict
+        """
+        reports = dict()
+        if not finished and self.fuzzer.report_format != "files":
+            return reports
+        for report_name in sorted(os.listdir(report_dir)):
+            if report_name in sent_reports:
+                continue
+            # the report store may be binary (sqlite)
+            with open(os.path.join(report_dir, report_name), "rb") as f:
+                content = f.read()
+            if not finished:
+                if not report_name.endswith(".json"):
+                    continue
+                try:
+                    json.loads(content)
+                except ValueError:
+                    # the report is being written
+                    continue
+            reports[report_name] = base64.b64encode(content).decode()
+            sent_reports.add(report_name)
+        return reports
+
+    def _send_report_batches(self, unit, report_dir, sent_reports):
+        """
+        Sends the reports saved since the last batch to the coordinator
+        """
+        reports = self._collect_reports(report_dir, sent_reports, finished=False)
+        names = list(reports)
+        for start in range(0, len(names), REPORT_BATCH_SIZE):
+            batch = {name: reports[name] for name in names[start:start + REPORT_BATCH_SIZE]}
+            self._call("/reports", {"worker": self.name, "unit_id": unit["id"], "reports": batch})
@@ -1,3 +1,4 @@
+from kitty.core import khash
 from kitty.model import GraphModel
 
 
@@ -5,3 +6,116 @@ class APIFuzzerModel(GraphModel):
     def __init__(self, name="GraphModel", content_type=None):
         super().__init__(name)
         self.content_type = content_type
+
+
+class LazyTemplate(object):
+    """
+    Node of the model which compiles the kitty template when its tests are reached and releases it when they are
+    exhausted, so the kitty templates of the whole API are not built before the first request
+    """
+
+    def __init__(self, base_template):
+        """
+        :param base_template: template of the API resource
+        :type base_template: apifuzzer.base_template.BaseTemplate
+        """
+        self.base_template = base_template
+        self.name = base_template.name
+        self._template = None
+        self._num_mutations = None
+
+    @property
+    def template(self):
+        """
+        :return: the compiled kitty template
+        :rtype: kitty.model.Template
+        """
+        if self._template is None:
+            self._template = self.base_template.compile_template()
+            # the fields are shared with the previous models of the templates, which might have left them mutated
+            self._template.reset()
+        return self._template
+
+    def get_name(self):
+        return self.name
+
+    def hash(self):
+        return khash(self.name, self.num_mutations())
+
+    def num_mutations(self):
+        if self._num_mutations is None:
+            self._num_mutations = self.base_template.num_mutations()
+        return self._num_mutations
+
+    def reset(self):
+        """
+        Called by the model when the mutations of the template are exhausted or skipped
+        """
+        if self._template is not None:
+            self._template.reset()
+            self._template = None
+
+    def __getattr__(self, name):
+        if name in ("_template", "base_template"):
+            raise AttributeError(name)
+        return getattr(self.template, name)
+
+
+class CorpusTemplate(LazyTemplate):
+    """
+    Node of the model which serves the rendered tests and the structure of the template from the mutation corpus,
+    the kitty template is compiled only if something else is asked from it
+    """
+
+    def __init__(self, base_template, corpus):
+        """
+        :param base_template: template of the API resource
+        :type base_template: apifuzzer.base_template.BaseTemplate
+        :param corpus: corpus which contains the tests of the template
+        :type corpus: apifuzzer.mutation_corpus.MutationCorpus
+        """
+        super(CorpusTemplate, self).__init__(base_template)
+        self.corpus = corpus
+        # index of the current mutation, -1 is the unmodified template like at kitty templates
+        self._index = -1
+
+    def num_mutations(self):
+        return self.corpus.num_mutations(self.name)
+
+    def mutate(self):
+        if self._index + 1 >= self.num_mutations():
+            return False
+        self._index += 1
+        return True
+
+    def skip(self, count):
+        skipped = max(min(count, self.num_mutations() - 1 - self._index), 0)
+        self._index += skipped
+        return skipped
+
+    def reset(self):
+        super(CorpusTemplate, self).reset()
+        self._index = -1
+
+    def set_session_data(self, _session_data):
+        # the templates have no fields which depend on the session
+        pass
+
+    def payload(self):
+        """
+        :return: the rendered url, method and fields of the current test
+        :rtype: dict
+        """
+        return self.corpus.payload(self.name, self._index)
+
+    def get_info(self):
+        return self.corpus.info(self.name, self._index)
+
+    def get_structure(self):
+        """
+        Asked by the web interface at each test, only the mutation index of the template is current in it
+        :rtype: dict
+        """
+        structure = dict(self.corpus.structure(self.name))
+        structure["mutation"] = dict(structure["mutation"], current_index=self._index)
+        return structure
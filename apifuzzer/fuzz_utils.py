@@ -1,9 +1,5 @@
-import json
 import tempfile
 
-from ruamel.yaml import YAML
-from ruamel.yaml.scanner import ScannerError
-
 from apifuzzer.custom_fuzzers import (
     RandomBitsField,
     Utf8Chars,
@@ -11,6 +7,7 @@ from apifuzzer.custom_fuzzers import (
     APIFuzzerGroup,
 )
 from apifuzzer.exceptions import FailedToParseFileException
+from apifuzzer.spec_loader import parse_api_definition
 from apifuzzer.utils import download_file, secure_randint
 
 
@@ -35,7 +32,14 @@ def get_field_type_by_method(http_method):
     return fields.get(http_method, "data")
 
 
-def get_fuzz_type_by_param_type(fuzz_type):
+def get_fuzz_type_by_param_type(fuzz_type, rand=None):
+    """
+    :param fuzz_type: type or format of the parameter
+    :type fuzz_type: str
+    :param rand: seeded generator of the --seed option, SystemRandom is used if not set
+    :type rand: random.Random
+    :return: field class to fuzz the parameter with
+    """
     # https://kitty.readthedocs.io/en/latest/data_model/big_list_of_fields.html#atomic-fields
     # https://swagger.io/docs/specification/data-models/data-types/
     string_types = [UnicodeStrings, RandomBitsField, Utf8Chars]
@@ -58,7 +62,7 @@ def get_fuzz_type_by_param_type(fuzz_type):
         "enum": [APIFuzzerGroup],
     }
     fuzzer_list = types.get(fuzz_type, string_types)
-    return fuzzer_list[secure_randint(0, max(len(fuzzer_list) - 1, 1))]
+    return fuzzer_list[secure_randint(0, max(len(fuzzer_list) - 1, 1), rand)]
 
 
 def container_name_to_param(container_name):
@@ -72,21 +76,8 @@ def get_api_definition_from_file(src_file, logger=None):
         print_func = print
     try:
         with open(src_file, mode="rb") as f:
-            api_definition = f.read()
-        # try loading as JSON first, then YAML
-        try:
-            return json.loads(api_definition.decode("utf-8"))
-        except ValueError as e:
-            print_func(
-                f"Failed to load input ({src_file}) as JSON because ({e}), maybe YAML?"
-            )
-        try:
-            yaml = YAML(typ="safe")
-            return yaml.load(api_definition.decode("utf-8"))
-        except (TypeError, ScannerError) as e:
-            print_func(f"Failed to load input ({src_file}) as YAML:{e}")
-            raise e
-    except (Exception, FileNotFoundError) as e:
+            return parse_api_definition(f.read())
+    except Exception as e:
         print_func(f"Failed to parse input file ({src_file}), because: ({e}) exit")
         raise FailedToParseFileException
 
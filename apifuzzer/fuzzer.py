@@ -1,10 +1,25 @@
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+
 from kitty.interfaces import WebInterface
+from kitty.interfaces.base import EmptyInterface
 
-from apifuzzer.fuzz_model import APIFuzzerModel
+from apifuzzer.fuzz_model import APIFuzzerModel, CorpusTemplate, LazyTemplate
 from apifuzzer.fuzzer_target.fuzz_request_sender import FuzzerTarget
+from apifuzzer.fuzzer_target.retry_policy import DEFAULT_RETRY_ERRORS
+from apifuzzer.metrics import FuzzMetrics, MetricsRegistry, MetricsServer, TextfileExporter, shard_path
+from apifuzzer.mutation_corpus import MutationCorpus
 from apifuzzer.openapi_template_generator import OpenAPITemplateGenerator
+from apifuzzer.phase_profiler import PhaseProfiler
+from apifuzzer.progress_interface import ProgressInterface
 from apifuzzer.server_fuzzer import OpenApiServerFuzzer
-from apifuzzer.utils import set_logger
+from apifuzzer.report_store import merge_report_stores
+from apifuzzer.sharding import split_test_range, merge_junit_reports
+from apifuzzer.spec_cache import SpecCache
+from apifuzzer.utils import set_logger, flush_logs
 from apifuzzer.version import get_version
 
 
@@ -21,6 +36,25 @@ class Fuzzer(object):
         api_definition_url=None,
         api_definition_file=None,
         junit_report_path=None,
+        fresh_connections=False,
+        concurrency=1,
+        workers=1,
+        max_rps=None,
+        target_latency=None,
+        max_retries=2,
+        retry_on=DEFAULT_RETRY_ERRORS,
+        report_format="files",
+        bucket_reports=None,
+        log_queue=False,
+        log_sample_rate=None,
+        spec_cache=True,
+        spec_cache_dir=None,
+        headless=False,
+        metrics_port=None,
+        metrics_file=None,
+        profile_file=None,
+        seed=None,
+        corpus_dir=None,
     ):
         self.base_url = None
         self.alternate_url = alternate_url
@@ -30,16 +64,36 @@ class Fuzzer(object):
         self.test_result_dst = test_result_dst
         self.auth_headers = auth_headers if auth_headers else {}
         self.junit_report_path = junit_report_path
-        self.logger = set_logger(log_level, basic_output)
+        self.logger = set_logger(log_level, basic_output, log_queue=log_queue, log_sample_rate=log_sample_rate)
         self.logger.info("%s initialized", get_version())
         self.api_definition_url = api_definition_url
         self.api_definition_file = api_definition_file
+        self.fresh_connections = fresh_connections
+        self.concurrency = concurrency
+        self.workers = workers
+        self.max_rps = max_rps
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.retry_on = retry_on
+        self.report_format = report_format
+        self.bucket_reports = bucket_reports
+        self.spec_cache = spec_cache
+        self.spec_cache_dir = spec_cache_dir
+        self.headless = headless
+        self.metrics_port = metrics_port
+        self.metrics_file = metrics_file
+        self.profile_file = profile_file
+        self.seed = seed
+        self.corpus_dir = corpus_dir
+        self._corpus = None
 
     def prepare(self):
         # here we will be able to branch the template generator if we will support other than Swagger / OpenAPI
         template_generator = OpenAPITemplateGenerator(
             api_definition_url=self.api_definition_url,
             api_definition_file=self.api_definition_file,
+            spec_cache=SpecCache(self.spec_cache_dir) if self.spec_cache else None,
+            seed=self.seed,
         )
         try:
             template_generator.process_api_resources()
@@ -50,21 +104,199 @@ class Fuzzer(object):
         self.base_url = template_generator.compile_base_url(self.alternate_url)
 
     def run(self):
+        model = self._build_model()
+        try:
+            if self.workers > 1:
+                self._run_shards(model)
+            else:
+                self._fuzz(model, report_dir=self.report_dir, junit_report_path=self.junit_report_path)
+        finally:
+            self._close_corpus()
+
+    def _build_model(self):
+        model = APIFuzzerModel()
+        corpus = self._load_corpus()
+        for template in self.templates:
+            if corpus is not None:
+                model.connect(CorpusTemplate(template, corpus))
+            else:
+                # the kitty templates are compiled when the fuzzer reaches them
+                model.connect(LazyTemplate(template))
+            model.content_type = template.get_content_type()
+        return model
+
+    def _load_corpus(self):
+        """
+        :return: the mutation corpus of the templates, it is built at the first run. None if it is not used.
+        :rtype: MutationCorpus
+        """
+        if not self.corpus_dir:
+            return None
+        if self.seed is None:
+            self.logger.warning("The mutation corpus is not used without --seed, the tests differ in each run")
+            return None
+        if self._corpus is None:
+            self._corpus = MutationCorpus.load_or_build(self.corpus_dir, self.templates, self.seed)
+        return self._corpus
+
+    def _close_corpus(self):
+        """
+        Unmaps the mutation corpus, the forked shards and distributed units close their own copy of it
+        """
+        if self._corpus is not None:
+            self._corpus.close()
+            self._corpus = None
+
+    def _fuzz(
+        self,
+        model,
+        report_dir,
+        junit_report_path,
+        test_list=None,
+        skip_env_test=False,
+        interface=None,
+        shard=None,
+        profile_path=None,
+    ):
+        """
+        Runs the tests of the model
+        :param test_list: kitty test list like "0-99", all tests are executed if not set
+        :type test_list: str
+        :param skip_env_test: don't send the unmodified request before the tests
+        :type skip_env_test: bool
+        :param interface: kitty user interface, WebInterface or in headless mode ProgressInterface is used if not set
+        :param shard: index of the shard, its metrics are labeled and exported on their own port and file
+        :type shard: int
+        :param profile_path: the profile is saved to this file without printing it, the shards and the distributed
+                             units save it for the process which merges their profiles
+        :type profile_path: str
+        """
+        metrics = FuzzMetrics(MetricsRegistry(const_labels={"shard": shard} if shard is not None else None))
+        profiler = PhaseProfiler() if self.profile_file else None
         target = FuzzerTarget(
             name="target",
             base_url=self.base_url,
-            report_dir=self.report_dir,
+            report_dir=report_dir,
             auth_headers=self.auth_headers,
-            junit_report_path=self.junit_report_path,
+            junit_report_path=junit_report_path,
+            fresh_connections=self.fresh_connections,
+            max_rps=self.max_rps,
+            target_latency=self.target_latency,
+            concurrency=self.concurrency,
+            max_retries=self.max_retries,
+            retry_on=self.retry_on,
+            report_format=self.report_format,
+            bucket_reports=self.bucket_reports,
+            metrics=metrics,
+            profiler=profiler,
+            seed=self.seed,
         )
-        interface = WebInterface()
-        model = APIFuzzerModel()
-        for template in self.templates:
-            model.connect(template.compile_template())
-            model.content_type = template.get_content_type()
-        fuzzer = OpenApiServerFuzzer()
+        fuzzer = OpenApiServerFuzzer(concurrency=self.concurrency, profiler=profiler)
         fuzzer.set_model(model)
         fuzzer.set_target(target)
+        if interface is None:
+            interface = ProgressInterface() if self.headless else WebInterface()
         fuzzer.set_interface(interface)
-        fuzzer.start()
-        fuzzer.stop()
+        if test_list:
+            fuzzer.set_test_list(test_list)
+        fuzzer.set_skip_env_test(skip_env_test)
+        exporters = self._start_metrics_exporters(metrics.registry, shard)
+        try:
+            if profiler is not None:
+                profiler.start()
+            fuzzer.start()
+            fuzzer.stop()
+        finally:
+            for exporter in exporters:
+                exporter.stop()
+            if profiler is not None:
+                profiler.stop()
+                if profile_path is None:
+                    self._report_profile(profiler)
+                else:
+                    profiler.write(profile_path)
+            self._close_corpus()
+            # shards and distributed units run in forked processes which exit without the atexit handlers
+            flush_logs()
+
+    def _start_metrics_exporters(self, registry, shard=None):
+        """
+        Starts the /metrics endpoint and the textfile exporter if they are configured, the shards listen on the
+        following ports and write to their own file
+        :rtype: list
+        """
+        exporters = list()
+        if self.metrics_port is not None:
+            port = self.metrics_port + shard if self.metrics_port and shard is not None else self.metrics_port
+            exporters.append(MetricsServer(registry, port).start())
+        if self.metrics_file:
+            path = shard_path(self.metrics_file, shard) if shard is not None else self.metrics_file
+            exporters.append(TextfileExporter(registry, path).start())
+        return exporters
+
+    def _report_profile(self, profiler):
+        """
+        Prints the time spent in the phases of the tests and saves it to the profile file
+        :type profiler: PhaseProfiler
+        """
+        print(profiler.format_table())
+        profiler.write(self.profile_file)
+        print(f"Profile saved to {self.profile_file}")
+
+    def _merge_profiles(self, paths):
+        """
+        Reports the profiles of the shards or of the distributed units as one and removes them
+        :type paths: list of str
+        """
+        profiler = PhaseProfiler()
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path) as f:
+                profiler.merge(json.load(f))
+            os.remove(path)
+        self._report_profile(profiler)
+
+    def _run_shards(self, model):
+        """
+        Splits the tests of the model between worker processes and merges their reports like they were executed by
+        a single process. Workers are forked after the model is built, so all of them fuzz the same templates.
+        """
+        shard_dir = tempfile.mkdtemp(prefix="apifuzzer_shards_")
+        context = multiprocessing.get_context("fork")
+        workers = list()
+        for index, (first_test, last_test) in enumerate(
+            split_test_range(model.num_mutations(), self.workers)
+        ):
+            shard_report_dir = os.path.join(shard_dir, str(index))
+            os.makedirs(shard_report_dir)
+            shard_junit_path = os.path.join(shard_dir, f"{index}.xml") if self.junit_report_path else None
+            worker = context.Process(
+                target=self._fuzz,
+                name=f"APIFuzzer-worker-{index}",
+                kwargs=dict(
+                    model=model,
+                    report_dir=shard_report_dir,
+                    junit_report_path=shard_junit_path,
+                    test_list=f"{first_test}-{last_test}",
+                    skip_env_test=index > 0,
+                    interface=ProgressInterface(prefix=f"worker {index}: ") if self.headless else EmptyInterface(),
+                    shard=index,
+                    profile_path=shard_path(self.profile_file, index) if self.profile_file else None,
+                ),
+            )
+            self.logger.info("Starting %s with tests %s-%s", worker.name, first_test, last_test)
+            worker.start()
+            workers.append((worker, shard_report_dir, shard_junit_path))
+        for worker, _, _ in workers:
+            worker.join()
+            if worker.exitcode:
+                self.logger.error("%s exited with %s", worker.name, worker.exitcode)
+        merge_report_stores(
+            [shard_report_dir for _, shard_report_dir, _ in workers], self.report_dir, self.report_format
+        )
+        if self.junit_report_path:
+            merge_junit_reports([junit_path for _, _, junit_path in workers], self.junit_report_path)
+        if self.profile_file:
+            self._merge_profiles([shard_path(self.profile_file, index) for index in range(len(workers))])
+        shutil.rmtree(shard_dir, ignore_errors=True)
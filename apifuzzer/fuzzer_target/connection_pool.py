@@ -0,0 +1,87 @@
+from urllib.parse import urlsplit
+
+import pycurl
+
+from apifuzzer.utils import init_pycurl, configure_pycurl, get_logger
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class CurlHandlePool(object):
+    """
+    Keeps the pycurl handles alive between the fuzz requests, so the TCP connection (and the TLS session) opened
+    towards a scheme/host/port is reused by the next test instead of connecting again.
+    Handles are reset before reuse, so options set by a test do not leak into the next one.
+    """
+
+    def __init__(self, fresh_connections=False):
+        """
+        :param fresh_connections: if True every request gets a new handle (new connection) which is closed after use
+        :type fresh_connections: bool
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.fresh_connections = fresh_connections
+        self._idle_handles = dict()
+
+    @staticmethod
+    def pool_key(url):
+        """
+        Provides the key of the pool where the handle of the url belongs to
+        :param url: request url
+        :type url: str
+        :return: scheme, host, port or None if the url can not be parsed
+        :rtype: tuple, None
+        """
+        try:
+            parsed_url = urlsplit(url)
+            scheme = parsed_url.scheme.lower()
+            port = parsed_url.port or DEFAULT_PORTS.get(scheme)
+            host = parsed_url.hostname
+        except ValueError:
+            return None
+        if not scheme or not host:
+            return None
+        return scheme, host, port
+
+    def acquire(self, url):
+        """
+        Provides a configured pycurl handle for the url, reusing an idle one of the same scheme/host/port if possible
+        :param url: request url
+        :type url: str
+        :return: pool key and pycurl handle, the key has to be passed back at release
+        :rtype: tuple
+        """
+        key = self.pool_key(url)
+        idle_handles = self._idle_handles.get(key)
+        if self.fresh_connections or key is None or not idle_handles:
+            self.logger.debug("Open new handle for %s", key)
+            return key, init_pycurl()
+        _curl = idle_handles.pop()
+        _curl.reset()
+        # reset keeps the cookies in memory, a new handle would start without them
+        _curl.setopt(pycurl.COOKIELIST, "ALL")
+        configure_pycurl(_curl)
+        self.logger.debug("Reusing handle for %s", key)
+        return key, _curl
+
+    def release(self, key, _curl):
+        """
+        Gives back the handle to the pool, or closes it if the connections should not be reused
+        :param key: pool key provided by acquire
+        :type key: tuple, None
+        :param _curl: pycurl handle provided by acquire
+        :type _curl: pycurl.Curl
+        """
+        if self.fresh_connections or key is None:
+            _curl.close()
+            return
+        self._idle_handles.setdefault(key, list()).append(_curl)
+
+    def close(self):
+        """
+        Closes all idle handles and their connections
+        """
+        for handles in self._idle_handles.values():
+            for _curl in handles:
+                _curl.close()
+        self._idle_handles.clear()
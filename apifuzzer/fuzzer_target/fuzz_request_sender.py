@@ -1,29 +1,85 @@
 import json
-import os
+import logging
 import urllib.parse
 from io import BytesIO
-from time import time, perf_counter
+from time import time, perf_counter, sleep
 
 import pycurl
 from bitstring import Bits
-from junit_xml import TestSuite, TestCase, to_xml_report_file
+from junit_xml import TestCase
 from kitty.targets.server import ServerTarget
 
 from apifuzzer.apifuzzerreport import ApifuzzerReport as Report
+from apifuzzer.crash_buckets import CrashBuckets
+from apifuzzer.fuzzer_target.connection_pool import CurlHandlePool
+from apifuzzer.fuzzer_target.rate_controller import RateController
+from apifuzzer.fuzzer_target.retry_policy import RetryPolicy, DEFAULT_RETRY_ERRORS
+from apifuzzer.junit_writer import JUnitStreamWriter
+from apifuzzer.metrics import FuzzMetrics
+from apifuzzer.report_store import create_report_store
 from apifuzzer.fuzzer_target.request_base_functions import FuzzerTargetBase
-from apifuzzer.utils import try_b64encode, init_pycurl, get_logger
+from apifuzzer.utils import try_b64encode, get_logger, LazyString
+
+# SIZE_UPLOAD is deprecated, the pycurl version of requirements.txt does not have SIZE_UPLOAD_T yet
+SIZE_UPLOAD = getattr(pycurl, "SIZE_UPLOAD_T", pycurl.SIZE_UPLOAD)
 
 
 class Return:
     pass
 
 
+class PendingRequest(object):
+    """
+    Keeps the state of a fuzz request between its preparation and the processing of its response
+    """
+
+    def __init__(self, test_number, report, transmit_start_test):
+        self.test_number = test_number
+        self.report = report
+        self.transmit_start_test = transmit_start_test
+        self.method = None
+        self.request_headers = dict()
+        self.request_body = dict()
+        self.resp_buff_hdrs = BytesIO()
+        self.resp_buff_body = BytesIO()
+        self.pool_key = None
+        self.curl = None
+        self.failed = False
+        self.transport_error = None
+        self.retries = 0
+        # perf_counter time when the request is started, set while it waits for its retry or for its turn of the rate
+        self.start_at = None
+        self.finished = False
+        # filled by the fuzzer when the request is sent concurrently with others
+        self.payload = None
+        self.test_info = None
+        self.sequence_str = None
+
+
 class FuzzerTarget(FuzzerTargetBase, ServerTarget):
     def not_implemented(self, func_name):
         _ = func_name
         pass
 
-    def __init__(self, name, base_url, report_dir, auth_headers, junit_report_path):
+    def __init__(
+        self,
+        name,
+        base_url,
+        report_dir,
+        auth_headers,
+        junit_report_path,
+        fresh_connections=False,
+        max_rps=None,
+        target_latency=None,
+        concurrency=1,
+        max_retries=2,
+        retry_on=DEFAULT_RETRY_ERRORS,
+        report_format="files",
+        bucket_reports=None,
+        metrics=None,
+        profiler=None,
+        seed=None,
+    ):
         super(ServerTarget, self).__init__(name)  # pylint: disable=E1003
         super(FuzzerTargetBase, self).__init__(auth_headers)  # pylint: disable=E1003
         self.logger = get_logger(self.__class__.__name__)
@@ -32,10 +88,26 @@ class FuzzerTarget(FuzzerTargetBase, ServerTarget):
         self.auth_headers = auth_headers
         self.report_dir = report_dir
         self.junit_report_path = junit_report_path
-        self.failed_test = list()
+        # the test cases are written as the tests finish, the document is closed in teardown
+        self.junit_writer = JUnitStreamWriter(junit_report_path) if junit_report_path else None
         self.logger.info("Logger initialized")
         self.resp_headers = dict()
         self.transmit_start_test = None
+        # response time of the current test, saved to the report store beside the report
+        self.latency = None
+        self.connection_pool = CurlHandlePool(fresh_connections=fresh_connections)
+        self.rate_controller = RateController(
+            max_rps=max_rps, target_latency=target_latency, max_concurrency=concurrency
+        )
+        self.retry_policy = RetryPolicy(max_retries=max_retries, retry_on=retry_on)
+        self.report_store = create_report_store(report_format, report_dir)
+        # the failed tests are grouped by their response, only the first reports of a group are saved
+        self.crash_buckets = CrashBuckets(max_reports=bucket_reports) if bucket_reports is not None else None
+        self.metrics = metrics if metrics is not None else FuzzMetrics()
+        # PhaseProfiler, the phases are timed only if it is set
+        self.profiler = profiler
+        # seed of the --seed option, recorded in the reports to reproduce the run
+        self.seed = seed
 
     def pre_test(self, test_num):
         """
@@ -49,6 +121,8 @@ class FuzzerTarget(FuzzerTargetBase, ServerTarget):
             monitor.pre_test(test_number=self.test_number)
         self.report.add("test_number", test_num)
         self.report.add("state", "STARTED")
+        if self.seed is not None:
+            self.report.add("seed", self.seed)
         self.transmit_start_test = perf_counter()
 
     def transmit(self, **kwargs):
@@ -57,7 +131,29 @@ class FuzzerTarget(FuzzerTargetBase, ServerTarget):
         :param kwargs: url, method, params, querystring, etc
         :return:
         """
-        self.logger.debug("Transmit: {}".format(kwargs))
+        pending_request = self.prepare_request(**kwargs)
+        if pending_request.curl is not None:
+            self.rate_controller.wait()
+            try:
+                self.perform_request(pending_request)
+            except Exception as e:
+                self._request_failed(pending_request, e)
+        return self.complete_request(pending_request)
+
+    def prepare_request(self, **kwargs):
+        """
+        Prepares fuzz HTTP request of the current test, the returned pycurl handle is ready to be performed
+        :param kwargs: url, method, params, querystring, etc
+        :rtype: PendingRequest
+        """
+        self.logger.debug("Transmit: %s", kwargs)
+        prepare_start = perf_counter()
+        sanitize_time = headers_time = 0.0
+        pending_request = PendingRequest(
+            test_number=self.test_number,
+            report=self.report,
+            transmit_start_test=self.transmit_start_test,
+        )
         try:
             _req_url = list()
             for url_part in self.base_url, kwargs["url"]:
@@ -76,12 +172,12 @@ class FuzzerTarget(FuzzerTargetBase, ServerTarget):
             query_params = None
 
             if kwargs.get("params") is not None:
-                self.logger.debug(
-                    ("Adding query params: {}".format(kwargs.get("params", {})))
-                )
+                self.logger.debug("Adding query params: %s", kwargs.get("params", {}))
+                phase_start = perf_counter()
                 query_params = self.format_pycurl_query_param(
                     request_url, kwargs.get("params", {})
                 )
+                sanitize_time += perf_counter() - phase_start
                 kwargs.pop("params")
             if kwargs.get("path_variables") is not None:
                 request_url = self.expand_path_variables(
@@ -95,24 +191,24 @@ class FuzzerTarget(FuzzerTargetBase, ServerTarget):
             method = kwargs["method"]
             content_type = kwargs.get("content_type")
             kwargs.pop("content_type", None)
-            self.logger.info("Request URL : {} {}".format(method, request_url))
+            self.logger.info("Request URL : %s %s", method, request_url)
             if kwargs.get("data") is not None:
-                self.logger.info(
-                    "Request data:{}".format(json.dumps(dict(kwargs.get("data"))))
-                )
+                self.logger.info("Request data:%s", LazyString(json.dumps, dict(kwargs.get("data"))))
             if isinstance(method, Bits):
                 method = method.tobytes()
             if isinstance(method, bytes):
                 method = method.decode()
             kwargs.pop("method")
+            pending_request.method = method
+            phase_start = perf_counter()
             kwargs["headers"] = self.compile_headers(kwargs.get("headers"))
+            headers_time = perf_counter() - phase_start
             self.logger.debug(
-                "Request url:{}\nRequest method: {}\nRequest headers: {}\nRequest body: {}".format(
-                    request_url,
-                    method,
-                    json.dumps(dict(kwargs.get("headers", {})), indent=2),
-                    kwargs.get("data"),
-                )
+                "Request url:%s\nRequest method: %s\nRequest headers: %s\nRequest body: %s",
+                request_url,
+                method,
+                LazyString(json.dumps, dict(kwargs.get("headers", {})), indent=2),
+                kwargs.get("data"),
             )
             self.report.set_status(Report.PASSED)
             self.report.add("request_url", request_url)
@@ -120,20 +216,25 @@ class FuzzerTarget(FuzzerTargetBase, ServerTarget):
             self.report.add(
                 "request_headers", json.dumps(dict(kwargs.get("headers", {})))
             )
+            pending_request.request_headers = kwargs.get("headers", {})
+            pending_request.request_body = kwargs.get("data", {})
             try:
-                resp_buff_hdrs = BytesIO()
-                resp_buff_body = BytesIO()
-                buffer = BytesIO()
-                _curl = init_pycurl()
-                _curl.setopt(pycurl.URL, self.format_pycurl_url(request_url))
+                phase_start = perf_counter()
+                pycurl_url = self.format_pycurl_url(request_url)
+                sanitize_time += perf_counter() - phase_start
+                pending_request.pool_key, pending_request.curl = self.connection_pool.acquire(pycurl_url)
+                _curl = pending_request.curl
+                _curl.setopt(pycurl.URL, pycurl_url)
                 _curl.setopt(pycurl.HEADERFUNCTION, self.header_function)
                 _curl.setopt(pycurl.POST, len(kwargs.get("data", {}).items()))
                 _curl.setopt(pycurl.CUSTOMREQUEST, method)
                 headers = kwargs["headers"]
                 if content_type:
-                    self.logger.debug(f"Adding Content-Type: {content_type} header")
+                    self.logger.debug("Adding Content-Type: %s header", content_type)
                     headers.update({"Content-Type": content_type})
+                phase_start = perf_counter()
                 _curl.setopt(pycurl.HTTPHEADER, self.format_pycurl_header(headers))
+                sanitize_time += perf_counter() - phase_start
                 if content_type == "multipart/form-data":
                     post_data = list()
                     for k, v in kwargs.get("data", {}).items():
@@ -152,40 +253,118 @@ class FuzzerTarget(FuzzerTargetBase, ServerTarget):
                         pycurl.POSTFIELDS,
                         urllib.parse.urlencode(kwargs.get("data", {})),
                     )
-                _curl.setopt(pycurl.HEADERFUNCTION, resp_buff_hdrs.write)
-                _curl.setopt(pycurl.WRITEFUNCTION, resp_buff_body.write)
-                for retries in reversed(range(0, 3)):
-                    try:
-                        _curl.perform()
-                        self.report.set_status(Report.PASSED)
-                        # TODO: Handle this: pycurl.error: (3, 'Illegal characters found in URL')
-                    except pycurl.error as e:
-                        self.logger.warning(f"Failed to send request because of {e}")
-                        self.report.set_status(Report.ERROR)
-                        self.report.add('exception', e.msg if hasattr(e, 'msg') else str(e))
-                    except Exception as e:
-                        if not retries:
-                            raise
-                        self.logger.error(
-                            "Retrying... ({}) because {}".format(retries, e)
-                        )
-                        self.report.set_status(Report.ERROR)
-                        self.report.add('exception', e.msg if hasattr(e, 'msg') else str(e))
+                _curl.setopt(pycurl.HEADERFUNCTION, pending_request.resp_buff_hdrs.write)
+                _curl.setopt(pycurl.WRITEFUNCTION, pending_request.resp_buff_body.write)
+            except Exception as e:
+                self._request_failed(pending_request, e)
+        except (
+            UnicodeDecodeError,
+            UnicodeEncodeError,
+        ) as e:  # request failure such as InvalidHeader
+            self._release_handle(pending_request)
+            pending_request.failed = True
+            self.report_add_basic_msg(
+                ("Failed to parse http response code, exception occurred: %s", e)
+            )
+        if self.profiler is not None:
+            template = self.report.get("template")
+            self.profiler.record("headers", template, headers_time)
+            self.profiler.record("sanitize", template, sanitize_time)
+            # the rest of the request preparation, e.g. the encoding of the body
+            self.profiler.record(
+                "prepare", template, perf_counter() - prepare_start - headers_time - sanitize_time
+            )
+        return pending_request
+
+    def perform_request(self, pending_request):
+        """
+        Sends the prepared request and waits for the response, the request is sent again on the transport errors
+        allowed by the retry policy
+        :type pending_request: PendingRequest
+        """
+        while True:
+            try:
+                pending_request.curl.perform()
+                self.report.set_status(Report.PASSED)
+                return
+            except pycurl.error as e:
+                backoff = self.retry_request(pending_request, e)
+                if backoff is None:
+                    pending_request.transport_error = e
+                    self.record_transport_error(e)
+                    return
+                # nothing else is in flight while the requests are sent one by one
+                sleep(backoff)
+
+    def retry_request(self, pending_request, e):
+        """
+        Prepares the request for sending again if the retry policy allows it
+        :type pending_request: PendingRequest
+        :param e: error of the previous attempt
+        :type e: pycurl.error
+        :return: seconds to wait before sending the request again, None if it is not sent again
+        :rtype: float
+        """
+        uploaded = pending_request.curl.getinfo(SIZE_UPLOAD)
+        if not self.retry_policy.should_retry(e, pending_request.retries, uploaded):
+            return None
+        backoff = self.retry_policy.backoff(pending_request.retries)
+        pending_request.retries += 1
+        self.logger.warning(
+            "Retrying test %s (%d/%d) in %.2fs because %s",
+            pending_request.test_number, pending_request.retries, self.retry_policy.max_retries, backoff, e,
+        )
+        # drop the partial response of the failed attempt
+        for buffer in pending_request.resp_buff_hdrs, pending_request.resp_buff_body:
+            buffer.seek(0)
+            buffer.truncate()
+        return backoff
+
+    def record_transport_error(self, e):
+        """
+        Registers the error reported by pycurl while the request was sent
+        :type e: pycurl.error
+        """
+        self.logger.warning("Failed to send request because of %s", e)
+        self.metrics.transport_errors.inc((e.args[0] if e.args else None,))
+        self.report.set_status(Report.ERROR)
+        self.report.add('exception', e.msg if hasattr(e, 'msg') else str(e))
+
+    def restore_request(self, pending_request):
+        """
+        Makes the test of the pending request the current one, so the response and the post test steps are
+        registered in its report
+        :type pending_request: PendingRequest
+        """
+        self.test_number = pending_request.test_number
+        self.report = pending_request.report
+        self.transmit_start_test = pending_request.transmit_start_test
+
+    def complete_request(self, pending_request):
+        """
+        Processes the response of the performed request
+        :type pending_request: PendingRequest
+        :return: response or None if the request was not sent
+        """
+        self.latency = None
+        if pending_request.failed:
+            return
+        self.report.add("retries", pending_request.retries)
+        try:
+            try:
+                _curl = pending_request.curl
                 _return = Return()
                 _return.status_code = _curl.getinfo(pycurl.RESPONSE_CODE)
                 _return.headers = self.resp_headers
-                _return.content = buffer.getvalue()
+                _return.content = pending_request.resp_buff_body.getvalue()
                 _return.request = Return()
-                _return.request.headers = kwargs.get("headers", {})
-                _return.request.body = kwargs.get("data", {})
-                _curl.close()
+                _return.request.headers = pending_request.request_headers
+                _return.request.body = pending_request.request_body
+                self.latency = _curl.getinfo(pycurl.TOTAL_TIME)
+                payload_size = _curl.getinfo(SIZE_UPLOAD)
+                self._release_handle(pending_request)
             except Exception as e:
-                self.logger.exception(e)
-                self.report.set_status(Report.ERROR)
-                self.logger.error("Request failed, reason: {}".format(e))
-                self.report.add('request_sending_failed', e.msg if hasattr(e, 'msg') else str(e))
-                # self.report.add('request_sending_failed', e.msg if hasattr(e, 'msg') else e)
-                self.report.add("request_method", method)
+                self._request_failed(pending_request, e)
                 return
             # overwrite request headers in report, add auto generated ones
             self.report.add(
@@ -193,15 +372,21 @@ class FuzzerTarget(FuzzerTargetBase, ServerTarget):
                 try_b64encode(json.dumps(dict(_return.request.headers))),
             )
             self.logger.debug(
-                "Response code:{}\nResponse headers: {}\nResponse body: {}".format(
-                    _return.status_code,
-                    json.dumps(dict(_return.headers), indent=2),
-                    _return.content,
-                )
+                "Response code:%s\nResponse headers: %s\nResponse body: %s",
+                _return.status_code,
+                LazyString(json.dumps, dict(_return.headers), indent=2),
+                _return.content,
             )
             self.report.add("request_body", _return.request.body)
-            self.report.add("response", _return.content.decode())
+            self.report.add("response", _return.content.decode(errors="replace"))
             status_code = _return.status_code
+            self.report.add("status_code", status_code)
+            self.metrics.requests.inc((self.report.get("template"), pending_request.method, status_code))
+            self.metrics.request_latency.observe(self.latency)
+            self.metrics.payload_size.observe(payload_size)
+            if self.profiler is not None:
+                self.profiler.record("network", self.report.get("template"), self.latency)
+            self.rate_controller.record(self.latency, status_code, pending_request.transport_error)
             if not status_code:
                 self.logger.warning(f"Failed to parse http response code, continue...")
                 self.report.set_status(Report.ERROR)
@@ -222,39 +407,70 @@ class FuzzerTarget(FuzzerTargetBase, ServerTarget):
                 ("Failed to parse http response code, exception occurred: %s", e)
             )
 
+    def _request_failed(self, pending_request, e):
+        self._release_handle(pending_request)
+        pending_request.failed = True
+        self.logger.exception(e)
+        self.report.set_status(Report.ERROR)
+        self.logger.error("Request failed, reason: %s", e)
+        self.report.add('request_sending_failed', e.msg if hasattr(e, 'msg') else str(e))
+        self.report.add("request_method", pending_request.method)
+
+    def _release_handle(self, pending_request):
+        if pending_request.curl is not None:
+            self.connection_pool.release(pending_request.pool_key, pending_request.curl)
+            pending_request.curl = None
+
     def post_test(self, test_num):
         """Called after a test is completed, perform cleanup etc."""
         if self.report.get("report") is None:
             self.report.add("reason", self.report.get_status())
-        super(ServerTarget, self).post_test(test_num)  # pylint: disable=E1003
-        if self.junit_report_path:
-            report_dict = self.report.to_dict()
+        # with concurrent requests the test number of the model is ahead of the completed test
+        super(ServerTarget, self).post_test(self.test_number)  # pylint: disable=E1003
+        self.metrics.tests.inc((self.report.get_status(),))
+        # encoding the fields is expensive, the report is converted once
+        phase_start = perf_counter()
+        report_dict = self.report.to_dict()
+        if self.profiler is not None:
+            self.profiler.record("to_dict", report_dict.get("template"), perf_counter() - phase_start)
+        bucket, save_report = None, True
+        if self.crash_buckets and self.report.get_status() in (Report.FAILED, Report.ERROR):
+            bucket, save_report = self.crash_buckets.add(self.test_number, report_dict)
+            report_dict["bucket"] = bucket.bucket_id
+        if self.junit_writer:
             test_case = TestCase(
-                    name=f"{self.test_number}: {report_dict['request_url']}",
+                name=f"{self.test_number}: {report_dict['request_url']}",
                 status=self.report.get_status(),
                 timestamp=time(),
                 elapsed_sec=perf_counter() - self.transmit_start_test
             )
+            if save_report:
+                message = json.dumps(report_dict)
+            else:
+                message = f"Same response as test {bucket.first_test}, bucket: {bucket.bucket_id}"
             if self.report.get_status() == Report.FAILED:
-                test_case.add_failure_info(message=json.dumps(self.report.to_dict()))
+                test_case.add_failure_info(message=message)
             if self.report.get_status() == Report.ERROR:
-                test_case.add_error_info(message=json.dumps(self.report.to_dict()))
-            self.failed_test.append(test_case)
-            self.save_report_to_disc()
+                test_case.add_error_info(message=message)
+            self.junit_writer.add(test_case)
+        if save_report:
+            phase_start = perf_counter()
+            self.save_report_to_disc(report_dict)
+            if self.profiler is not None:
+                self.profiler.record("save_report", report_dict.get("template"), perf_counter() - phase_start)
 
-    def save_report_to_disc(self):
-        self.logger.info("Report: {}".format(self.report.to_dict()))
+    def save_report_to_disc(self, report_dict):
+        """
+        :param report_dict: report of the current test in dictionary format
+        :type report_dict: dict
+        """
+        self.logger.info("Report: %s", report_dict)
+        start = perf_counter()
         try:
-            if not os.path.exists(os.path.dirname(self.report_dir)):
-                try:
-                    os.makedirs(os.path.dirname(self.report_dir))
-                except OSError:
-                    pass
-            with open(f"{self.report_dir}/{str(self.test_number + 1).zfill(4)}_{int(time())}.json", "w") \
-                as report_dump_file:
-                report_dump_file.write(json.dumps(self.report.to_dict()))
+            self.report_store.write(self.test_number, report_dict, latency=self.latency)
+            self.metrics.report_write_latency.observe(perf_counter() - start)
         except Exception as e:
-            self.logger.error(f'Failed to save report "{self.report.to_dict()}" to {self.report_dir} because: {e}')
+            self.logger.error(f'Failed to save report "{report_dict}" to {self.report_dir} because: {e}')
 
     def report_add_basic_msg(self, msg):
         self.report.set_status(Report.FAILED)
@@ -262,16 +478,15 @@ class FuzzerTarget(FuzzerTargetBase, ServerTarget):
         self.report.failed(msg)
 
     def teardown(self):
-        if len(self.failed_test):
-            test_cases = self.failed_test
-        else:
-            test_cases = list()
-            test_cases.append(TestCase(name="Fuzz test succeed", status="Pass"))
-        if self.junit_report_path:
-            with open(self.junit_report_path, "w") as report_file:
-                to_xml_report_file(
-                    report_file,
-                    [TestSuite(name="API Fuzzer", test_cases=test_cases, timestamp=time())],
-                    prettyprint=True
-                )
+        if self.junit_writer:
+            self.junit_writer.close()
+        # shown with the default log level if the rate control is enabled, like the summary of the crash buckets
+        self.logger.log(
+            logging.WARNING if self.rate_controller.enabled else logging.INFO,
+            "Rate control summary: %s", json.dumps(self.rate_controller.summary()),
+        )
+        if self.crash_buckets:
+            self.crash_buckets.log_summary()
+        self.report_store.close()
+        self.connection_pool.close()
         super(ServerTarget, self).teardown()  # pylint: disable=E1003
@@ -0,0 +1,191 @@
+from time import perf_counter, sleep
+
+import pycurl
+
+from apifuzzer.utils import get_logger
+
+# 500 is what the fuzzer is looking for, it is not a sign of overload
+OVERLOAD_STATUS_CODES = (429, 502, 503, 504)
+# errors caused by the fuzzed request itself (e.g. malformed url) don't count
+OVERLOAD_CURL_ERRORS = (
+    pycurl.E_COULDNT_CONNECT,
+    pycurl.E_OPERATION_TIMEDOUT,
+    pycurl.E_GOT_NOTHING,
+    pycurl.E_SEND_ERROR,
+    pycurl.E_RECV_ERROR,
+)
+
+
+class RateController(object):
+    """
+    Paces the fuzz requests and limits the number of requests in flight with AIMD (additive increase,
+    multiplicative decrease) control. The responses are evaluated in windows: while the latency and the rate of
+    overload responses (429, 502, 503, 504) and connection errors (refused, timeout, reset) are healthy the limits
+    are raised step by step, when they degrade the limits are cut.
+    The control is active only if max_rps or target_latency is set. Without max_rps the request rate is not limited
+    until the target shows the first sign of overload.
+    """
+
+    def __init__(
+        self,
+        max_rps=None,
+        target_latency=None,
+        max_concurrency=1,
+        window=10,
+        max_error_ratio=0.1,
+        rps_step=1.0,
+        decrease_factor=0.5,
+        min_rps=1.0,
+    ):
+        """
+        :param max_rps: upper limit of the requests per second, no limit if None
+        :type max_rps: float
+        :param target_latency: response time in seconds above which the target is considered overloaded
+        :type target_latency: float
+        :param max_concurrency: upper limit of the requests in flight
+        :type max_concurrency: int
+        :param window: number of responses evaluated together
+        :type window: int
+        :param max_error_ratio: ratio of overload responses and connection errors in a window above which the target
+         is considered overloaded
+        :type max_error_ratio: float
+        :param rps_step: requests per second added to the rate after a healthy window
+        :type rps_step: float
+        :param decrease_factor: the rate and the concurrency are multiplied by this after an unhealthy window
+        :type decrease_factor: float
+        :param min_rps: the rate is not decreased below this
+        :type min_rps: float
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.enabled = max_rps is not None or target_latency is not None
+        self.max_rps = max_rps
+        self.target_latency = target_latency
+        self.max_concurrency = max(1, max_concurrency)
+        self.window = window
+        self.max_error_ratio = max_error_ratio
+        self.rps_step = rps_step
+        self.decrease_factor = decrease_factor
+        self.min_rps = min_rps
+        self.rps = max_rps
+        self.concurrency = self.max_concurrency
+        self._next_send = None
+        self._throttled = False
+        self._latencies = list()
+        self._errors = 0
+        self.requests = 0
+        self.errors = 0
+        self.decreases = 0
+        self.lowest_rps = max_rps
+        self._started = None
+        self._finished = None
+
+    def reserve(self):
+        """
+        Takes the next free slot of the current rate for a request
+        :return: seconds until the request can be sent, 0 if it can be sent now
+        :rtype: float
+        """
+        now = perf_counter()
+        if self._started is None:
+            self._started = now
+        if not self.enabled or self.rps is None:
+            return 0
+        delay = 0
+        if self._next_send is not None and self._next_send > now:
+            self._throttled = True
+            delay = self._next_send - now
+            now = self._next_send
+        self._next_send = now + 1.0 / self.rps
+        return delay
+
+    def wait(self):
+        """
+        Blocks until the next request can be sent according to the current rate, the concurrent requests are delayed
+        by the request engine instead
+        """
+        delay = self.reserve()
+        if delay:
+            sleep(delay)
+
+    def record(self, latency, status_code, transport_error=None):
+        """
+        Registers the outcome of a request and adjusts the limits at the end of the window
+        :param latency: response time in seconds
+        :type latency: float
+        :param status_code: HTTP status code of the response, 0 if there was no response
+        :type status_code: int
+        :param transport_error: error reported by pycurl while the request was sent
+        :type transport_error: pycurl.error
+        """
+        self.requests += 1
+        self._finished = perf_counter()
+        self._latencies.append(latency)
+        if status_code in OVERLOAD_STATUS_CODES or (
+            transport_error is not None and transport_error.args[0] in OVERLOAD_CURL_ERRORS
+        ):
+            self._errors += 1
+            self.errors += 1
+        if len(self._latencies) >= self.window:
+            if self.enabled:
+                self._adjust()
+            self._latencies = list()
+            self._errors = 0
+            self._throttled = False
+
+    def _adjust(self):
+        mean_latency = sum(self._latencies) / len(self._latencies)
+        error_ratio = self._errors / len(self._latencies)
+        elapsed = self._finished - self._started if self._started is not None else 0
+        overloaded = error_ratio > self.max_error_ratio or (
+            self.target_latency is not None and mean_latency > self.target_latency
+        )
+        if overloaded:
+            if self.rps is None:
+                # start limiting from the throughput the target could serve so far
+                self.rps = self.requests / elapsed if elapsed else self.min_rps
+            self.rps = max(self.min_rps, self.rps * self.decrease_factor)
+            self.concurrency = max(1, int(self.concurrency * self.decrease_factor))
+            self.decreases += 1
+            self.lowest_rps = self.rps if self.lowest_rps is None else min(self.lowest_rps, self.rps)
+            self.logger.warning(
+                "Target overloaded (latency: %.3fs, errors: %.0f%%), rate decreased to %.1f req/s, concurrency to %d",
+                mean_latency, error_ratio * 100, self.rps, self.concurrency,
+            )
+        else:
+            changed = False
+            if self.rps is not None and self._throttled and (self.max_rps is None or self.rps < self.max_rps):
+                self.rps = self.rps + self.rps_step
+                if self.max_rps is not None:
+                    self.rps = min(self.max_rps, self.rps)
+                changed = True
+            if self.concurrency < self.max_concurrency:
+                self.concurrency += 1
+                changed = True
+            if changed:
+                self.logger.info(
+                    "Rate increased to %s, concurrency to %d (latency: %.3fs, errors: %.0f%%)",
+                    self.rate_str(), self.concurrency, mean_latency, error_ratio * 100,
+                )
+
+    def rate_str(self):
+        """
+        :return: current request rate limit in human readable format
+        :rtype: str
+        """
+        return "unlimited" if self.rps is None else "{:.1f} req/s".format(self.rps)
+
+    def summary(self):
+        """
+        :return: statistics of the rate control
+        :rtype: dict
+        """
+        elapsed = (self._finished - self._started) if self._started is not None and self._finished else 0
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "average_rps": round(self.requests / elapsed, 2) if elapsed else None,
+            "final_rps_limit": round(self.rps, 2) if self.rps is not None else None,
+            "lowest_rps_limit": round(self.lowest_rps, 2) if self.lowest_rps is not None else None,
+            "final_concurrency": self.concurrency,
+            "decreases": self.decreases,
+        }
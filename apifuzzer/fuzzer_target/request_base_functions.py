@@ -1,7 +1,5 @@
-import pycurl
-import requests
-
 from apifuzzer.fuzz_utils import container_name_to_param
+from apifuzzer.fuzzer_target.sanitizer import URL_SANITIZER, HEADER_SANITIZER
 from apifuzzer.utils import get_logger
 from apifuzzer.version import get_version
 
@@ -13,8 +11,6 @@ class FuzzerTargetBase:
         self.logger = get_logger(self.__class__.__name__)
         self.logger.info("Logger initialized")
         self.resp_headers = dict()
-        self.chop_left = True
-        self.chop_right = True
 
     def compile_headers(self, fuzz_header=None):
         """
@@ -22,6 +18,8 @@ class FuzzerTargetBase:
         used at the reques
         :type fuzz_header: list, dict, None
         """
+        import requests
+
         _header = requests.utils.default_headers()
         _header.update(
             {
@@ -31,9 +29,7 @@ class FuzzerTargetBase:
         if isinstance(fuzz_header, dict):
             for k, v in fuzz_header.items():
                 fuzz_header_name = container_name_to_param(k)
-                self.logger.debug(
-                    "Adding fuzz header: {}->{}".format(fuzz_header_name, v)
-                )
+                self.logger.debug("Adding fuzz header: %s->%s", fuzz_header_name, v)
                 _header[fuzz_header_name] = v
         if isinstance(self.auth_headers, list):
             for auth_header_part in self.auth_headers:
@@ -74,48 +70,20 @@ class FuzzerTargetBase:
         :type query_params: dict
         :rtype: str
         """
-        _dummy_curl = pycurl.Curl()
         _tmp_query_params = dict()
+        # the whole url is rejected by pycurl if the url or a query param name is rejected
+        url_valid = URL_SANITIZER.is_valid(url)
         for k, v in query_params.items():
-            original_value = v
-            iteration = 0
-            self.chop_left = True
-            self.chop_right = True
-            while True:
-                iteration = iteration + 1
-                _test_query_params = _tmp_query_params.copy()
-                _query_param_name = container_name_to_param(k)
-                _test_query_params[_query_param_name] = v
-                try:
-                    _dummy_curl.setopt(
-                        pycurl.URL,
-                        "{}{}".format(
-                            url, self.dict_to_query_string(_test_query_params)
-                        ),
-                    )
-                    _tmp_query_params[_query_param_name] = v
-                    break
-                except (UnicodeEncodeError, ValueError) as e:
-                    self.logger.debug(
-                        "{} Problem adding ({}) as query param. Issue was:{}".format(
-                            iteration, k, e
-                        )
-                    )
-                    if len(v):
-                        v = self.chop_fuzz_value(
-                            original_fuzz_value=original_value, fuzz_value=v
-                        )
-                    else:
-                        self.logger.info(
-                            "The whole query param was removed, using empty string instead"
-                        )
-                        _tmp_query_params[_query_param_name] = ""
-                        break
-                except Exception as e:  # pylint: disable=broad-exception
-                    self.logger.error(
-                        "Unexpected exception ({}) while processing: {}".format(e, k)
-                    )
-        self.logger.warning("Returning: {}".format(_tmp_query_params))
+            _query_param_name = container_name_to_param(k)
+            url_valid = url_valid and URL_SANITIZER.is_valid(_query_param_name)
+            if url_valid:
+                _tmp_query_params[_query_param_name] = URL_SANITIZER.sanitize("{}".format(v))
+            else:
+                self.logger.info(
+                    "The whole query param was removed, using empty string instead"
+                )
+                _tmp_query_params[_query_param_name] = ""
+        self.logger.debug("Returning: %s", _tmp_query_params)
         return self.dict_to_query_string(_tmp_query_params)
 
     def format_pycurl_url(self, url):
@@ -126,69 +94,10 @@ class FuzzerTargetBase:
         :return: pycurl compliant URL
         """
         self.logger.debug("URL to process: %s", url)
-        _dummy_curl = pycurl.Curl()
-        url_fields = url.split("/")
-        _tmp_url_list = list()
-        for part in url_fields:
-            self.logger.debug("Processing URL part: {}".format(part))
-            original_value = part
-            iteration = 0
-            self.chop_left = True
-            self.chop_right = True
-            while True:
-                iteration = iteration + 1
-                try:
-                    _test_list = list()
-                    _test_list = _tmp_url_list[::]
-                    _test_list.append(part)
-                    _dummy_curl.setopt(pycurl.URL, "/".join(_test_list))
-                    self.logger.debug("Adding %s to the url: %s", part, _tmp_url_list)
-                    _tmp_url_list.append(part)
-                    break
-                except (UnicodeEncodeError, ValueError) as e:
-                    self.logger.debug(
-                        "{} Problem adding ({}) to the url. Issue was:{}".format(
-                            iteration, part, e
-                        )
-                    )
-                    if len(part):
-                        part = self.chop_fuzz_value(
-                            original_fuzz_value=original_value, fuzz_value=part
-                        )
-                    else:
-                        self.logger.info(
-                            "The whole url part was removed, using empty string instead"
-                        )
-                        _tmp_url_list.append("-")
-                        break
-        _return = "/".join(_tmp_url_list)
+        _return = "/".join(URL_SANITIZER.sanitize(part) for part in url.split("/"))
         self.logger.info("URL to be used: %s", _return)
         return _return
 
-    def chop_fuzz_value(self, original_fuzz_value, fuzz_value):
-        """
-        Prepares fuzz parameter for pycurl removing elements if necessary
-        :param original_fuzz_value: original value of the filed
-        :param fuzz_value: value modified in the previous run
-        :return: fuzz value after chopping
-        """
-        if self.chop_left:
-            self.logger.debug(
-                "Remove first character from value, current length: %s", len(fuzz_value)
-            )
-            fuzz_value = fuzz_value[1:]
-            if len(fuzz_value) == 0:
-                self.chop_left = False
-                fuzz_value = original_fuzz_value
-        elif self.chop_right:
-            self.logger.debug(
-                "Remove last character from value, current length: %s", len(fuzz_value)
-            )
-            fuzz_value = fuzz_value[:-1]
-            if len(fuzz_value) == 1:
-                self.chop_left = False
-        return fuzz_value
-
     def format_pycurl_header(self, headers):
         """
         Pycurl and other http clients are picky, so this function tries to put everyting into the field as it can.
@@ -196,72 +105,37 @@ class FuzzerTargetBase:
         :return: http headers
         :rtype: list of dicts
         """
-        _dummy_curl = pycurl.Curl()
-        _tmp = dict()
         _return = list()
         for k, v in headers.items():
-            original_value = v
-            iteration = 0
-            self.chop_left = True
-            self.chop_right = True
-            while True:
-
-                iteration = iteration + 1
-                try:
-                    _dummy_curl.setopt(
-                        pycurl.HTTPHEADER, ["{}: {}".format(k, v).encode()]
-                    )
-                    _tmp[k] = v
-                    break
-                except ValueError as e:
-                    self.logger.debug(
-                        "{} Problem at adding {} to the header. Issue was:{}".format(
-                            iteration, k, e
-                        )
-                    )
-                    if len(v):
-                        v = self.chop_fuzz_value(
-                            original_fuzz_value=original_value, fuzz_value=v
-                        )
-                    else:
-                        self.logger.info(
-                            "The whole header value was removed, using empty string instead"
-                        )
-                        _tmp[k] = ""
-                        break
-        for k, v in _tmp.items():
+            if HEADER_SANITIZER.is_valid("{}".format(k)):
+                v = HEADER_SANITIZER.sanitize("{}".format(v))
+            else:
+                self.logger.info(
+                    "The whole header value was removed, using empty string instead"
+                )
+                v = ""
             _return.append("{}: {}".format(k, v).encode())
         return _return
 
     def expand_path_variables(self, url, path_parameters):
         if not isinstance(path_parameters, dict):
             self.logger.warning(
-                "Path_parameters {} does not in the desired format,received: {}".format(
-                    path_parameters, type(path_parameters)
-                )
+                "Path_parameters %s does not in the desired format,received: %s", path_parameters, type(path_parameters)
             )
             return url
         formatted_url = url
         for path_key, path_value in path_parameters.items():
-            self.logger.debug(
-                "Processing: path_key: {} , path_variable: {}".format(
-                    path_key, path_value
-                )
-            )
+            self.logger.debug("Processing: path_key: %s , path_variable: %s", path_key, path_value)
             path_parameter = container_name_to_param(path_key)
             url_path_parameter = "{%PATH_PARAM%}".replace(
                 "%PATH_PARAM%", path_parameter
             )
             tmp_url = formatted_url.replace(url_path_parameter, path_value)
             if tmp_url == formatted_url:
-                self.logger.warning(
-                    "{} was not in the url: {}, adding it".format(
-                        url_path_parameter, url
-                    )
-                )
+                self.logger.warning("%s was not in the url: %s, adding it", url_path_parameter, url)
                 tmp_url += "&{}={}".format(path_parameter, path_value)
             formatted_url = tmp_url
-        self.logger.debug("Compiled url in {}, out: {}".format(url, formatted_url))
+        self.logger.debug("Compiled url in %s, out: %s", url, formatted_url)
         return formatted_url.replace("{", "").replace("}", "").replace("+", "/")
 
     @staticmethod
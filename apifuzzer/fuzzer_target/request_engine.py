@@ -0,0 +1,112 @@
+import heapq
+from itertools import count
+from time import perf_counter, sleep
+
+import pycurl
+
+from apifuzzer.utils import get_logger
+
+
+class CurlMultiEngine(object):
+    """
+    Drives several prepared pycurl handles at the same time with a pycurl.CurlMulti event loop.
+    The engine does not care about the order of the requests, it gives back them as they finish. The requests added
+    with a delay (retries waiting for their backoff, requests waiting for their turn of the rate limit) are started
+    when their time comes, the transfers in flight are driven meanwhile.
+    """
+
+    def __init__(self, select_timeout=1.0):
+        """
+        :param select_timeout: maximum wait time in seconds for socket activity in one loop iteration
+        :type select_timeout: float
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.select_timeout = select_timeout
+        self._multi = pycurl.CurlMulti()
+        self._in_flight = dict()
+        # heap of (start time, insertion order, request) of the delayed requests
+        self._delayed = list()
+        self._order = count()
+
+    def in_flight(self):
+        """
+        :return: number of requests which were added but not finished yet, including the delayed ones
+        :rtype: int
+        """
+        return len(self._in_flight) + len(self._delayed)
+
+    def add(self, pending_request, delay=0):
+        """
+        Starts sending the prepared request
+        :param pending_request: request with prepared pycurl handle
+        :type pending_request: PendingRequest
+        :param delay: seconds to wait before the request is started
+        :type delay: float
+        """
+        pending_request.transport_error = None
+        if delay > 0:
+            pending_request.start_at = perf_counter() + delay
+            heapq.heappush(self._delayed, (pending_request.start_at, next(self._order), pending_request))
+            return
+        pending_request.start_at = None
+        self._in_flight[pending_request.curl] = pending_request
+        self._multi.add_handle(pending_request.curl)
+
+    def _start_due_requests(self):
+        """
+        Starts the delayed requests whose time has come
+        :return: seconds until the next delayed request is due, None if there is no delayed request
+        :rtype: float
+        """
+        now = perf_counter()
+        while self._delayed and self._delayed[0][0] <= now:
+            self.add(heapq.heappop(self._delayed)[2])
+        return self._delayed[0][0] - now if self._delayed else None
+
+    def wait(self):
+        """
+        Drives the transfers until at least one of them is finished
+        :return: finished requests, transport_error is set to the pycurl.error if the transfer failed
+        :rtype: list
+        """
+        finished = list()
+        while (self._in_flight or self._delayed) and not finished:
+            next_due = self._start_due_requests()
+            timeout = self.select_timeout if next_due is None else min(self.select_timeout, next_due)
+            if not self._in_flight:
+                sleep(timeout)
+                continue
+            while True:
+                ret, _ = self._multi.perform()
+                if ret != pycurl.E_CALL_MULTI_PERFORM:
+                    break
+            while True:
+                queued, succeeded, failed = self._multi.info_read()
+                for _curl in succeeded:
+                    finished.append(self._finish(_curl, None))
+                for _curl, errno, errmsg in failed:
+                    finished.append(self._finish(_curl, pycurl.error(errno, errmsg)))
+                if not queued:
+                    break
+            if not finished:
+                self._multi.select(timeout)
+        return finished
+
+    def _finish(self, _curl, transport_error):
+        self._multi.remove_handle(_curl)
+        pending_request = self._in_flight.pop(_curl)
+        pending_request.transport_error = transport_error
+        self.logger.debug(
+            "Test %s finished, in flight: %d", pending_request.test_number, len(self._in_flight)
+        )
+        return pending_request
+
+    def close(self):
+        """
+        Aborts the unfinished transfers and releases the multi handle
+        """
+        for _curl in list(self._in_flight):
+            self._multi.remove_handle(_curl)
+        self._in_flight.clear()
+        self._delayed.clear()
+        self._multi.close()
@@ -0,0 +1,60 @@
+from random import SystemRandom
+
+# errors before the request reached the target, sending it again does not repeat the test. The timeouts, empty replies
+# and receive errors (28, 52, 56) usually mean that the payload crashed or hung the target, they are retried only if
+# asked for. The libcurl error codes are listed instead of the pycurl constants, so the CLI help does not need to import
+# pycurl.
+DEFAULT_RETRY_ERRORS = (
+    7,  # pycurl.E_COULDNT_CONNECT
+    55,  # pycurl.E_SEND_ERROR
+)
+# errors which are retried only if nothing was uploaded, otherwise the target may have processed the request
+UNSENT_ONLY_ERRORS = frozenset((55,))
+
+
+class RetryPolicy(object):
+    """
+    Decides whether a request which failed on transport level is sent again and how long to wait before it.
+    The wait time grows exponentially with the number of retries, a random part of it is used (full jitter), so the
+    retries of the concurrent requests don't hit the target at the same time.
+    """
+
+    def __init__(self, max_retries=2, retry_on=DEFAULT_RETRY_ERRORS, backoff_base=0.1, backoff_max=5.0):
+        """
+        :param max_retries: number of times a request is sent again, 0 disables retries
+        :type max_retries: int
+        :param retry_on: pycurl error codes the request is retried on
+        :type retry_on: tuple
+        :param backoff_base: upper limit of the wait time in seconds before the first retry
+        :type backoff_base: float
+        :param backoff_max: upper limit of the wait time in seconds before any retry
+        :type backoff_max: float
+        """
+        self.max_retries = max_retries
+        self.retry_on = frozenset(retry_on)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._random = SystemRandom()
+
+    def should_retry(self, error, retries, uploaded=0):
+        """
+        :param error: error reported by pycurl
+        :type error: pycurl.error
+        :param retries: number of retries of the request so far
+        :type retries: int
+        :param uploaded: bytes of the request uploaded before the error
+        :type uploaded: int
+        :rtype: bool
+        """
+        if retries >= self.max_retries or not error.args or error.args[0] not in self.retry_on:
+            return False
+        return not uploaded or error.args[0] not in UNSENT_ONLY_ERRORS
+
+    def backoff(self, retries):
+        """
+        :param retries: number of retries of the request so far
+        :type retries: int
+        :return: seconds to wait before the next retry
+        :rtype: float
+        """
+        return self._random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** retries))
@@ -0,0 +1,46 @@
+import re
+
+
+class CurlValueSanitizer(object):
+    """
+    Keeps the longest part of a fuzz value pycurl accepts, in one pass over the value.
+    pycurl rejects a value because of single characters (e.g. embedded null byte, or not ASCII character in the url),
+    so the result is the part after the last rejected character, or if the value ends with a rejected character,
+    the part before the first one. This is the same what removing the characters one by one from the left, then from
+    the right until pycurl.setopt accepts the value would produce.
+    """
+
+    def __init__(self, rejected_chars):
+        """
+        :param rejected_chars: regular expression character set of the characters pycurl rejects
+        :type rejected_chars: str
+        """
+        self._rejected = re.compile(f"[{rejected_chars}]")
+
+    def is_valid(self, value):
+        """
+        :type value: str
+        :rtype: bool
+        """
+        return self._rejected.search(value) is None
+
+    def sanitize(self, value):
+        """
+        :param value: fuzz value
+        :type value: str
+        :return: the longest accepted part of the value
+        :rtype: str
+        """
+        first = self._rejected.search(value)
+        if first is None:
+            return value
+        after_last = len(value) - self._rejected.search(value[::-1]).start()
+        if after_last < len(value):
+            return value[after_last:]
+        return value[:first.start()]
+
+
+# pycurl encodes the url to ASCII
+URL_SANITIZER = CurlValueSanitizer("\x00\x80-\U0010ffff")
+# headers are encoded to UTF-8, surrogates can't be encoded
+HEADER_SANITIZER = CurlValueSanitizer("\x00\ud800-\udfff")
@@ -0,0 +1,107 @@
+import re
+import xml.etree.ElementTree as ET
+from time import time
+from xml.sax.saxutils import quoteattr
+
+from junit_xml import TestSuite, TestCase
+
+from apifuzzer.utils import get_logger
+
+NO_TEST_CASE_NAME = "Fuzz test succeed"
+
+# characters XML does not allow, the same ranges which junit_xml removes from the reports it builds at once
+ILLEGAL_XML_RANGES = [(0x00, 0x08), (0x0B, 0x1F), (0x7F, 0x84), (0x86, 0x9F), (0xD800, 0xDFFF), (0xFDD0, 0xFDDF)] + [
+    (plane + 0xFFFE, plane + 0xFFFF) for plane in range(0, 0x110000, 0x10000)
+]
+ILLEGAL_XML_CHARS = re.compile("[{}]".format("".join(f"{chr(low)}-{chr(high)}" for low, high in ILLEGAL_XML_RANGES)))
+
+
+class JUnitStreamWriter(object):
+    """
+    Writes the test cases to the JUnit XML report as the tests finish, so the memory usage does not depend on the
+    number of tests and the finished test cases are on the disk even if the fuzzer is killed.
+    The counters of the test suite are known only when the report is closed, so the opening tags are padded with
+    spaces and overwritten in place with the final values.
+    """
+
+    # room for the growth of the counters in the opening tags
+    HEADER_PADDING = 64
+
+    def __init__(self, path, suite_name="API Fuzzer"):
+        """
+        :param path: path of the JUnit XML report
+        :type path: str
+        :param suite_name: name of the test suite
+        :type suite_name: str
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.path = path
+        self.suite_name = suite_name
+        self.timestamp = time()
+        self.tests = 0
+        self.failures = 0
+        self.errors = 0
+        self.elapsed_sec = 0.0
+        self._file = open(path, "wb")
+        self._file.write(b'<?xml version="1.0" encoding="utf-8"?>\n')
+        self._header_offset = self._file.tell()
+        self._tag_widths = None
+        self._file.write(self._header())
+        self._file.flush()
+
+    @staticmethod
+    def _tag(name, attributes):
+        return "<{} {}".format(name, " ".join("{}={}".format(key, quoteattr(str(value))) for key, value in attributes))
+
+    def _header(self):
+        counters = [
+            ("errors", self.errors),
+            ("failures", self.failures),
+            ("skipped", 0),
+            ("tests", self.tests),
+            ("time", round(self.elapsed_sec, 6)),
+        ]
+        tags = [
+            self._tag("testsuites", [("disabled", 0)] + counters),
+            self._tag(
+                "testsuite", [("disabled", 0), ("name", self.suite_name), ("timestamp", self.timestamp)] + counters
+            ),
+        ]
+        if self._tag_widths is None:
+            self._tag_widths = [len(tag) + self.HEADER_PADDING for tag in tags]
+        # the header is rewritten in place, so the tags keep their original width
+        return "{}>\n\t{}>\n".format(*(tag.ljust(width) for tag, width in zip(tags, self._tag_widths))).encode("utf-8")
+
+    def add(self, test_case):
+        """
+        Appends the test case to the report
+        :type test_case: junit_xml.TestCase
+        """
+        if self._file is None:
+            self.logger.warning("JUnit report is already closed, %s is not saved", test_case.name)
+            return
+        # junit_xml builds the element, so the test cases look the same as in the report built at once
+        element = TestSuite(name=self.suite_name, test_cases=[test_case]).build_xml_doc().find("testcase")
+        # fuzz values often contain characters XML does not allow
+        test_case_xml = ILLEGAL_XML_CHARS.sub("", ET.tostring(element, encoding="unicode"))
+        self._file.write("\t\t{}\n".format(test_case_xml).encode("utf-8"))
+        self._file.flush()
+        self.tests += 1
+        self.failures += int(test_case.is_failure())
+        self.errors += int(test_case.is_error())
+        self.elapsed_sec += test_case.elapsed_sec or 0
+
+    def close(self):
+        """
+        Closes the XML document and writes the final counters
+        """
+        if self._file is None:
+            return
+        if not self.tests:
+            self.add(TestCase(name=NO_TEST_CASE_NAME, status="Pass"))
+        self._file.write(b"\t</testsuite>\n</testsuites>\n")
+        self._file.seek(self._header_offset)
+        self._file.write(self._header())
+        self._file.close()
+        self._file = None
+        self.logger.info("JUnit report saved to %s", self.path)
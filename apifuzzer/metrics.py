@@ -0,0 +1,307 @@
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from apifuzzer.utils import get_logger
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (0, 64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+DEFAULT_TEXTFILE_INTERVAL = 10
+# the textfile collector of the node exporter usually runs as another user
+TEXTFILE_MODE = 0o644
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class Counter(object):
+    """
+    Monotonic counter with optional labels. The label values are kept as they are passed (e.g. the status code as
+    int) and converted to string only when the metrics are rendered, so updating a counter is a dictionary update.
+    """
+
+    type_name = "counter"
+
+    def __init__(self, name, description, labelnames=()):
+        """
+        :param name: metric name
+        :type name: str
+        :param description: help text
+        :type description: str
+        :param labelnames: names of the labels, the values are passed in the same order to inc
+        :type labelnames: tuple
+        """
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values = dict()
+
+    def inc(self, labels=(), amount=1):
+        """
+        :param labels: label values
+        :type labels: tuple
+        """
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def get(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        """
+        :return: name suffix, label names, label values and value of the samples
+        :rtype: list
+        """
+        # the copy is made while the GIL is held, the fuzzer thread may update the counter meanwhile
+        return [("", self.labelnames, labels, value) for labels, value in list(self._values.items())]
+
+
+class Histogram(object):
+    """
+    Histogram with fixed buckets and optional labels
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name, description, buckets, labelnames=()):
+        """
+        :param buckets: upper bounds of the buckets in increasing order, +Inf is added
+        :type buckets: tuple
+        """
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = dict()
+
+    def observe(self, value, labels=()):
+        """
+        :param labels: label values
+        :type labels: tuple
+        """
+        state = self._values.get(labels)
+        if state is None:
+            # count of each bucket (not cumulative) and the sum of the observed values
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def count(self, labels=()):
+        state = self._values.get(labels)
+        return sum(state[0]) if state else 0
+
+    def samples(self):
+        samples = list()
+        bucket_labelnames = self.labelnames + ("le",)
+        for labels, (counts, total) in list(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), list(counts)):
+                cumulative += count
+                samples.append(("_bucket", bucket_labelnames, labels + (_format_value(bound),), cumulative))
+            samples.append(("_sum", self.labelnames, labels, total))
+            samples.append(("_count", self.labelnames, labels, cumulative))
+        return samples
+
+
+class MetricsRegistry(object):
+    """
+    Metrics of a fuzzer process rendered in the Prometheus text format
+    """
+
+    def __init__(self, const_labels=None):
+        """
+        :param const_labels: labels added to every sample, e.g. the shard of the tests
+        :type const_labels: dict
+        """
+        self.const_labels = dict(const_labels or {})
+        self._metrics = list()
+
+    def counter(self, name, description, labelnames=()):
+        return self._register(Counter(name, description, labelnames))
+
+    def histogram(self, name, description, buckets, labelnames=()):
+        return self._register(Histogram(name, description, buckets, labelnames))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        :return: metrics in the Prometheus text exposition format
+        :rtype: str
+        """
+        const_names = tuple(self.const_labels)
+        const_values = tuple(self.const_labels.values())
+        lines = list()
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for suffix, names, values, value in metric.samples():
+                labels = _format_labels(const_names + names, const_values + values)
+                lines.append(f"{metric.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class FuzzMetrics(object):
+    """
+    Throughput and health metrics of the fuzzing, updated by FuzzerTarget
+    """
+
+    def __init__(self, registry=None):
+        """
+        :type registry: MetricsRegistry
+        """
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self.requests = self.registry.counter(
+            "apifuzzer_requests_total", "Fuzz requests by template, method and response status code",
+            ("template", "method", "status"),
+        )
+        self.tests = self.registry.counter("apifuzzer_tests_total", "Finished tests by result", ("result",))
+        self.transport_errors = self.registry.counter(
+            "apifuzzer_transport_errors_total", "Requests failed to be sent by pycurl error code", ("code",)
+        )
+        self.request_latency = self.registry.histogram(
+            "apifuzzer_request_latency_seconds", "Response time of the fuzz requests", LATENCY_BUCKETS
+        )
+        self.payload_size = self.registry.histogram(
+            "apifuzzer_request_payload_bytes", "Size of the body of the fuzz requests", SIZE_BUCKETS
+        )
+        self.report_write_latency = self.registry.histogram(
+            "apifuzzer_report_write_seconds", "Time of saving a test report", LATENCY_BUCKETS
+        )
+
+
+class MetricsServer(object):
+    """
+    Serves the metrics on /metrics in a background thread
+    """
+
+    def __init__(self, registry, port, host="127.0.0.1"):
+        """
+        :type registry: MetricsRegistry
+        :param port: port to listen on, a free port is picked if 0
+        :type port: int
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.registry = registry
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def _handler_class(self):
+        metrics_server = self
+
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics_server.registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # pylint: disable=W0622
+                metrics_server.logger.debug(format, *args)
+
+        return MetricsRequestHandler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="APIFuzzer-metrics", daemon=True)
+        self._thread.start()
+        self.logger.info("Metrics are served on http://%s:%d/metrics", *self.server.server_address)
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self.server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server.server_close()
+
+
+class TextfileExporter(object):
+    """
+    Writes the metrics to a file periodically and at the end of the run, e.g. for the textfile collector of the
+    Prometheus node exporter. The file is replaced atomically, so the collector never reads a partial file.
+    """
+
+    def __init__(self, registry, path, interval=DEFAULT_TEXTFILE_INTERVAL):
+        """
+        :type registry: MetricsRegistry
+        :param path: path of the metrics file
+        :type path: str
+        :param interval: seconds between the writes
+        :type interval: float
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def write(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".metrics_", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                # mkstemp creates the file readable by the owner only, the mode is kept by the replace
+                os.fchmod(f.fileno(), TEXTFILE_MODE)
+                f.write(self.registry.render())
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                self.logger.warning("Failed to write the metrics to %s: %s", self.path, e)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="APIFuzzer-metrics-textfile", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+        self.write()
+
+
+def shard_path(path, index):
+    """
+    :return: path of the metrics file of the shard, the index is added before the extension
+    :rtype: str
+    """
+    stem, extension = os.path.splitext(path)
+    return f"{stem}_{index}{extension}"
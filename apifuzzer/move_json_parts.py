@@ -1,4 +1,31 @@
-from apifuzzer.utils import pretty_print, get_logger
+from apifuzzer.utils import get_logger
+
+# the result of the frame is appended to the list of the parent instead of saving it with a key
+_LIST_ITEM = object()
+# the dictionaries nested deeper are resolved with the explicit stack instead of recursive calls
+MAX_RECURSION_DEPTH = 100
+
+
+class _Frame(object):
+    """
+    State of resolving one dictionary: the pass over its items which is in progress and the place of the result in
+    the parent
+    """
+
+    __slots__ = ("items", "result", "moved_keys", "resolved_keys", "list_items", "append_item", "key")
+
+    def __init__(self, data, key=_LIST_ITEM):
+        self.items = iter(data.items())
+        self.result = dict()
+        # keys of the sections moved up in this pass, None if no section was found
+        self.moved_keys = None
+        # in the passes after the first one only the moved up items have to be resolved, the rest is resolved already
+        self.resolved_keys = None
+        # list value of the item being processed
+        self.list_items = None
+        self.append_item = None
+        # key of the parent where the result is saved
+        self.key = key
 
 
 class JsonSectionAbove:
@@ -11,48 +38,145 @@ class JsonSectionAbove:
         self.api_definition = api_definition
         self.section_to_up = section_to_up
 
-    def _resolve(self, data):
-        schema_fount = False
-        self.logger.debug(f"Processing {pretty_print(data, 50)}")
-        if isinstance(data, dict):
-            return_data = dict()
-            for key, value in data.items():
-                self.logger.debug(f"Checking {key} - {pretty_print(value, 50)}")
-                if key == self.section_to_up and value:
-                    schema_fount = True
-                    if isinstance(value, dict):
-                        return_data.update(value)
-                    else:
-                        return_data = value
-                    self.logger.debug(f"Processed {key} -> {pretty_print(return_data)}")
-                elif isinstance(value, dict):
-                    self.logger.debug(f"Process dict {key}")
-                    return_data[key] = self.resolve(value)
-                elif isinstance(value, list):
-                    if not return_data.get(key):
-                        return_data[key] = list()
-                    for _iter, val in enumerate(value):
-                        self.logger.debug(f"Process {key} list elem: {_iter}")
-                        return_data[key].append(self.resolve(data=val))
-
-                else:
-                    return_data[key] = value
-                self.logger.debug(
-                    f"Processed: {key} -> {pretty_print(return_data, 100)}"
-                )
-        else:
-            return_data = data
-        return [return_data, schema_fount]
-
     def resolve(self, data=None):
+        """
+        Moves the content of the sections (schema by default) one level up, until no section is left. The dictionaries
+        are copied, the lists of the dictionaries are resolved item by item.
+        The definition is walked once, only the moved up items of a dictionary are resolved after its section was moved
+        up.
+        """
         self.logger.info("Resolving schema references")
         if data is None:
             data = self.api_definition
-        resolved_in_this_iteration = True
-
-        iteration = 1
-        while resolved_in_this_iteration:
-            self.logger.debug(f"{iteration} resolving reference")
-            data, resolved_in_this_iteration = self._resolve(data)
-            iteration += 1
-        return data
+        if not isinstance(data, dict):
+            return data
+        return self._resolve_dict(data, 0)
+
+    def _resolve_dict(self, data, depth):
+        """
+        Resolves the dictionary with recursive calls, which are cheaper than the frames of the explicit stack for the
+        usual definitions. The dictionaries nested deeper than MAX_RECURSION_DEPTH are resolved with the stack.
+        """
+        if depth >= MAX_RECURSION_DEPTH:
+            return self._resolve_with_stack(data)
+        section_to_up = self.section_to_up
+        resolve_dict = self._resolve_dict
+        depth += 1
+        result = dict()
+        moved_keys = None
+        for key, value in data.items():
+            if key == section_to_up and value:
+                if moved_keys is None:
+                    moved_keys = set()
+                if isinstance(value, dict):
+                    result.update(value)
+                    moved_keys.update(value)
+                else:
+                    result = value
+            elif isinstance(value, dict):
+                result[key] = resolve_dict(value, depth)
+            elif isinstance(value, list):
+                if not result.get(key):
+                    result[key] = list()
+                if value:
+                    append_item = result[key].append
+                    for item in value:
+                        append_item(resolve_dict(item, depth) if isinstance(item, dict) else item)
+            else:
+                result[key] = value
+        if moved_keys is None or not isinstance(result, dict):
+            return result
+        if section_to_up in moved_keys:
+            # rare: the moved up section contains a section, the result is resolved again
+            return resolve_dict(result, depth)
+        # the moved up values are resolved in place, the order of the keys does not change
+        for key in moved_keys:
+            value = result[key]
+            if isinstance(value, dict):
+                result[key] = resolve_dict(value, depth)
+            elif isinstance(value, list):
+                result[key] = [resolve_dict(item, depth) if isinstance(item, dict) else item for item in value]
+        return result
+
+    def _resolve_with_stack(self, data):
+        """
+        Resolves the dictionary with an explicit stack, so the depth of the definition is not limited by the recursion
+        limit
+        """
+        section_to_up = self.section_to_up
+        stack = [_Frame(data)]
+        frame = stack[-1]
+        while True:
+            child = None
+            result = frame.result
+            if frame.list_items is not None:
+                # continue the list where the previous child was found
+                append_item = frame.append_item
+                for item in frame.list_items:
+                    if isinstance(item, dict):
+                        child = _Frame(item)
+                        break
+                    append_item(item)
+                else:
+                    frame.list_items = frame.append_item = None
+            if child is None:
+                resolved_keys = frame.resolved_keys
+                for key, value in frame.items:
+                    if key == section_to_up and value:
+                        if frame.moved_keys is None:
+                            frame.moved_keys = set()
+                        if isinstance(value, dict):
+                            result.update(value)
+                            frame.moved_keys.update(value)
+                        else:
+                            result = frame.result = value
+                    elif resolved_keys is not None and key in resolved_keys:
+                        # resolved in the previous pass
+                        if isinstance(value, list):
+                            if not result.get(key):
+                                result[key] = list()
+                            if value:
+                                result[key].extend(value)
+                        else:
+                            result[key] = value
+                    elif isinstance(value, dict):
+                        child = _Frame(value, key)
+                        break
+                    elif isinstance(value, list):
+                        if not result.get(key):
+                            result[key] = list()
+                        if not value:
+                            continue
+                        append_item = result[key].append
+                        list_items = iter(value)
+                        for item in list_items:
+                            if isinstance(item, dict):
+                                child = _Frame(item)
+                                frame.list_items = list_items
+                                frame.append_item = append_item
+                                break
+                            append_item(item)
+                        if child is not None:
+                            break
+                    else:
+                        result[key] = value
+            if child is not None:
+                stack.append(child)
+                frame = child
+                continue
+            if frame.moved_keys is not None and isinstance(result, dict):
+                # the moved up sections may contain dictionaries and sections to resolve
+                frame.items = iter(result.items())
+                frame.resolved_keys = result.keys() - frame.moved_keys
+                frame.result = dict()
+                frame.moved_keys = None
+                continue
+            stack.pop()
+            if not stack:
+                return result
+            parent = stack[-1]
+            if frame.key is _LIST_ITEM:
+                parent.append_item(result)
+            else:
+                parent.result[frame.key] = result
+            frame = parent
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import zlib
+
+from apifuzzer.utils import get_logger
+from apifuzzer.version import get_version
+
+MAGIC = b"APIFCRP2"
+# position of the offset table and of the index
+HEADER = struct.Struct("<QQ")
+OFFSET = struct.Struct("<Q")
+# start and end of a record, two consecutive items of the offset table
+RECORD_RANGE = struct.Struct("<QQ")
+# the records are small and read one by one, decompression speed matters more than size
+COMPRESS_LEVEL = 1
+
+
+def corpus_key(templates, seed):
+    """
+    :param templates: templates of the API definition
+    :type templates: list of BaseTemplate
+    :param seed: seed of the run, the field types and the random mutations depend on it
+    :type seed: int
+    :return: key of the corpus of the templates, it changes if the API definition or the seed changes
+    :rtype: str
+    """
+    digest = hashlib.sha256("\n".join((get_version(), str(seed))).encode())
+    for template in templates:
+        digest.update(json.dumps(template.to_dict(), sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class MutationCorpus(object):
+    """
+    Rendered payloads and kitty test information of every test of the templates in a memory-mapped file, so the
+    kitty templates are not mutated and rendered again in the later runs of the same templates with the same seed.
+    The file starts with the position of the offset table and of the index, the records are followed by the offset
+    table which has two records (payload and test info) for the unmodified template and for each mutation of the
+    templates, the index at the end tells the first record and the kitty structure of each template.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: corpus file written by build
+        :type path: str
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.path = path
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[:len(MAGIC)] != MAGIC:
+            self._data.close()
+            raise ValueError(f"{path} is not a mutation corpus")
+        self._offsets, index_position = HEADER.unpack_from(self._data, len(MAGIC))
+        # template name -> number of its first test, number of mutations and structure of the unmodified template
+        # the corpus is written by the user running the fuzzer, it is as trusted as the API definition
+        self.templates = pickle.loads(self._data[index_position:])  # nosec B301
+
+    @classmethod
+    def load_or_build(cls, corpus_dir, templates, seed):
+        """
+        :param corpus_dir: directory of the corpus files
+        :type corpus_dir: str
+        :type templates: list of BaseTemplate
+        :type seed: int
+        :rtype: MutationCorpus
+        """
+        logger = get_logger(cls.__name__)
+        path = os.path.join(corpus_dir, f"{corpus_key(templates, seed)}.corpus")
+        try:
+            corpus = cls(path)
+            logger.info("Mutation corpus loaded from %s", path)
+            return corpus
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("Failed to load mutation corpus from %s, building it again: %s", path, e)
+        cls.build(path, templates)
+        logger.info("Mutation corpus saved to %s", path)
+        return cls(path)
+
+    @staticmethod
+    def build(path, templates):
+        """
+        Mutates and renders every test of the templates and writes them to the corpus file
+        :param path: corpus file
+        :type path: str
+        :type templates: list of BaseTemplate
+        """
+        # the kitty fuzzer is imported here, the corpus is built before the fuzzer starts
+        from apifuzzer.server_fuzzer import render_template_fields
+
+        logger = get_logger(MutationCorpus.__name__)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(MAGIC + HEADER.pack(0, 0))
+                offsets = list()
+                index = dict()
+
+                def write_test(kitty_template):
+                    for record in render_template_fields(kitty_template, logger), kitty_template.get_info():
+                        offsets.append(f.tell())
+                        f.write(zlib.compress(pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL), COMPRESS_LEVEL))
+
+                for template in templates:
+                    kitty_template = template.compile_template()
+                    # the fields are shared with the templates of the model
+                    kitty_template.reset()
+                    first = len(offsets) // 2
+                    write_test(kitty_template)
+                    while kitty_template.mutate():
+                        write_test(kitty_template)
+                    kitty_template.reset()
+                    index[template.name] = (first, len(offsets) // 2 - first - 1, kitty_template.get_structure())
+                offsets.append(f.tell())
+                offsets_position = f.tell()
+                f.write(b"".join(OFFSET.pack(offset) for offset in offsets))
+                index_position = f.tell()
+                f.write(pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL))
+                f.seek(len(MAGIC))
+                f.write(HEADER.pack(offsets_position, index_position))
+            # concurrent runs see either the complete file or none
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def num_mutations(self, template_name):
+        return self.templates[template_name][1]
+
+    def structure(self, template_name):
+        """
+        :return: kitty structure of the unmodified template, the mutation indexes of its fields are not set
+        :rtype: dict
+        """
+        return self.templates[template_name][2]
+
+    def _record(self, number):
+        start, end = RECORD_RANGE.unpack_from(self._data, self._offsets + OFFSET.size * number)
+        return pickle.loads(zlib.decompress(self._data[start:end]))  # nosec B301
+
+    def payload(self, template_name, index):
+        """
+        :param index: index of the mutation, -1 is the unmodified template
+        :type index: int
+        :return: rendered url, method and fields of the test
+        :rtype: dict
+        """
+        return self._record((self.templates[template_name][0] + index + 1) * 2)
+
+    def info(self, template_name, index):
+        """
+        :param index: index of the mutation, -1 is the unmodified template
+        :type index: int
+        :return: kitty information of the template at the test
+        :rtype: dict
+        """
+        return self._record((self.templates[template_name][0] + index + 1) * 2 + 1)
+
+    def close(self):
+        self._data.close()
@@ -1,13 +1,16 @@
 import json
+from random import Random
 from urllib.parse import urlparse
 
 from json_ref_dict import materialize, RefDict
 
 from apifuzzer.base_template import BaseTemplate
+from apifuzzer.custom_fuzzers import SEEDED_FIELD_TYPES
 from apifuzzer.fuzz_utils import _get_sample_data_by_type, get_fuzz_type_by_param_type
 from apifuzzer.move_json_parts import JsonSectionAbove
+from apifuzzer.spec_loader import clear_document_cache
 from apifuzzer.template_generator_base import TemplateGenerator
-from apifuzzer.utils import transform_data_to_bytes, pretty_print, get_logger
+from apifuzzer.utils import transform_data_to_bytes, pretty_print, get_logger, LazyString
 
 
 class ParamTypes(object):
@@ -25,30 +28,50 @@ class OpenAPITemplateGenerator(TemplateGenerator):
     discovered.
     """
 
-    def __init__(self, api_definition_url, api_definition_file):
+    def __init__(self, api_definition_url, api_definition_file, spec_cache=None, seed=None):
         """
         :param api_definition_file: API resources local file
         :type api_definition_file: str
         :param api_definition_url: URL where the request should be sent
         :type api_definition_url: str
+        :param spec_cache: cache of the resolved API definitions, the definition is always resolved if not set
+        :type spec_cache: apifuzzer.spec_cache.SpecCache
+        :param seed: seed of the field type choices and of the random fields, SystemRandom is used if not set
+        :type seed: int
         """
         super().__init__()
-        self.templates = set()
+        self.random = Random(seed) if seed is not None else None
+        # templates by name in the order they were created
+        self._templates = dict()
         self.logger = get_logger(self.__class__.__name__)
         self.api_definition_url = api_definition_url
         self.api_definition_file = api_definition_file
-        tmp_api_resources = self.resolve_json_references()
-        self.json_formatter = JsonSectionAbove(tmp_api_resources)
-        self.api_resources = self.json_formatter.resolve()
+        if spec_cache:
+            self.api_resources = spec_cache.get(self.api_definition_reference, self.resolve_api_definition)
+        else:
+            self.api_resources = self.resolve_api_definition()
 
-    def resolve_json_references(self):
+    @property
+    def api_definition_reference(self):
         if self.api_definition_url:
-            reference = self.api_definition_url
-        else:
-            reference = self.api_definition_file
-        ref = RefDict(reference)
+            return self.api_definition_url
+        return self.api_definition_file
+
+    def resolve_json_references(self):
+        """
+        The documents are parsed by apifuzzer.spec_loader, each of them once
+        """
+        clear_document_cache()
+        ref = RefDict(self.api_definition_reference)
         return materialize(ref)
 
+    def resolve_api_definition(self):
+        """
+        :return: API definition with the references resolved and the schema sections moved up
+        :rtype: dict
+        """
+        return JsonSectionAbove(self.resolve_json_references()).resolve()
+
     @staticmethod
     def _normalize_url(url_in):
         """
@@ -61,6 +84,14 @@ class OpenAPITemplateGenerator(TemplateGenerator):
         """
         return url_in.strip("/").replace("/", "+")
 
+    @property
+    def templates(self):
+        """
+        :return: the templates with at least one field
+        :rtype: list of BaseTemplate
+        """
+        return list(self._templates.values())
+
     def _get_template(self, template_name):
         """
         Starts new template if it does not exist yet or retrun the existing one which has the required name
@@ -68,25 +99,15 @@ class OpenAPITemplateGenerator(TemplateGenerator):
         :type template_name: str
         :return: instance of BaseTemplate
         """
-        _return = None
-        for template in self.templates:
-            self.logger.debug(f"Checking {template.name} vs {template_name}")
-            if template.name == template_name:
-                self.logger.debug(f"Loading existing template: {template.name}")
-                _return = template
-        if not _return:
-            self.logger.debug(f"Open new Fuzz template for {template_name}")
-            _return = BaseTemplate(name=template_name)
-        return _return
+        template = self._templates.get(template_name)
+        if template is None:
+            self.logger.debug("Open new Fuzz template for %s", template_name)
+            template = BaseTemplate(name=template_name)
+        return template
 
     def _save_template(self, template):
-        if template in self.templates:
-            self.logger.debug(f"Removing previous version of {template.name}")
-            self.templates.remove(template)
-        self.templates.add(template)
-        self.logger.debug(
-            f"Adding template to list: {template.name}, templates list: {len(self.templates)}"
-        )
+        self._templates[template.name] = template
+        self.logger.debug("Adding template to list: %s, templates list: %d", template.name, len(self._templates))
 
     @staticmethod
     def _split_content_type(content_type):
@@ -102,125 +123,111 @@ class OpenAPITemplateGenerator(TemplateGenerator):
         else:
             return content_type
 
-    def process_api_resources(
-        self, paths=None, existing_template=None
-    ):  # pylint: disable=W0221
+    def process_api_resources(self):
         self.logger.info("Start preparation")
         self._process_request_body()
         self._process_api_resources()
 
     def _process_request_body(self):
+        """
+        Opens a template for each content type of the request bodies, the template contains the fields of the body
+        in the given content type
+        """
         paths = self.api_resources["paths"]
-        request_body_paths = dict()
         for resource in paths.keys():
             normalized_url = self._normalize_url(resource)
-            if not request_body_paths.get(resource):
-                request_body_paths[resource] = dict()
             for method in paths[resource].keys():
-                if not request_body_paths[resource].get(method):
-                    request_body_paths[resource][method] = dict()
-                for content_type in (
-                    paths[resource][method].get("requestBody", {}).get("content", [])
-                ):
+                content = paths[resource][method].get("requestBody", {}).get("content", {})
+                for content_type in content:
                     # as multiple content types can exist here, we need to open up new template
                     template_name = f"{normalized_url}|{method}-{self._split_content_type(content_type)}"
-                    self.logger.info(
-                        f"Resource: {resource} Method: {method}, CT: {content_type}"
-                    )
+                    self.logger.info("Resource: %s Method: %s, CT: %s", resource, method, content_type)
                     template = self._get_template(template_name)
-                    template.url = normalized_url
-                    template.method = method.upper()
                     template.content_type = content_type
-                    if not request_body_paths[resource][method].get("parameters"):
-                        request_body_paths[resource][method]["parameters"] = []
-                    for k, v in paths[resource][method]["requestBody"]["content"][
-                        content_type
-                    ].items():
-                        request_body_paths[resource][method]["parameters"].append(
-                            {"in": "body", k: v}
-                        )
-                    self._process_api_resources(
-                        paths=request_body_paths, existing_template=template
-                    )
+                    body_parameters = [{"in": "body", k: v} for k, v in content[content_type].items()]
+                    self._process_operation(resource, method, {"parameters": body_parameters}, template)
 
-    def _process_api_resources(self, paths=None, existing_template=None):
-        if paths is None:
-            paths = self.api_resources.get("paths")
+    def _process_api_resources(self):
+        paths = self.api_resources.get("paths")
         for resource in paths.keys():
             normalized_url = self._normalize_url(resource)
             for method in paths[resource].keys():
-                self.logger.info("Resource: {} Method: {}".format(resource, method))
-                if existing_template:
-                    template = existing_template
-                    template_name = existing_template.name
-                else:
-                    template_name = "{}|{}".format(normalized_url, method)
-                    template = self._get_template(template_name)
-                template.url = normalized_url
-                template.method = method.upper()
-                # Version 2: Set content type (POST, PUT method)
-                if len(paths[resource][method].get("consumes", [])):
-                    template.content_type = paths[resource][method]["consumes"][0]
-
-                for param in list(paths[resource][method].get("parameters", {})):
-                    if not isinstance(param, dict):
-                        self.logger.warning(
-                            "{} type mismatch, dict expected, got: {}".format(
-                                param, type(param)
-                            )
-                        )
-                        param = json.loads(param)
-
-                    if param.get("type"):
-                        parameter_data_type = param.get("type")
-                    else:
-                        parameter_data_type = "string"
-                    param_format = param.get("format")
-
-                    if param.get("example"):
-                        sample_data = param.get("example")
-                    elif param.get("default"):
-                        sample_data = param.get("default")
-                    else:
-                        sample_data = _get_sample_data_by_type(param.get("type"))
-
-                    parameter_place_in_request = param.get("in")
-                    parameters = list()
-                    if param.get("name"):
-                        param_name = f'{template_name}|{param.get("name")}'
-                        parameters.append(
-                            {"name": param_name, "type": parameter_data_type}
-                        )
-                    for _param in param.get("properties", []):
-                        param_name = f"{template_name}|{_param}"
-                        parameter_data_type = (
-                            param.get("properties", {})
-                                .get(_param)
-                                .get("type", "string")
-                        )
-                        self.logger.debug(
-                            f"Adding property: {param_name} with type: {parameter_data_type}"
-                        )
-                        parameters.append(self._get_additional_parameters(_param, param, param_name,
-                                                                          parameter_data_type))
-                    for _parameter in parameters:
-                        param_name = _parameter.get("name")
-                        parameter_data_type = _parameter.get("type")
-                        fuzzer_type = self._get_fuzzer_type(_parameter, param_format, parameter_data_type)
-                        fuzz_type = get_fuzz_type_by_param_type(fuzzer_type)
-                        sample_data = self._get_sample_data(_parameter, fuzz_type, sample_data)
-
-                        self.logger.info(
-                            f"Resource: {resource} Method: {method} \n Parameter: {param} \n"
-                            f" Parameter place: {parameter_place_in_request} \n Sample data: {sample_data}"
-                            f"\n Param name: {param_name}\n fuzzer_type: {fuzzer_type} "
-                            f"fuzzer: {fuzz_type.__name__}"
-                        )
-
-                        self._add_field_to_param(fuzz_type, param, param_name, parameter_place_in_request, sample_data,
-                                                 template)
-                if template.get_stat() > 0:
-                    self._save_template(template)
+                template = self._get_template("{}|{}".format(normalized_url, method))
+                self._process_operation(resource, method, paths[resource][method], template)
+
+    def _process_operation(self, resource, method, operation, template):
+        """
+        Adds the parameters of the operation to the template, the template is saved if it has any field
+        :param resource: path of the operation in the API definition
+        :type resource: str
+        :param method: HTTP method
+        :type method: str
+        :param operation: definition of the operation, only the parameters and consumes keys are used
+        :type operation: dict
+        :param template: template of the operation
+        :type template: BaseTemplate
+        """
+        self.logger.info("Resource: %s Method: %s", resource, method)
+        template_name = template.name
+        template.url = self._normalize_url(resource)
+        template.method = method.upper()
+        # Version 2: Set content type (POST, PUT method)
+        if len(operation.get("consumes", [])):
+            template.content_type = operation["consumes"][0]
+
+        for param in list(operation.get("parameters", {})):
+            if not isinstance(param, dict):
+                self.logger.warning("%s type mismatch, dict expected, got: %s", param, type(param))
+                param = json.loads(param)
+
+            if param.get("type"):
+                parameter_data_type = param.get("type")
+            else:
+                parameter_data_type = "string"
+            param_format = param.get("format")
+
+            if param.get("example"):
+                sample_data = param.get("example")
+            elif param.get("default"):
+                sample_data = param.get("default")
+            else:
+                sample_data = _get_sample_data_by_type(param.get("type"))
+
+            parameter_place_in_request = param.get("in")
+            parameters = list()
+            if param.get("name"):
+                param_name = f'{template_name}|{param.get("name")}'
+                parameters.append(
+                    {"name": param_name, "type": parameter_data_type}
+                )
+            for _param in param.get("properties", []):
+                param_name = f"{template_name}|{_param}"
+                parameter_data_type = (
+                    param.get("properties", {})
+                        .get(_param)
+                        .get("type", "string")
+                )
+                self.logger.debug("Adding property: %s with type: %s", param_name, parameter_data_type)
+                parameters.append(self._get_additional_parameters(_param, param, param_name,
+                                                                  parameter_data_type))
+            for _parameter in parameters:
+                param_name = _parameter.get("name")
+                parameter_data_type = _parameter.get("type")
+                fuzzer_type = self._get_fuzzer_type(_parameter, param_format, parameter_data_type)
+                fuzz_type = get_fuzz_type_by_param_type(fuzzer_type, self.random)
+                sample_data = self._get_sample_data(_parameter, fuzz_type, sample_data)
+
+                self.logger.info(
+                    "Resource: %s Method: %s \n Parameter: %s \n Parameter place: %s \n Sample data: %s"
+                    "\n Param name: %s\n fuzzer_type: %s fuzzer: %s",
+                    resource, method, param, parameter_place_in_request, sample_data, param_name, fuzzer_type,
+                    fuzz_type.__name__,
+                )
+
+                self._add_field_to_param(fuzz_type, param, param_name, parameter_place_in_request, sample_data,
+                                         template)
+        if template.get_stat() > 0:
+            self._save_template(template)
 
     @staticmethod
     def _get_additional_parameters(_param, param, param_name, parameter_data_type):
@@ -240,45 +247,55 @@ class OpenAPITemplateGenerator(TemplateGenerator):
     def _add_field_to_param(self, fuzz_type, param, param_name, parameter_place_in_request, sample_data, template):
         if parameter_place_in_request == ParamTypes.PATH:
             template.path_variables.add(
-                fuzz_type(name=param_name, value=str(sample_data))
+                self._create_field(fuzz_type, name=param_name, value=str(sample_data))
             )
         elif parameter_place_in_request == ParamTypes.HEADER:
             template.headers.add(
-                fuzz_type(
+                self._create_field(
+                    fuzz_type,
                     name=param_name,
                     value=transform_data_to_bytes(sample_data),
                 )
             )
         elif parameter_place_in_request == ParamTypes.COOKIE:
             template.cookies.add(
-                fuzz_type(name=param_name, value=sample_data)
+                self._create_field(fuzz_type, name=param_name, value=sample_data)
             )
         elif parameter_place_in_request == ParamTypes.QUERY:
             template.params.add(
-                fuzz_type(name=param_name, value=str(sample_data))
+                self._create_field(fuzz_type, name=param_name, value=str(sample_data))
             )
         elif parameter_place_in_request == ParamTypes.BODY:
             if hasattr(fuzz_type, "accept_list_as_value"):
                 template.data.add(
-                    fuzz_type(name=param_name, value=sample_data)
+                    self._create_field(fuzz_type, name=param_name, value=sample_data)
                 )
             else:
                 template.data.add(
-                    fuzz_type(
+                    self._create_field(
+                        fuzz_type,
                         name=param_name,
                         value=transform_data_to_bytes(sample_data),
                     )
                 )
         elif parameter_place_in_request == ParamTypes.FORM_DATA:
             template.params.add(
-                fuzz_type(name=param_name, value=str(sample_data))
+                self._create_field(fuzz_type, name=param_name, value=str(sample_data))
             )
         else:
             self.logger.warning(
-                f"Can not parse a definition ({parameter_place_in_request}): "
-                f"{pretty_print(param)}"
+                "Can not parse a definition (%s): %s", parameter_place_in_request, LazyString(pretty_print, param)
             )
 
+    def _create_field(self, fuzz_type, name, value):
+        """
+        :return: the field, the random fields get their own seed drawn from the seeded generator, so their mutations
+            don't depend on which other fields were mutated before in the process
+        """
+        if self.random is not None and issubclass(fuzz_type, SEEDED_FIELD_TYPES):
+            return fuzz_type(name=name, value=value, seed=self.random.getrandbits(32))
+        return fuzz_type(name=name, value=value)
+
     @staticmethod
     def _get_sample_data(_parameter, fuzz_type, sample_data):
         if _parameter.get("enum") and hasattr(
@@ -0,0 +1,182 @@
+import json
+import math
+from time import perf_counter
+
+# phases of a test in the order they happen, the table is printed in this order
+PHASES = ("mutate", "render", "headers", "sanitize", "prepare", "network", "to_dict", "save_report")
+# the durations are counted in logarithmic buckets, the percentiles are accurate within 5%
+BUCKET_BASE = 1.05
+_LOG_BASE = math.log(BUCKET_BASE)
+# durations below this are counted in the first bucket
+MIN_DURATION = 1e-7
+TOP_TEMPLATES = 10
+
+
+class PhaseStats(object):
+    """
+    Count, total, maximum and distribution of the durations of a phase
+    """
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = dict()
+
+    def add(self, elapsed):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        bucket = math.floor(math.log(elapsed if elapsed > MIN_DURATION else MIN_DURATION) / _LOG_BASE)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def merge(self, other):
+        """
+        :type other: PhaseStats
+        """
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+
+    def percentile(self, percent):
+        """
+        :param percent: 0-100
+        :return: upper bound of the bucket of the percentile in seconds
+        :rtype: float
+        """
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(BUCKET_BASE ** (bucket + 1), self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+            "buckets": {str(bucket): count for bucket, count in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.count = data["count"]
+        stats.total = data["total"]
+        stats.max = data["max"]
+        stats.buckets = {int(bucket): count for bucket, count in data["buckets"].items()}
+        return stats
+
+
+class PhaseProfiler(object):
+    """
+    Aggregates the time spent in the phases of the tests per phase and template. The instrumented code measures the
+    phase with perf_counter and calls record, nothing is recorded if the profiler is not set.
+    """
+
+    def __init__(self):
+        # (phase, template) -> PhaseStats
+        self.stats = dict()
+        self.wall_time = 0.0
+        self._start = None
+
+    def record(self, phase, template, elapsed):
+        """
+        :param phase: one of PHASES
+        :type phase: str
+        :param template: name of the template of the test
+        :type template: str
+        :param elapsed: duration of the phase in seconds
+        :type elapsed: float
+        """
+        stats = self.stats.get((phase, template))
+        if stats is None:
+            stats = self.stats[(phase, template)] = PhaseStats()
+        stats.add(elapsed)
+
+    def start(self):
+        self._start = perf_counter()
+
+    def stop(self):
+        if self._start is not None:
+            self.wall_time += perf_counter() - self._start
+            self._start = None
+
+    def phase_totals(self):
+        """
+        :return: stats of the phases summed over the templates
+        :rtype: dict
+        """
+        totals = dict()
+        for (phase, _), stats in self.stats.items():
+            totals.setdefault(phase, PhaseStats()).merge(stats)
+        return totals
+
+    def merge(self, data):
+        """
+        Adds the results of another profiler, e.g. of a shard
+        :param data: result of to_dict
+        :type data: dict
+        """
+        self.wall_time = max(self.wall_time, data["wall_time"])
+        for phase, templates in data["templates"].items():
+            for template, stats in templates.items():
+                self.stats.setdefault((phase, template), PhaseStats()).merge(PhaseStats.from_dict(stats))
+
+    def to_dict(self):
+        templates = dict()
+        for (phase, template), stats in sorted(self.stats.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+            templates.setdefault(phase, dict())[str(template)] = stats.to_dict()
+        phases = {phase: stats.to_dict() for phase, stats in self.phase_totals().items()}
+        for phase in phases.values():
+            del phase["buckets"]
+        return {"wall_time": self.wall_time, "phases": phases, "templates": templates}
+
+    def write(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def format_table(self):
+        """
+        :return: time spent in the phases and in the phases of the slowest templates
+        :rtype: str
+        """
+        totals = self.phase_totals()
+        header = (
+            f"{'phase':<12} {'template':<32} {'count':>8} {'total s':>9} {'share %':>8} {'mean us':>9} "
+            f"{'p50 us':>9} {'p90 us':>9} {'p99 us':>9} {'max us':>10}"
+        )
+        lines = [header, "-" * len(header)]
+        for phase in sorted(totals, key=lambda name: PHASES.index(name) if name in PHASES else len(PHASES)):
+            lines.append(self._format_row(phase, "all", totals[phase]))
+        slowest = sorted(self.stats.items(), key=lambda item: item[1].total, reverse=True)[:TOP_TEMPLATES]
+        if slowest:
+            lines.append("")
+            lines.append(f"slowest phases by template (top {TOP_TEMPLATES}):")
+            lines.extend(self._format_row(phase, template, stats) for (phase, template), stats in slowest)
+        # the network time of concurrent requests overlaps with the other phases
+        lines.append(f"wall time: {self.wall_time:.3f} s")
+        return "\n".join(lines)
+
+    def _format_row(self, phase, template, stats):
+        share = stats.total / self.wall_time * 100 if self.wall_time else 0.0
+        template = str(template)
+        template = template if len(template) <= 32 else template[:29] + "..."
+        return (
+            f"{phase:<12} {template:<32} {stats.count:>8} {stats.total:>9.3f} {share:>8.1f} "
+            f"{stats.total / stats.count * 1e6:>9.1f} {stats.percentile(50) * 1e6:>9.1f} "
+            f"{stats.percentile(90) * 1e6:>9.1f} {stats.percentile(99) * 1e6:>9.1f} {stats.max * 1e6:>10.1f}"
+        )
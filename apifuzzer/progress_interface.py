@@ -0,0 +1,95 @@
+import sys
+import time
+from datetime import timedelta
+
+from kitty.interfaces.base import EmptyInterface
+
+DEFAULT_PROGRESS_INTERVAL = 10
+
+
+def _format_duration(seconds):
+    return str(timedelta(seconds=int(seconds)))
+
+
+class ProgressInterface(EmptyInterface):
+    """
+    User interface of the headless mode, instead of serving the kitty web UI it writes a progress line periodically:
+    tests done/total, requests per second, failures, the estimated time left and the current limits of the rate control
+    """
+
+    def __init__(self, name="ProgressInterface", interval=DEFAULT_PROGRESS_INTERVAL, stream=None, prefix=""):
+        """
+        :param interval: seconds between the progress lines
+        :type interval: float
+        :param stream: where the progress lines are written, default is stderr
+        :param prefix: written before the progress lines, identifies the worker when the tests are split
+        :type prefix: str
+        """
+        super(ProgressInterface, self).__init__(name)
+        self.interval = interval
+        self.stream = stream
+        self.prefix = prefix
+        self.total = None
+        self.done = 0
+        self.failures = 0
+        self.rate_controller = None
+        self._start_time = None
+        self._next_report = None
+
+    def set_total(self, total, rate_controller=None):
+        """
+        Starts the measurement, called by the fuzzer when the tests are about to be sent
+        :param total: number of tests to be executed
+        :type total: int
+        :param rate_controller: its current limits are shown if the rate control is enabled
+        :type rate_controller: apifuzzer.fuzzer_target.rate_controller.RateController
+        """
+        self.total = total
+        self.rate_controller = rate_controller
+        self.done = 0
+        self._start_time = time.monotonic()
+        self._next_report = self._start_time + self.interval
+
+    def failure_detected(self):
+        self.failures += 1
+
+    def progress(self):
+        """
+        Counts a finished test, the progress line is written if the interval is over
+        """
+        self.done += 1
+        now = time.monotonic()
+        if self._next_report is not None and now >= self._next_report:
+            self._next_report = now + self.interval
+            self._write(self.progress_line(now))
+
+    def progress_line(self, now=None):
+        """
+        :rtype: str
+        """
+        elapsed = (now or time.monotonic()) - (self._start_time or 0)
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        line = f"{self.prefix}{self.done}/{self.total if self.total is not None else '?'} tests"
+        if self.total:
+            line += f" ({self.done * 100 / self.total:.1f}%)"
+        line += f", {rate:.1f} req/s, {self.failures} failures"
+        if self.total is not None and rate > 0:
+            line += f", ETA {_format_duration(max(self.total - self.done, 0) / rate)}"
+        if self.rate_controller is not None and self.rate_controller.enabled:
+            line += f", rate limit {self.rate_controller.rate_str()}, concurrency {self.rate_controller.concurrency}"
+        return line
+
+    def _stop(self):
+        if self._start_time is None:
+            return
+        elapsed = time.monotonic() - self._start_time
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        self._write(
+            f"{self.prefix}Finished {self.done}/{self.total} tests in {_format_duration(elapsed)}, {rate:.1f} req/s, "
+            f"{self.failures} failures"
+        )
+
+    def _write(self, line):
+        stream = self.stream or sys.stderr
+        stream.write(line + "\n")
+        stream.flush()
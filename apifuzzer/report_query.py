@@ -0,0 +1,137 @@
+"""
+Queries the findings saved with --report_format sqlite
+
+Usage: APIFuzzer report query -r REPORT_DIR [--status failed] [--method POST] [--path /pets] [--group_by status_code]
+"""
+import argparse
+import json
+import os
+import sqlite3
+
+from apifuzzer.report_store import SqliteReportStore
+from apifuzzer.utils import pretty_print
+
+FILTER_COLUMNS = ("test_number", "template", "method", "url", "path", "status_code", "status", "bucket")
+LIST_COLUMNS = ("test_number", "template", "method", "url", "status_code", "status", "latency")
+
+
+def query_reports(report_dir, filters=None, group_by=None, min_latency=None, limit=None):
+    """
+    :param report_dir: directory of the report database
+    :type report_dir: str
+    :param filters: column name - value pairs the reports have to match
+    :type filters: dict
+    :param group_by: the reports are counted by these columns instead of listing them
+    :type group_by: list
+    :param min_latency: only the reports with at least this response time in seconds
+    :type min_latency: float
+    :param limit: maximum number of rows
+    :type limit: int
+    :return: column names and rows
+    :rtype: tuple
+    """
+    database = os.path.join(report_dir, SqliteReportStore.DATABASE_FILE)
+    if not os.path.exists(database):
+        raise FileNotFoundError(f"{database} does not exist, was the fuzzer run with --report_format sqlite?")
+    conditions = list()
+    parameters = list()
+    for column, value in (filters or dict()).items():
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"Unknown column: {column}")
+        if column == "status":
+            value = value.lower()
+        elif column == "method":
+            value = value.upper()
+        conditions.append(f"{column} = ?")
+        parameters.append(value)
+    if min_latency is not None:
+        conditions.append("latency >= ?")
+        parameters.append(min_latency)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    if group_by:
+        unknown_columns = set(group_by) - set(FILTER_COLUMNS)
+        if unknown_columns:
+            raise ValueError(f"Unknown column: {', '.join(sorted(unknown_columns))}")
+        group_columns = ", ".join(group_by)
+        columns = list(group_by) + ["count", "max_latency"]
+        sql = (
+            f"SELECT {group_columns}, COUNT(*), MAX(latency) FROM reports{where} "
+            f"GROUP BY {group_columns} ORDER BY COUNT(*) DESC"
+        )
+    else:
+        columns = list(LIST_COLUMNS)
+        sql = f"SELECT {', '.join(columns)} FROM reports{where} ORDER BY test_number"
+    if limit:
+        sql += " LIMIT ?"
+        parameters.append(limit)
+    connection = sqlite3.connect(f"file:{database}?mode=ro", uri=True)
+    try:
+        return columns, connection.execute(sql, parameters).fetchall()
+    finally:
+        connection.close()
+
+
+def _format_cell(value, max_width):
+    if value is None:
+        return ""
+    if isinstance(value, str) and not value.isprintable():
+        # fuzz values may contain control characters
+        value = repr(value)
+    return pretty_print(str(value), limit=max_width)
+
+
+def format_table(columns, rows, max_width=60):
+    """
+    :param max_width: longer values are truncated
+    :type max_width: int
+    :return: rows aligned to columns
+    :rtype: str
+    """
+    cells = [columns] + [[_format_cell(value, max_width) for value in row] for row in rows]
+    widths = [max(len(row[index]) for row in cells) for index in range(len(columns))]
+    return "\n".join(" ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in cells)
+
+
+def report_main(argv):
+    """
+    Entry point of the `APIFuzzer report` subcommands
+    :param argv: command line arguments after `report`
+    :type argv: list
+    :return: exit code
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(prog="APIFuzzer report", description="APIFuzzer report tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    query_parser = subparsers.add_parser("query", help="Query the reports saved with --report_format sqlite")
+    query_parser.add_argument("-r", "--report_dir", type=str, required=True, dest="report_dir",
+                              help="Report directory of the fuzzer run")
+    for column in FILTER_COLUMNS:
+        query_parser.add_argument(f"--{column}", type=int if column in ("test_number", "status_code") else str,
+                                  required=False, dest=column, default=None,
+                                  help=f"Only the reports with the given {column.replace('_', ' ')}")
+    query_parser.add_argument("--min_latency", type=float, required=False, dest="min_latency", default=None,
+                              help="Only the reports with at least this response time in seconds")
+    query_parser.add_argument("--group_by", type=str, required=False, dest="group_by", default=None,
+                              help="Count the reports by comma separated columns. Example: --group_by status_code")
+    query_parser.add_argument("--limit", type=int, required=False, dest="limit", default=None,
+                              help="Maximum number of rows")
+    query_parser.add_argument("--json", action="store_true", dest="json",
+                              help="Print the rows as JSON list instead of table")
+    args = parser.parse_args(argv)
+    filters = {column: getattr(args, column) for column in FILTER_COLUMNS if getattr(args, column) is not None}
+    try:
+        columns, rows = query_reports(
+            args.report_dir,
+            filters=filters,
+            group_by=args.group_by.split(",") if args.group_by else None,
+            min_latency=args.min_latency,
+            limit=args.limit,
+        )
+    except (FileNotFoundError, ValueError, sqlite3.Error) as e:
+        print(e)
+        return 1
+    if args.json:
+        print(json.dumps([dict(zip(columns, row)) for row in rows], indent=2))
+    else:
+        print(format_table(columns, rows))
+    return 0
@@ -0,0 +1,411 @@
+import glob
+import json
+import os
+import shutil
+import sqlite3
+from time import monotonic, time
+from urllib.parse import urlsplit
+
+from apifuzzer.utils import get_logger
+
+REPORT_FORMATS = ("files", "jsonl", "sqlite")
+
+
+class FileReportStore(object):
+    """
+    Saves the report of each test to a separate JSON file in the report directory
+    """
+
+    def __init__(self, report_dir):
+        """
+        :param report_dir: directory where the reports are saved
+        :type report_dir: str
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.report_dir = report_dir
+        os.makedirs(report_dir, exist_ok=True)
+
+    def write(self, test_number, report, latency=None):
+        """
+        :param test_number: number of the test, -1 is the environment test
+        :type test_number: int
+        :param report: report in dictionary format
+        :type report: dict
+        :param latency: response time in seconds, None if the request was not sent
+        :type latency: float
+        """
+        with open(f"{self.report_dir}/{str(test_number + 1).zfill(4)}_{int(time())}.json", "w") as report_dump_file:
+            report_dump_file.write(json.dumps(report))
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def read(report_dir):
+        """
+        :return: the reports in the order of their file names
+        :rtype: generator of dicts
+        """
+        for report_file in sorted(os.listdir(report_dir)):
+            if report_file.endswith(".json"):
+                with open(os.path.join(report_dir, report_file)) as f:
+                    yield json.load(f)
+
+    @staticmethod
+    def merge(store_dirs, report_dir):
+        """
+        Moves the reports of several stores to the report directory
+        :param store_dirs: report directories of the stores
+        :type store_dirs: list
+        :param report_dir: destination directory
+        :type report_dir: str
+        """
+        os.makedirs(report_dir, exist_ok=True)
+        for store_dir in store_dirs:
+            if not os.path.isdir(store_dir):
+                continue
+            for report_file in sorted(os.listdir(store_dir)):
+                shutil.move(os.path.join(store_dir, report_file), os.path.join(report_dir, report_file))
+
+
+class JsonlReportStore(object):
+    """
+    Appends the reports as compact JSON lines to segment files, a new segment is started when the current one reaches
+    the size limit. The index file lists the segments with the range of test numbers they contain. Each report is
+    flushed and the index is refreshed periodically, so the reports of a killed run can be read. The segments of the
+    earlier runs in the report directory are kept, the new segments follow them.
+    """
+
+    INDEX_FILE = "index.json"
+    SEGMENT_PATTERN = "reports-*.jsonl"
+    # the index is written again after this many reports or seconds
+    INDEX_INTERVAL_RECORDS = 1000
+    INDEX_INTERVAL_SECONDS = 5
+
+    def __init__(self, report_dir, segment_size=64 * 1024 * 1024):
+        """
+        :param report_dir: directory where the segments and the index are saved
+        :type report_dir: str
+        :param segment_size: size in bytes after a new segment is started
+        :type segment_size: int
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.report_dir = report_dir
+        self.segment_size = segment_size
+        os.makedirs(report_dir, exist_ok=True)
+        self.segments = self.list_segments(report_dir)
+        self._segment_file = None
+        self._unindexed_records = 0
+        self._index_time = monotonic()
+
+    @staticmethod
+    def segment_name(index):
+        return f"reports-{str(index).zfill(4)}.jsonl"
+
+    def _open_segment(self):
+        number = len(self.segments)
+        # the numbers of the kept segments may have gaps if some of them were deleted
+        while os.path.exists(os.path.join(self.report_dir, self.segment_name(number))):
+            number += 1
+        segment = {
+            "file": self.segment_name(number),
+            "first_test": None,
+            "last_test": None,
+            "records": 0,
+            "size": 0,
+        }
+        self.segments.append(segment)
+        self._segment_file = open(os.path.join(self.report_dir, segment["file"]), "x")
+        self.logger.debug("Writing reports to %s", segment["file"])
+        self._refresh_index()
+        return segment
+
+    def _refresh_index(self):
+        self._write_index(self.report_dir, self.segments)
+        self._unindexed_records = 0
+        self._index_time = monotonic()
+
+    def write(self, test_number, report, latency=None):
+        """
+        :param test_number: number of the test, -1 is the environment test
+        :type test_number: int
+        :param report: report in dictionary format
+        :type report: dict
+        :param latency: response time in seconds, None if the request was not sent
+        :type latency: float
+        """
+        if self._segment_file is None or self.segments[-1]["size"] >= self.segment_size:
+            self._close_segment()
+            self._open_segment()
+        segment = self.segments[-1]
+        record = json.dumps(report, separators=(",", ":")) + "\n"
+        self._segment_file.write(record)
+        self._segment_file.flush()
+        if segment["first_test"] is None:
+            segment["first_test"] = test_number
+        segment["last_test"] = test_number
+        segment["records"] += 1
+        segment["size"] += len(record)
+        self._unindexed_records += 1
+        if (
+            self._unindexed_records >= self.INDEX_INTERVAL_RECORDS
+            or monotonic() - self._index_time >= self.INDEX_INTERVAL_SECONDS
+        ):
+            self._refresh_index()
+
+    def _close_segment(self):
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._segment_file = None
+            self._refresh_index()
+
+    def close(self):
+        self._close_segment()
+
+    @classmethod
+    def _write_index(cls, report_dir, segments):
+        index_path = os.path.join(report_dir, cls.INDEX_FILE)
+        with open(index_path + ".tmp", "w") as f:
+            json.dump({"segments": segments}, f, indent=2)
+        os.replace(index_path + ".tmp", index_path)
+
+    @classmethod
+    def read_index(cls, report_dir):
+        """
+        :return: segments of the store in writing order
+        :rtype: list of dicts
+        """
+        index_path = os.path.join(report_dir, cls.INDEX_FILE)
+        if not os.path.exists(index_path):
+            return list()
+        with open(index_path) as f:
+            return json.load(f)["segments"]
+
+    @classmethod
+    def list_segments(cls, report_dir):
+        """
+        :return: segments of the index and the segment files missing from it (e.g. the index of a killed run was not
+                 refreshed after the segment was opened) in writing order
+        :rtype: list of dicts
+        """
+        segments = cls.read_index(report_dir)
+        indexed = {segment["file"] for segment in segments}
+        for path in sorted(glob.glob(os.path.join(report_dir, cls.SEGMENT_PATTERN))):
+            file_name = os.path.basename(path)
+            if file_name not in indexed:
+                with open(path) as f:
+                    records = sum(1 for _ in f)
+                segments.append(
+                    {"file": file_name, "first_test": None, "last_test": None, "records": records,
+                     "size": os.path.getsize(path)}
+                )
+        return segments
+
+    @classmethod
+    def read(cls, report_dir):
+        """
+        :return: the reports in the order they were written
+        :rtype: generator of dicts
+        """
+        for segment in cls.list_segments(report_dir):
+            with open(os.path.join(report_dir, segment["file"])) as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        # the last report of a killed run may be incomplete
+                        break
+                    yield json.loads(line)
+
+    @classmethod
+    def merge(cls, store_dirs, report_dir):
+        """
+        Moves the segments of several stores to one store, the segments are renumbered and follow each other in the
+        order of the stores
+        :param store_dirs: report directories of the stores
+        :type store_dirs: list
+        :param report_dir: destination directory
+        :type report_dir: str
+        """
+        os.makedirs(report_dir, exist_ok=True)
+        segments = cls.list_segments(report_dir)
+        for store_dir in store_dirs:
+            for segment in cls.list_segments(store_dir):
+                segment_name = cls.segment_name(len(segments))
+                shutil.move(os.path.join(store_dir, segment["file"]), os.path.join(report_dir, segment_name))
+                segment["file"] = segment_name
+                segments.append(segment)
+        cls._write_index(report_dir, segments)
+
+
+class SqliteReportStore(object):
+    """
+    Inserts the reports to a SQLite database in batches. Beside the whole report the fields used for triage are saved
+    to indexed columns, so the findings of long runs can be queried without parsing the reports.
+    """
+
+    DATABASE_FILE = "reports.sqlite"
+    COLUMNS = (
+        "test_number", "template", "method", "url", "path", "status_code", "status", "bucket", "latency", "report"
+    )
+    INDEXES = {
+        "test_number": ("test_number",),
+        "template": ("template",),
+        "method": ("method",),
+        "url": ("url",),
+        "path": ("path",),
+        "status_code": ("status_code",),
+        "status": ("status",),
+        "bucket": ("bucket",),
+        "latency": ("latency",),
+        # typical triage question: failures of an endpoint grouped by status code
+        "triage": ("status", "method", "path", "status_code"),
+    }
+
+    def __init__(self, report_dir, batch_size=1000):
+        """
+        :param report_dir: directory where the database is saved
+        :type report_dir: str
+        :param batch_size: number of reports inserted in one transaction
+        :type batch_size: int
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.report_dir = report_dir
+        self.batch_size = batch_size
+        os.makedirs(report_dir, exist_ok=True)
+        self.connection = self.connect(report_dir)
+        self._batch = list()
+
+    @classmethod
+    def connect(cls, report_dir):
+        """
+        Opens the database of the report directory, the tables and indexes are created if necessary
+        :rtype: sqlite3.Connection
+        """
+        connection = sqlite3.connect(os.path.join(report_dir, cls.DATABASE_FILE))
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS reports (id INTEGER PRIMARY KEY, test_number INTEGER, template TEXT, "
+            "method TEXT, url TEXT, path TEXT, status_code INTEGER, status TEXT, bucket TEXT, latency REAL, "
+            "report TEXT)"
+        )
+        for name, columns in cls.INDEXES.items():
+            connection.execute(f"CREATE INDEX IF NOT EXISTS reports_{name} ON reports ({', '.join(columns)})")
+        connection.commit()
+        return connection
+
+    def write(self, test_number, report, latency=None):
+        """
+        :param test_number: number of the test, -1 is the environment test
+        :type test_number: int
+        :param report: report in dictionary format
+        :type report: dict
+        :param latency: response time in seconds, None if the request was not sent
+        :type latency: float
+        """
+        url = report.get("request_url")
+        try:
+            path = urlsplit(url).path if isinstance(url, str) else None
+        except ValueError:
+            path = None
+        status = report.get("status")
+        self._batch.append((
+            test_number,
+            report.get("template"),
+            report.get("request_method"),
+            url,
+            path,
+            report.get("status_code"),
+            status.lower() if isinstance(status, str) else status,
+            report.get("bucket"),
+            latency,
+            json.dumps(report, separators=(",", ":")),
+        ))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Inserts the collected reports in one transaction
+        """
+        if self._batch:
+            with self.connection:
+                self.connection.executemany(
+                    f"INSERT INTO reports ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                    self._batch,
+                )
+            self._batch = list()
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    @classmethod
+    def read(cls, report_dir):
+        """
+        :return: the reports in the order they were written
+        :rtype: generator of dicts
+        """
+        connection = sqlite3.connect(os.path.join(report_dir, cls.DATABASE_FILE))
+        try:
+            for (report,) in connection.execute("SELECT report FROM reports ORDER BY id"):
+                yield json.loads(report)
+        finally:
+            connection.close()
+
+    @classmethod
+    def merge(cls, store_dirs, report_dir):
+        """
+        Copies the reports of several databases to the database of the report directory, in the order of the stores
+        :param store_dirs: report directories of the stores
+        :type store_dirs: list
+        :param report_dir: destination directory
+        :type report_dir: str
+        """
+        os.makedirs(report_dir, exist_ok=True)
+        connection = cls.connect(report_dir)
+        columns = ", ".join(cls.COLUMNS)
+        try:
+            for store_dir in store_dirs:
+                database = os.path.join(store_dir, cls.DATABASE_FILE)
+                if not os.path.exists(database):
+                    continue
+                connection.execute("ATTACH DATABASE ? AS store", (database,))
+                with connection:
+                    connection.execute(
+                        f"INSERT INTO reports ({columns}) SELECT {columns} FROM store.reports ORDER BY id"
+                    )
+                connection.execute("DETACH DATABASE store")
+        finally:
+            connection.close()
+
+
+REPORT_STORES = {
+    "files": FileReportStore,
+    "jsonl": JsonlReportStore,
+    "sqlite": SqliteReportStore,
+}
+
+
+def create_report_store(report_format, report_dir):
+    """
+    :param report_format: one of REPORT_FORMATS
+    :type report_format: str
+    :param report_dir: directory where the reports are saved
+    :type report_dir: str
+    """
+    return REPORT_STORES[report_format](report_dir)
+
+
+def read_reports(report_dir, report_format="files"):
+    """
+    :return: reports saved to the report directory
+    :rtype: generator of dicts
+    """
+    return REPORT_STORES[report_format].read(report_dir)
+
+
+def merge_report_stores(store_dirs, report_dir, report_format="files"):
+    """
+    Moves the reports saved by several stores (e.g. shards) to the report directory
+    """
+    REPORT_STORES[report_format].merge(store_dirs, report_dir)
@@ -1,7 +1,16 @@
+import logging
+import traceback
+from collections import deque
+from time import perf_counter
+
 from kitty.data.report import Report
 from kitty.fuzzers import ServerFuzzer
+from kitty.interfaces import WebInterface
 from kitty.model import Container, KittyException
 
+from apifuzzer.fuzz_model import CorpusTemplate
+from apifuzzer.fuzzer_target.request_engine import CurlMultiEngine
+from apifuzzer.progress_interface import ProgressInterface
 from apifuzzer.utils import get_logger, transform_data_to_bytes
 
 
@@ -26,6 +35,28 @@ def _flatten_dict_entry(orig_key, v):
     return entries
 
 
+def render_template_fields(node, logger):
+    """
+    Renders the url, the method and the fields of the template
+    :param node: Kitty template
+    :type node: object
+    :rtype: dict
+    """
+    payload = dict()
+    for key in ["url", "method"]:
+        payload[key] = transform_data_to_bytes(node.get_field_by_name(key).render())
+    fuzz_places = ["params", "headers", "data", "path_variables"]
+    for place in fuzz_places:
+        try:
+            if place in node._fields_dict:
+                param = node.get_field_by_name(place)
+                _result = OpenApiServerFuzzer._recurse_params(param)
+                payload[place] = _result
+        except KittyException as e:
+            logger.warning(f"Exception occurred while processing {place}: {e}")
+    return payload
+
+
 class OpenApiServerFuzzer(ServerFuzzer):
     """Extends the ServerFuzzer with exit after the end message."""
 
@@ -33,10 +64,136 @@ class OpenApiServerFuzzer(ServerFuzzer):
         _ = func_name
         pass
 
-    def __init__(self):
+    def __init__(self, concurrency=1, profiler=None):
+        """
+        :param concurrency: number of requests kept in flight at the same time
+        :type concurrency: int
+        :param profiler: the mutation and rendering of the tests are timed if set
+        :type profiler: PhaseProfiler
+        """
         self.logger = get_logger(self.__class__.__name__)
         self.logger.info("Logger initialized")
         super(OpenApiServerFuzzer, self).__init__(logger=self.logger)
+        self.concurrency = concurrency
+        self._pending_request = None
+        self.profiler = profiler
+
+    def _next_mutation(self):
+        if self.profiler is None:
+            return super(OpenApiServerFuzzer, self)._next_mutation()
+        phase_start = perf_counter()
+        mutated = super(OpenApiServerFuzzer, self)._next_mutation()
+        if mutated:
+            self.profiler.record(
+                "mutate", self.model.get_sequence()[-1].dst.get_name(), perf_counter() - phase_start
+            )
+        return mutated
+
+    def _start(self):
+        """
+        Sends the tests one by one or, if concurrency is set, keeps multiple requests in flight. The tests are
+        completed (reported) in the order of the test numbers in both cases.
+        """
+        if isinstance(self.user_interface, ProgressInterface):
+            self.user_interface.set_total(self._test_list.get_count(), self.target.rate_controller)
+        if self.concurrency <= 1:
+            return super(OpenApiServerFuzzer, self)._start()
+        self.logger.info("Sending %d requests concurrently", self.concurrency)
+        engine = CurlMultiEngine()
+        pending_requests = deque()
+        try:
+            while self._next_mutation():
+                self._check_pause()
+                pending_requests.append(self._send_test(engine))
+                while engine.in_flight() >= self.target.rate_controller.concurrency:
+                    self._wait_for_responses(engine, pending_requests)
+                self._complete_finished_tests(pending_requests)
+            while pending_requests:
+                self._wait_for_responses(engine, pending_requests)
+        except Exception as e:
+            self.logger.error("Error occurred while fuzzing: %s", repr(e))
+            self.logger.error(traceback.format_exc())
+        finally:
+            engine.close()
+        self._end_message()
+
+    def _test_info(self):
+        """
+        The test info is built from the whole template and only the debug log shows it, it is skipped otherwise
+        """
+        if self.logger.isEnabledFor(logging.DEBUG):
+            super(OpenApiServerFuzzer, self)._test_info()
+        else:
+            self.logger.info("Current test: %s", self.model.current_index())
+
+    def _update_test_info(self):
+        """
+        The current test and template info is shown only by the web interface, it is not collected otherwise
+        """
+        if isinstance(self.user_interface, WebInterface):
+            super(OpenApiServerFuzzer, self)._update_test_info()
+
+    def _post_test(self):
+        """
+        :return: True if test failed
+        """
+        failure_detected = super(OpenApiServerFuzzer, self)._post_test()
+        if not self._in_environment_test:
+            self.user_interface.progress()
+        return failure_detected
+
+    def _send_test(self, engine):
+        """
+        Prepares the current test and hands over its request to the engine
+        :type engine: CurlMultiEngine
+        :rtype: PendingRequest
+        """
+        self._pre_test()
+        self._test_info()
+        node = self.model.get_sequence()[-1].dst
+        node.set_session_data(self.target.get_session_data())
+        self.target.report.add("template", node.get_name())
+        payload = self._build_payload(node)
+        pending_request = self.target.prepare_request(**payload)
+        pending_request.payload = payload
+        pending_request.test_info = self.model.get_test_info()
+        pending_request.sequence_str = self.model.get_sequence_str()
+        if pending_request.curl is not None:
+            # the transfers in flight are driven while the request waits for its turn
+            engine.add(pending_request, delay=self.target.rate_controller.reserve())
+        else:
+            pending_request.finished = True
+        return pending_request
+
+    def _wait_for_responses(self, engine, pending_requests):
+        for pending_request in engine.wait():
+            backoff = None
+            if pending_request.transport_error is not None:
+                backoff = self.target.retry_request(pending_request, pending_request.transport_error)
+            if backoff is not None:
+                # the other requests are driven while the request waits for its retry
+                engine.add(pending_request, delay=backoff)
+            else:
+                pending_request.finished = True
+        self._complete_finished_tests(pending_requests)
+
+    def _complete_finished_tests(self, pending_requests):
+        """
+        Completes the finished tests at the head of the queue, so reports are produced in test number order
+        :type pending_requests: deque
+        """
+        while pending_requests and pending_requests[0].finished:
+            pending_request = pending_requests.popleft()
+            self.target.restore_request(pending_request)
+            if pending_request.transport_error is not None:
+                self.target.record_transport_error(pending_request.transport_error)
+            self._last_payload = pending_request.payload
+            self._pending_request = pending_request
+            try:
+                self.target.complete_request(pending_request)
+                self._post_test()
+            finally:
+                self._pending_request = None
 
     def _transmit(self, node):
         """
@@ -44,25 +201,32 @@ class OpenApiServerFuzzer(ServerFuzzer):
         :param node: Kitty template
         :type node: object
         """
-        payload = {"content_type": self.model.content_type}
-        for key in ["url", "method"]:
-            payload[key] = transform_data_to_bytes(node.get_field_by_name(key).render())
-        fuzz_places = ["params", "headers", "data", "path_variables"]
-        for place in fuzz_places:
-            try:
-                if place in node._fields_dict:
-                    param = node.get_field_by_name(place)
-                    _result = self._recurse_params(param)
-                    payload[place] = _result
-            except KittyException as e:
-                self.logger.warning(f"Exception occurred while processing {place}: {e}")
-        self._last_payload = payload
+        self.target.report.add("template", node.get_name())
+        payload = self._build_payload(node)
         try:
             return self.target.transmit(**payload)
         except Exception as e:
             self.logger.error(f"Error in transmit: {e}")
             raise e
 
+    def _build_payload(self, node):
+        """
+        Renders the fields of the template, the fields rendered in an earlier run are read from the mutation corpus
+        :param node: Kitty template
+        :type node: object
+        :rtype: dict
+        """
+        phase_start = perf_counter()
+        payload = {"content_type": self.model.content_type}
+        if isinstance(node, CorpusTemplate):
+            payload.update(node.payload())
+        else:
+            payload.update(render_template_fields(node, self.logger))
+        self._last_payload = payload
+        if self.profiler is not None:
+            self.profiler.record("render", node.get_name(), perf_counter() - phase_start)
+        return payload
+
     @staticmethod
     def _recurse_params(param):
         """
@@ -85,9 +249,17 @@ class OpenApiServerFuzzer(ServerFuzzer):
         :param report: report to extend
         """
         self.logger.debug("<in>")
-        report.add("test_number", self.model.current_index())
-        report.add("fuzz_path", self.model.get_sequence_str())
-        test_info = self.model.get_test_info()
+        if self._pending_request is not None:
+            # the model already moved on to the tests sent after this one
+            test_number = self._pending_request.test_number
+            fuzz_path = self._pending_request.sequence_str
+            test_info = self._pending_request.test_info
+        else:
+            test_number = self.model.current_index()
+            fuzz_path = self.model.get_sequence_str()
+            test_info = self.model.get_test_info()
+        report.add("test_number", test_number)
+        report.add("fuzz_path", fuzz_path)
         data_model_report = Report(name="Data Model")
         for k, v in test_info.items():
             new_entries = _flatten_dict_entry(k, v)
@@ -103,7 +275,7 @@ class OpenApiServerFuzzer(ServerFuzzer):
         else:
             report.add("payload", None)
 
-        self.dataman.store_report(report, self.model.current_index())
+        self.dataman.store_report(report, test_number)
         # TODO investigate:
         #  self.dataman.get_report_by_id(self.model.current_index())
 
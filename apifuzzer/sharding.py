@@ -0,0 +1,67 @@
+import os
+import xml.etree.ElementTree as ET
+from time import time
+
+from apifuzzer.junit_writer import NO_TEST_CASE_NAME
+from apifuzzer.utils import get_logger
+
+logger = get_logger("Sharding")
+
+
+def split_test_range(total, shards):
+    """
+    Splits the test index space to continuous, nearly equal ranges
+    :param total: number of tests
+    :type total: int
+    :param shards: number of ranges
+    :type shards: int
+    :return: first and last test index of each non-empty range
+    :rtype: list of tuples
+    """
+    ranges = list()
+    shards = max(1, min(shards, total))
+    start = 0
+    for shard in range(shards):
+        size = total // shards + (1 if shard < total % shards else 0)
+        if size:
+            ranges.append((start, start + size - 1))
+        start += size
+    return ranges
+
+
+def merge_junit_reports(shard_junit_paths, junit_report_path):
+    """
+    Concatenates the test cases of the shard JUnit XML reports into one test suite, in the order of the shards
+    :param shard_junit_paths: JUnit reports of the shards
+    :type shard_junit_paths: list
+    :param junit_report_path: path of the merged report
+    :type junit_report_path: str
+    """
+    test_cases = list()
+    for shard_junit_path in shard_junit_paths:
+        if not os.path.exists(shard_junit_path):
+            logger.warning("JUnit report of the shard is missing: %s", shard_junit_path)
+            continue
+        for test_case in ET.parse(shard_junit_path).iter("testcase"):
+            if test_case.get("name") != NO_TEST_CASE_NAME:
+                test_cases.append(test_case)
+    if not test_cases:
+        test_cases.append(
+            ET.Element("testcase", {"name": NO_TEST_CASE_NAME, "status": "Pass"})
+        )
+    test_suites = ET.Element("testsuites")
+    test_suite = ET.SubElement(
+        test_suites,
+        "testsuite",
+        {
+            "name": "API Fuzzer",
+            "tests": str(len(test_cases)),
+            "failures": str(sum(1 for t in test_cases if t.find("failure") is not None)),
+            "errors": str(sum(1 for t in test_cases if t.find("error") is not None)),
+            "skipped": "0",
+            "time": str(sum(float(t.get("time", 0)) for t in test_cases)),
+            "timestamp": str(time()),
+        },
+    )
+    test_suite.extend(test_cases)
+    ET.ElementTree(test_suites).write(junit_report_path, encoding="utf-8", xml_declaration=True)
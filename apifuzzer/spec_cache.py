@@ -0,0 +1,116 @@
+import hashlib
+import os
+import pickle
+import tempfile
+
+from json_ref_dict.loader import loader
+from json_ref_dict.uri import URI
+
+from apifuzzer.spec_loader import read_document, clear_document_cache
+from apifuzzer.utils import get_logger
+from apifuzzer.version import get_version
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "apifuzzer", "specs"
+)
+
+
+def _digest(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+class SpecCache(object):
+    """
+    Keeps the resolved API definitions in pickle files, so the references of an unchanged API definition are not
+    resolved again. The file of a definition is named by the hash of the definition, it starts with the hashes of the
+    referenced documents, which are compared to the current ones before the definition is loaded.
+    """
+
+    def __init__(self, cache_dir=None):
+        """
+        :param cache_dir: directory of the cache files, ~/.cache/apifuzzer/specs by default
+        :type cache_dir: str
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+
+    def get(self, reference, resolve):
+        """
+        :param reference: path or URL of the API definition
+        :type reference: str
+        :param resolve: function which returns the resolved API definition, called if it is not cached
+        :type resolve: callable
+        :return: resolved API definition
+        :rtype: dict
+        """
+        try:
+            content = read_document(reference)
+        except Exception as e:
+            self.logger.info("Failed to read %s, it is not cached: %s", reference, e)
+            return resolve()
+        cache_key = _digest("\n".join((get_version(), reference)).encode() + b"\n" + content)
+        cache_file = os.path.join(self.cache_dir, f"{cache_key}.pickle")
+        definition = self._load(cache_file)
+        if definition is not None:
+            self.logger.info("Resolved API definition loaded from %s", cache_file)
+            return definition
+        documents = set()
+
+        def record_document(base_uri):
+            documents.add(base_uri)
+            return ...
+
+        # the documents loaded before by json_ref_dict would not be recorded
+        clear_document_cache()
+        loader.register(record_document)
+        try:
+            definition = resolve()
+        finally:
+            loader.unregister(record_document)
+        documents.discard(URI.from_string(reference).root)
+        self._save(cache_file, sorted(documents), definition)
+        return definition
+
+    def _load(self, cache_file):
+        """
+        :return: the cached definition, None if it is not cached or one of the referenced documents has changed
+        :rtype: dict
+        """
+        try:
+            with open(cache_file, "rb") as f:
+                documents = pickle.load(f)  # nosec B301 - the cache is written by the user running the fuzzer
+                for uri, digest in documents.items():
+                    if _digest(read_document(uri)) != digest:
+                        self.logger.info("%s has changed since the definition was cached", uri)
+                        return None
+                return pickle.load(f)  # nosec B301
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning("Failed to load cached API definition from %s: %s", cache_file, e)
+            return None
+
+    def _save(self, cache_file, documents, definition):
+        """
+        :param documents: URIs of the documents referenced by the definition
+        :type documents: list
+        :param definition: resolved API definition
+        :type definition: dict
+        """
+        try:
+            document_digests = {uri: _digest(read_document(uri)) for uri in documents}
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_file = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(document_digests, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    pickle.dump(definition, f, protocol=pickle.HIGHEST_PROTOCOL)
+                # concurrent runs see either the complete file or none
+                os.replace(tmp_file, cache_file)
+            except BaseException:
+                os.unlink(tmp_file)
+                raise
+        except Exception as e:
+            self.logger.warning("Failed to cache API definition in %s: %s", cache_file, e)
+        else:
+            self.logger.info("Resolved API definition cached in %s", cache_file)
@@ -0,0 +1,93 @@
+import os
+from functools import lru_cache
+from urllib.parse import urlparse
+from urllib.request import urlopen
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML without libyaml
+    from yaml import SafeLoader as YamlLoader
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+from json_ref_dict.exceptions import DocumentParseError
+from json_ref_dict.loader import loader
+from json_ref_dict.ref_pointer import resolve_uri
+
+from apifuzzer.utils import get_logger
+
+logger = get_logger("SpecLoader")
+
+UTF8_BOM = b"\xef\xbb\xbf"
+WHITESPACE = b" \t\r\n"
+
+
+def read_document(uri):
+    """
+    Reads the document like json_ref_dict does: file path (relative to the working directory) or URL
+    :param uri: path or URL of the document
+    :type uri: str
+    :rtype: bytes
+    """
+    if os.path.isfile(uri) or not urlparse(uri).scheme:
+        with open(uri, "rb") as f:
+            return f.read()
+    with urlopen(uri) as conn:  # nosec B310 - the user given API definition is downloaded the same way
+        return conn.read()
+
+
+def parse_api_definition(content):
+    """
+    Parses JSON or YAML API definition. The format is decided by the first character: JSON documents start with { or
+    [, anything else is parsed as YAML. YAML is tried also if the JSON parsing fails, as YAML flow mappings start with
+    { too.
+    :param content: API definition
+    :type content: bytes
+    :return: parsed API definition
+    :rtype: dict
+    """
+    if content.startswith(UTF8_BOM):
+        content = content[len(UTF8_BOM):]
+    if content.lstrip(WHITESPACE)[:1] in (b"{", b"["):
+        try:
+            return json_loads(content)
+        except ValueError as e:
+            logger.debug("Failed to parse as JSON, trying YAML: %s", e)
+    return yaml.load(content, Loader=YamlLoader)  # nosec B506 - CSafeLoader or SafeLoader
+
+
+@lru_cache(maxsize=None)
+def load_api_document(base_uri):
+    """
+    Document loader of json_ref_dict, the root and the referenced documents are read and parsed once
+    :param base_uri: path or URL of the document
+    :type base_uri: str
+    :return: parsed document, Ellipsis to let json_ref_dict try to load it if it can't be read
+    """
+    try:
+        content = read_document(base_uri)
+    except Exception as e:
+        logger.debug("Failed to read %s: %s", base_uri, e)
+        return ...
+    try:
+        return parse_api_definition(content)
+    except Exception as e:
+        raise DocumentParseError(f"Failed to load uri '{base_uri}'.") from e
+
+
+def clear_document_cache():
+    """
+    Makes json_ref_dict read the documents again, they might have changed since they were loaded
+    """
+    # resolve_uri clears the caches of the underlying functions too
+    resolve_uri.cache_clear()
+    loader.cache_clear()
+    load_api_document.cache_clear()
+
+
+loader.register(load_api_document)
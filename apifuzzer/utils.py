@@ -1,62 +1,180 @@
 import argparse
+import atexit
 import json
 import logging
 import os
+import queue
 import sys
 from base64 import b64encode
 from binascii import Error
 from io import BytesIO
 from logging import Formatter
-from logging.handlers import SysLogHandler
 from random import SystemRandom
 from typing import Optional
 
-import pycurl
-from bitstring import Bits
-
 from apifuzzer.version import get_version
 
 logger_name = "APIFuzzer"
 
 
-def secure_randint(minimum, maximum):
+def secure_randint(minimum, maximum, rand=None):
     """
     Provides solution for B311 "Standard pseudo-random generators are not suitable for security/cryptographic purposes."
     :param minimum: minimum value
     :type minimum: int
     :param maximum: maximum value
     :type maximum: int
+    :param rand: seeded generator of the --seed option, SystemRandom is used if not set
+    :type rand: random.Random
     :return: random integer value between min and maximum
     """
-    rand = SystemRandom()
+    if rand is None:
+        rand = SystemRandom()
     return rand.randrange(start=minimum, stop=maximum)
 
 
-def set_logger(level="warning", basic_output=False):
+class LazyString(object):
+    """
+    Message argument computed only when the log record is emitted, so the expensive parts of the messages (e.g.
+    json.dumps of the request) are not computed if the level of the record is disabled
+    """
+
+    __slots__ = ("function", "args", "kwargs")
+
+    def __init__(self, function, *args, **kwargs):
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return str(self.function(*self.args, **self.kwargs))
+
+
+class SampleFilter(logging.Filter):
+    """
+    Lets through only the given ratio of the records below WARNING, like the logs of each request
+    """
+
+    def __init__(self, sample_rate):
+        """
+        :param sample_rate: ratio of the debug and info records emitted, between 0 and 1
+        :type sample_rate: float
+        """
+        super().__init__()
+        self.sample_rate = sample_rate
+        self._credit = 0.0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        self._credit += self.sample_rate
+        # tolerance for the rounding error of the sum
+        if self._credit >= 1 - 1e-9:
+            self._credit -= 1
+            return True
+        return False
+
+
+class _LogQueue(object):
+    """
+    Records are written by the handler in a background thread, the fuzzer thread only enqueues them
+    """
+
+    def __init__(self, handler):
+        from logging.handlers import QueueHandler, QueueListener
+
+        self.handler = handler
+        self.queue_handler = QueueHandler(queue.SimpleQueue())
+        self.listener = QueueListener(self.queue_handler.queue, handler, respect_handler_level=True)
+        self.listener.start()
+
+    def flush(self):
+        """
+        Waits until the enqueued records are written
+        """
+        self.listener.stop()
+        self.listener.start()
+
+    def stop(self):
+        self.listener.stop()
+
+    def after_fork(self):
+        from logging.handlers import QueueListener
+
+        # the thread of the listener does not exist in the forked process, and its queue may be locked
+        self.queue_handler.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self.queue_handler.queue, self.handler, respect_handler_level=True)
+        self.listener.start()
+
+
+_log_queue = None
+
+
+def _stop_log_queue():
+    global _log_queue
+    if _log_queue is not None:
+        _log_queue.stop()
+        _log_queue = None
+
+
+def _restart_log_queue():
+    if _log_queue is not None:
+        _log_queue.after_fork()
+
+
+atexit.register(_stop_log_queue)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_log_queue)
+
+
+def flush_logs():
+    """
+    Waits until the records of the log queue are written. Forked processes exit without running the atexit handlers,
+    so they call it before exiting.
+    """
+    if _log_queue is not None:
+        _log_queue.flush()
+
+
+def set_logger(level="warning", basic_output=False, log_queue=False, log_sample_rate=None):
     """
     Setup logger
     :param level: log level
     :type level: log level
     :param basic_output: If set to True, application logs to the terminal not to Syslog
     :type basic_output: bool
+    :param log_queue: If set to True, the records are written by a background thread
+    :type log_queue: bool
+    :param log_sample_rate: ratio of the debug and info records emitted, all of them are emitted if not set
+    :type log_sample_rate: float
     :rtype logger
     """
+    global _log_queue
     if level.lower() == "debug":
         fmt = "%(process)d [%(levelname)7s] %(name)s [%(filename)s:%(lineno)s - %(funcName)20s ]: %(message)s"
     else:
         fmt = "%(process)d [%(levelname)7s] %(name)s: %(message)s"
     logger = logging.getLogger(logger_name)
     logger.handlers.clear()
+    _stop_log_queue()
     if basic_output:
         handler = logging.StreamHandler(stream=sys.stdout)
     else:
         if os.path.exists("/dev/log"):
+            from logging.handlers import SysLogHandler
+
             handler = SysLogHandler(
                 address="/dev/log", facility=SysLogHandler.LOG_LOCAL2
             )
         else:
             handler = logging.StreamHandler(stream=sys.stdout)
     handler.setFormatter(Formatter(fmt))
+    if log_queue:
+        _log_queue = _LogQueue(handler)
+        handler = _log_queue.queue_handler
+    if log_sample_rate is not None:
+        # the records are dropped before they are formatted or enqueued
+        handler.addFilter(SampleFilter(log_sample_rate))
     logger.addHandler(handler)
     kitty_logger = logging.getLogger("kitty")
     kitty_logger.setLevel(level=logging.getLevelName(level.upper()))
@@ -86,15 +204,16 @@ def transform_data_to_bytes(data_in):
         return bytes(int(data_in))
     elif isinstance(data_in, str):
         return bytes(data_in, "utf-16")
-    elif isinstance(data_in, Bits):
-        return data_in.tobytes()
     elif isinstance(data_in, list):
         tmp_data = []
         for data in data_in:
             tmp_data.append(transform_data_to_bytes(data).decode("utf-16"))
         return bytes(",".join(tmp_data), "utf-16")
-    else:
-        return bytes(data_in)
+    from bitstring import Bits
+
+    if isinstance(data_in, Bits):
+        return data_in.tobytes()
+    return bytes(data_in)
 
 
 def try_b64encode(data_in):
@@ -129,7 +248,24 @@ def init_pycurl(debug=False):
     :tpye debug: bool
     :return: pycurl instance
     """
+    import pycurl
+
     _curl = pycurl.Curl()
+    configure_pycurl(_curl, debug=debug)
+    return _curl
+
+
+def configure_pycurl(_curl, debug=False):
+    """
+    Applies the basic configuration to a new or to a reset pycurl instance
+    :param _curl: pycurl instance
+    :type _curl: pycurl.Curl
+    :param debug: confugres verbosity of http client
+    :tpye debug: bool
+    :return: pycurl instance
+    """
+    import pycurl
+
     _curl.setopt(pycurl.SSL_OPTIONS, pycurl.SSLVERSION_TLSv1_2)
     _curl.setopt(pycurl.SSL_VERIFYPEER, False)
     _curl.setopt(pycurl.SSL_VERIFYHOST, False)
@@ -149,6 +285,8 @@ def download_file(url, dst_file):
     :type dst_file: str
     :return: None
     """
+    import pycurl
+
     _curl = init_pycurl()
     buffer = BytesIO()
     _curl = pycurl.Curl()
@@ -225,3 +363,15 @@ def str2bool(v):
         return False
     else:
         raise argparse.ArgumentTypeError("Boolean value expected.")
+
+
+def int_list(arg_string):
+    """
+    Transforms comma separated integers to tuple, like: "7,28" -> (7, 28)
+    :type arg_string: str
+    :rtype: tuple
+    """
+    try:
+        return tuple(int(item) for item in arg_string.split(",") if item.strip())
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{arg_string} is not comma separated list of integers")
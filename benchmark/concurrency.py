@@ -0,0 +1,26 @@
+"""
+Requests per second of the whole fuzzer against the Flask test application at different concurrency levels
+
+Usage: python -m benchmark.concurrency [concurrency ...]
+"""
+import os
+import sys
+
+from benchmark.utils import TEST_API_DIR, flask_test_application, run_fuzzer
+
+DEFAULT_LEVELS = (1, 8, 64)
+
+
+def main(levels):
+    api_definition_file = os.path.join(TEST_API_DIR, "openapi_v2.json")
+    with flask_test_application() as url:
+        print(f"{'concurrency':>12} {'tests':>8} {'seconds':>9} {'requests/s':>11}")
+        for concurrency in levels:
+            tests, _, run_time = run_fuzzer(
+                api_definition_file, url, concurrency=concurrency
+            )
+            print(f"{concurrency:>12} {tests:>8} {run_time:>9.2f} {tests / run_time:>11.1f}")
+
+
+if __name__ == "__main__":
+    main([int(level) for level in sys.argv[1:]] or DEFAULT_LEVELS)
@@ -0,0 +1,81 @@
+"""
+Time of generating the tests of generated API definitions by mutating and rendering the kitty templates (live) and by
+reading them from the mutation corpus (corpus), the time of building the corpus and its size, and the end-to-end
+throughput of the fuzzer against the stub target with and without the corpus
+
+Usage: python -m benchmark.corpus [operations ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from apifuzzer.fuzz_model import APIFuzzerModel, CorpusTemplate, LazyTemplate
+from apifuzzer.mutation_corpus import MutationCorpus
+from apifuzzer.openapi_template_generator import OpenAPITemplateGenerator
+from apifuzzer.server_fuzzer import render_template_fields
+from apifuzzer.utils import get_logger
+from benchmark.spec_generator import write_spec
+from benchmark.utils import run_fuzzer, stub_test_application
+
+DEFAULT_SIZES = (8, 64)
+SEED = 42
+
+
+def generate_tests(templates, corpus):
+    """
+    Walks the model like the fuzzer does: mutates, renders the payload and collects the test info of each test
+    :return: CPU time per test in microseconds
+    :rtype: float
+    """
+    logger = get_logger("benchmark")
+    model = APIFuzzerModel()
+    for template in templates:
+        model.connect(CorpusTemplate(template, corpus) if corpus else LazyTemplate(template))
+    tests = 0
+    start = time.process_time()
+    while model.mutate():
+        node = model.get_sequence()[-1].dst
+        if corpus:
+            node.payload()
+        else:
+            render_template_fields(node, logger)
+        model.get_test_info()
+        tests += 1
+    return (time.process_time() - start) / tests * 1e6
+
+
+def main(sizes):
+    print(
+        f"{'operations':>11} {'tests':>7} {'build s':>8} {'size MB':>8} {'live us':>8} {'corpus us':>10} "
+        f"{'live tests/s':>13} {'corpus tests/s':>15}"
+    )
+    with stub_test_application() as url:
+        for operations in sizes:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                spec_file = os.path.join(tmp_dir, "openapi.json")
+                write_spec(operations, spec_file)
+                template_generator = OpenAPITemplateGenerator(
+                    api_definition_url=None, api_definition_file=spec_file, seed=SEED
+                )
+                template_generator.process_api_resources()
+                templates = template_generator.templates
+                corpus_dir = os.path.join(tmp_dir, "corpus")
+                start = time.perf_counter()
+                corpus = MutationCorpus.load_or_build(corpus_dir, templates, SEED)
+                build_time = time.perf_counter() - start
+                size = os.path.getsize(corpus.path)
+                live_time = generate_tests(templates, None)
+                corpus_time = generate_tests(templates, corpus)
+                tests, _, live_run = run_fuzzer(spec_file, url, seed=SEED, spec_cache=False, headless=True)
+                _, _, corpus_run = run_fuzzer(
+                    spec_file, url, seed=SEED, spec_cache=False, headless=True, corpus_dir=corpus_dir
+                )
+            print(
+                f"{operations:>11} {tests:>7} {build_time:>8.2f} {size / 2 ** 20:>8.2f} {live_time:>8.1f} "
+                f"{corpus_time:>10.1f} {tests / live_run:>13.1f} {tests / corpus_run:>15.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,74 @@
+"""
+Time the fuzzer spends on the user interface per test with the kitty web interface (collecting the current test and
+template info for it) and in headless mode (counting the tests for the progress line), compared to only moving the
+model to the next test. No request is sent, so the target application is not needed.
+
+Usage: python -m benchmark.headless [operations ...]
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+
+from kitty.data.data_manager import DataManager
+from kitty.interfaces import WebInterface
+
+from apifuzzer.fuzz_model import APIFuzzerModel, LazyTemplate
+from apifuzzer.openapi_template_generator import OpenAPITemplateGenerator
+from apifuzzer.progress_interface import ProgressInterface
+from apifuzzer.server_fuzzer import OpenApiServerFuzzer
+from benchmark.spec_generator import write_spec
+
+DEFAULT_SIZES = (8, 40)
+MAX_TESTS = 5000
+
+
+def run_tests(templates, interface):
+    """
+    :param interface: kitty user interface, only the model is mutated if None
+    :return: number of tests and the time of running them in seconds
+    :rtype: tuple
+    """
+    model = APIFuzzerModel()
+    for template in templates:
+        model.connect(LazyTemplate(template))
+    fuzzer = OpenApiServerFuzzer()
+    fuzzer.set_model(model)
+    fuzzer.user_interface = interface
+    fuzzer.dataman = DataManager(":memory:")
+    fuzzer.dataman.start()
+    tests = min(model.num_mutations(), MAX_TESTS)
+    if isinstance(interface, ProgressInterface):
+        interface.set_total(tests)
+    start = time.perf_counter()
+    for _ in range(tests):
+        model.mutate()
+        if interface is not None:
+            fuzzer._update_test_info()
+            interface.progress()
+    elapsed = time.perf_counter() - start
+    fuzzer.dataman.submit_task(None)
+    return tests, elapsed
+
+
+def main(sizes):
+    print(f"{'operations':>11} {'tests':>7} {'model us':>9} {'web us':>7} {'headless us':>12}")
+    for operations in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            spec_file = os.path.join(tmp_dir, "openapi.json")
+            write_spec(operations, spec_file)
+            template_generator = OpenAPITemplateGenerator(api_definition_url=None, api_definition_file=spec_file)
+            template_generator.process_api_resources()
+        templates = template_generator.templates
+        tests, model_time = run_tests(templates, None)
+        _, web_time = run_tests(templates, WebInterface())
+        _, headless_time = run_tests(templates, ProgressInterface(stream=io.StringIO()))
+        print(
+            f"{operations:>11} {tests:>7} {model_time / tests * 1e6:>9.1f} "
+            f"{(web_time - model_time) / tests * 1e6:>7.1f} {(headless_time - model_time) / tests * 1e6:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,68 @@
+"""
+Start time of the CLI without fuzzing (--version, --help), compared to the start of the bare interpreter, and the
+slowest imports reported by python -X importtime
+
+Usage: python -m benchmark.import_time [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmark.utils import REPO_DIR
+
+APIFUZZER = os.path.join(REPO_DIR, "APIFuzzer")
+DEFAULT_RUNS = 20
+# modules which are needed only for fuzzing
+HEAVY_MODULES = ("kitty", "pycurl", "bitstring", "requests", "junit_xml", "ruamel", "json_ref_dict", "yaml")
+
+
+def import_times(*args):
+    """
+    :return: cumulative import time in microseconds by module name
+    :rtype: dict
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", APIFUZZER, *args], capture_output=True, text=True, cwd=REPO_DIR
+    )
+    times = dict()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def wall_time(command, runs):
+    """
+    :return: median run time of the command in seconds
+    :rtype: float
+    """
+    times = list()
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=REPO_DIR)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(runs):
+    print(f"{'command':>24} {'median ms':>10}")
+    for name, command in (
+        ("python -c pass", [sys.executable, "-c", "pass"]),
+        ("APIFuzzer --version", [sys.executable, APIFUZZER, "--version"]),
+        ("APIFuzzer --help", [sys.executable, APIFUZZER, "--help"]),
+    ):
+        print(f"{name:>24} {wall_time(command, runs) * 1000:>10.1f}")
+    times = import_times("--version")
+    heavy = sorted(module for module in times if module.split(".")[0] in HEAVY_MODULES)
+    print(f"heavy modules imported by --version: {', '.join(heavy) or 'none'}")
+    print("slowest imports of --version (cumulative ms):")
+    for module, cumulative in sorted(times.items(), key=lambda item: item[1], reverse=True)[:10]:
+        print(f"{module:>40} {cumulative / 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RUNS)
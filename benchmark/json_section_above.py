@@ -0,0 +1,62 @@
+"""
+Time of moving the schema sections up in API definitions of different sizes with the current implementation (one pass,
+the deep dictionaries are resolved with an explicit stack) and with the former one, which resolved the moved up
+sections again (the reference implementation of the unit tests)
+
+Usage: python -m benchmark.json_section_above [operations ...]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+from json_ref_dict import materialize, RefDict
+
+from apifuzzer.move_json_parts import JsonSectionAbove
+from benchmark.spec_generator import write_spec
+from test.legacy_implementations import LegacyJsonSectionAbove
+
+DEFAULT_SIZES = (100, 1000, 5000)
+NESTING_DEPTHS = (16, 256)
+REPEAT = 3
+
+
+def nested_schemas(depth):
+    """
+    :return: dictionaries nested into each other with a schema section on each level, the recursive implementation
+        resolves the levels below a schema section again after moving it up
+    :rtype: dict
+    """
+    data = {"type": "string"}
+    for level in range(depth):
+        data = {"schema": {"type": "object", "title": f"level {level}"}, "examples": data}
+    return data
+
+
+def materialized_spec(operations):
+    """
+    :return: generated definition with the references resolved, like the template generator processes it
+    :rtype: dict
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        spec_file = os.path.join(tmp_dir, "openapi.json")
+        write_spec(operations, spec_file)
+        return materialize(RefDict(spec_file))
+
+
+def best_time(resolver_class, definition):
+    return min(timeit.repeat(lambda: resolver_class(definition).resolve(), number=1, repeat=REPEAT))
+
+
+def main(sizes):
+    print(f"{'definition':>22} {'legacy s':>12} {'s':>8}")
+    cases = [(f"{operations} operations", materialized_spec(operations)) for operations in sizes]
+    cases.extend((f"{depth} nested schemas", nested_schemas(depth)) for depth in NESTING_DEPTHS)
+    for name, definition in cases:
+        assert JsonSectionAbove(definition).resolve() == LegacyJsonSectionAbove(definition).resolve()
+        legacy_time = best_time(LegacyJsonSectionAbove, definition)
+        current_time = best_time(JsonSectionAbove, definition)
+        print(f"{name:>22} {legacy_time:>12.4f} {current_time:>8.4f}")
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,76 @@
+"""
+Time of preparing a fuzz request with the different logging setups, the overhead is compared to the time with
+logging disabled. No request is sent, so the target application is not needed.
+
+Usage: python -m benchmark.logging_overhead [number of requests]
+"""
+import logging
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from timeit import repeat
+
+from apifuzzer.fuzzer_target.fuzz_request_sender import FuzzerTarget
+from apifuzzer.utils import set_logger, flush_logs
+
+DEFAULT_REQUESTS = 2000
+
+SETUPS = [
+    ("warning", dict(level="warning")),
+    ("warning, queue", dict(level="warning", log_queue=True)),
+    ("debug", dict(level="debug")),
+    ("debug, queue", dict(level="debug", log_queue=True)),
+    ("debug, queue, 1% sampled", dict(level="debug", log_queue=True, log_sample_rate=0.01)),
+]
+
+
+def prepare_requests(target, requests):
+    for test_number in range(requests):
+        target.pre_test(test_number)
+        pending_request = target.prepare_request(
+            url="/pets/{id}",
+            method="POST",
+            params={"limit": "10", "fuzz": "A" * 100 + "\x00"},
+            path_variables={"id": str(test_number)},
+            headers={"X-Fuzz": "%s" * 50},
+            data={"name": "%n" * 200, "tags": ["a", "b"], "age": test_number},
+            content_type="application/json",
+        )
+        target._release_handle(pending_request)
+
+
+def measure(target, requests):
+    """
+    :return: the best time of preparing a request in seconds
+    :rtype: float
+    """
+    return min(repeat(lambda: prepare_requests(target, requests), number=1, repeat=5)) / requests
+
+
+def main(requests):
+    print(f"{'logging':>26} {'us/request':>11} {'overhead us':>12}")
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        # the handlers write to the redirected stdout
+        set_logger("warning", basic_output=True)
+        target = FuzzerTarget(
+            name="target", base_url="http://127.0.0.1:5000", report_dir=tempfile.mkdtemp(), auth_headers={},
+            junit_report_path=None,
+        )
+        logging.disable(logging.CRITICAL)
+        baseline = measure(target, requests)
+        logging.disable(logging.NOTSET)
+        results = list()
+        for name, setup in SETUPS:
+            set_logger(basic_output=True, **setup)
+            elapsed = measure(target, requests)
+            flush_logs()
+            results.append((name, elapsed))
+        set_logger("warning", basic_output=True)
+    print(f"{'disabled':>26} {baseline * 1e6:>11.1f} {0:>12.1f}")
+    for name, elapsed in results:
+        print(f"{name:>26} {elapsed * 1e6:>11.1f} {(elapsed - baseline) * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REQUESTS)
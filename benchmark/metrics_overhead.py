@@ -0,0 +1,52 @@
+"""
+Time of updating the metrics of a fuzz request (request counter, latency and payload size histograms and test result
+counter), compared to the time of preparing the request. No request is sent, so the target application is not
+needed.
+
+Usage: python -m benchmark.metrics_overhead [number of requests]
+"""
+import logging
+import sys
+import tempfile
+from timeit import repeat
+
+from apifuzzer.fuzzer_target.fuzz_request_sender import FuzzerTarget
+from apifuzzer.metrics import FuzzMetrics
+from benchmark.logging_overhead import measure
+
+DEFAULT_REQUESTS = 20000
+TEMPLATES = 500
+STATUS_CODES = (200, 400, 404, 500)
+
+
+def update_metrics(metrics, requests):
+    for test_number in range(requests):
+        metrics.requests.inc((f"resource_{test_number % TEMPLATES}|post", "POST", STATUS_CODES[test_number % 4]))
+        metrics.request_latency.observe(0.0042)
+        metrics.payload_size.observe(512)
+        metrics.tests.inc(("failed",))
+
+
+def main(requests):
+    logging.disable(logging.CRITICAL)
+    target = FuzzerTarget(
+        name="target", base_url="http://127.0.0.1:5000", report_dir=tempfile.mkdtemp(), auth_headers={},
+        junit_report_path=None,
+    )
+    prepare_time = measure(target, min(requests, 2000))
+    metrics = FuzzMetrics()
+    # the template names are built outside of the measured time in the fuzzer, subtract them here too
+    label_time = min(repeat(
+        lambda: [f"resource_{test_number % TEMPLATES}|post" for test_number in range(requests)], number=1, repeat=5
+    )) / requests
+    update_time = min(repeat(lambda: update_metrics(metrics, requests), number=1, repeat=5)) / requests - label_time
+    render_time = min(repeat(metrics.registry.render, number=1, repeat=5))
+    print(f"{'prepare request us':>19} {'update metrics us':>18} {'overhead %':>11} {'render ms':>10}")
+    print(
+        f"{prepare_time * 1e6:>19.1f} {update_time * 1e6:>18.2f} {update_time / prepare_time * 100:>11.2f} "
+        f"{render_time * 1000:>10.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REQUESTS)
@@ -0,0 +1,68 @@
+"""
+Time until the first test and memory of the model, when the kitty templates of all API resources are compiled before
+the fuzzing (eager) and when they are compiled as the fuzzer reaches them (lazy)
+
+Usage: python -m benchmark.model_build [operations ...]
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from apifuzzer.fuzz_model import APIFuzzerModel, LazyTemplate
+from apifuzzer.openapi_template_generator import OpenAPITemplateGenerator
+from benchmark.spec_generator import write_spec
+
+DEFAULT_SIZES = (500, 2000, 5000)
+
+
+def first_test(templates, lazy):
+    """
+    Builds the model and moves it to the first test, like the fuzzer does before sending the first request
+    """
+    model = APIFuzzerModel()
+    for template in templates:
+        model.connect(LazyTemplate(template) if lazy else template.compile_template())
+    model.num_mutations()
+    model.hash()
+    model.mutate()
+    model.get_test_info()
+    return model
+
+
+def measure(templates, lazy):
+    gc.collect()
+    start = time.perf_counter()
+    model = first_test(templates, lazy)
+    elapsed = time.perf_counter() - start
+    del model
+    gc.collect()
+    tracemalloc.start()
+    model = first_test(templates, lazy)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del model
+    return elapsed, memory
+
+
+def main(sizes):
+    print(f"{'operations':>11} {'templates':>10} {'eager s':>8} {'lazy s':>7} {'eager MB':>9} {'lazy MB':>8}")
+    for operations in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            spec_file = os.path.join(tmp_dir, "openapi.json")
+            write_spec(operations, spec_file)
+            template_generator = OpenAPITemplateGenerator(api_definition_url=None, api_definition_file=spec_file)
+            template_generator.process_api_resources()
+        templates = template_generator.templates
+        eager_time, eager_memory = measure(templates, lazy=False)
+        lazy_time, lazy_memory = measure(templates, lazy=True)
+        print(
+            f"{operations:>11} {len(templates):>10} {eager_time:>8.2f} {lazy_time:>7.2f} "
+            f"{eager_memory / 2 ** 20:>9.1f} {lazy_memory / 2 ** 20:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
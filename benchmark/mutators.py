@@ -0,0 +1,72 @@
+"""
+Time of a mutation of the custom string fields with different value lengths. RandomBitsField and Utf8Chars are compared
+to their former implementations (the reference implementations of the unit tests), which drew a random number and
+encoded a character at a time.
+
+Usage: python -m benchmark.mutators [value length ...]
+"""
+import sys
+import timeit
+
+from apifuzzer.custom_fuzzers import RandomBitsField, Utf8Chars, UnicodeStrings, utf8_chars
+from test.legacy_implementations import LegacyRandomBitsField, LegacyUtf8Chars
+
+DEFAULT_LENGTHS = (4, 64, 1024)
+# CJK ideographs, 3 bytes each in UTF-8
+UTF8_POSITION = 0x4E00
+NUMBER = 2000
+REPEAT = 5
+
+
+def fields(length):
+    """
+    :param length: length of the value of the fields, the mutations are at most twice as long
+    :return: field type name, legacy field (or None) and field
+    :rtype: list
+    """
+    value = "x" * length
+    return [
+        ("RandomBitsField", LegacyRandomBitsField(value, "legacy"), RandomBitsField(value, "field")),
+        (
+            "Utf8Chars",
+            LegacyUtf8Chars(value, "legacy", min_length=0, max_length=length * 2),
+            Utf8Chars(value, "field", min_length=0, max_length=length * 2),
+        ),
+        ("UnicodeStrings", None, UnicodeStrings(value, "field")),
+    ]
+
+
+def mutation_time(field):
+    """
+    :return: best time of a mutation in microseconds
+    :rtype: float
+    """
+    field.reset()
+
+    def mutate():
+        if isinstance(field, Utf8Chars):
+            # the same characters are generated in each round
+            field.position = UTF8_POSITION
+        if not field.mutate():
+            field.reset()
+
+    return min(timeit.repeat(mutate, number=NUMBER, repeat=REPEAT)) / NUMBER * 1e6
+
+
+def main(lengths):
+    start = timeit.default_timer()
+    utf8_chars(0, 1)
+    print(f"UTF-8 table built in {timeit.default_timer() - start:.3f} s")
+    print(f"{'field':>16} {'value length':>13} {'legacy us':>10} {'us':>8} {'speedup':>8}")
+    for length in lengths:
+        for name, legacy_field, field in fields(length):
+            field_time = mutation_time(field)
+            if legacy_field is None:
+                print(f"{name:>16} {length:>13} {'':>10} {field_time:>8.2f}")
+                continue
+            legacy_time = mutation_time(legacy_field)
+            print(f"{name:>16} {length:>13} {legacy_time:>10.2f} {field_time:>8.2f} {legacy_time / field_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(length) for length in sys.argv[1:]] or DEFAULT_LENGTHS)
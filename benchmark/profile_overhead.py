@@ -0,0 +1,38 @@
+"""
+Time of recording the phases of a test with the phase profiler, compared to only reading the clock at the phase
+boundaries like the instrumented code does when profiling is disabled
+
+Usage: python -m benchmark.profile_overhead [number of tests]
+"""
+import sys
+from time import perf_counter
+from timeit import repeat
+
+from apifuzzer.phase_profiler import PhaseProfiler, PHASES
+
+DEFAULT_TESTS = 100000
+TEMPLATES = 500
+
+
+def run_tests(profiler, tests):
+    templates = [f"resource_{index}|post" for index in range(TEMPLATES)]
+    for test_number in range(tests):
+        template = templates[test_number % TEMPLATES]
+        for phase in PHASES:
+            phase_start = perf_counter()
+            if profiler is not None:
+                profiler.record(phase, template, perf_counter() - phase_start)
+
+
+def main(tests):
+    disabled = min(repeat(lambda: run_tests(None, tests), number=1, repeat=5)) / tests
+    enabled = min(repeat(lambda: run_tests(PhaseProfiler(), tests), number=1, repeat=5)) / tests
+    print(f"{'phases':>7} {'disabled us/test':>17} {'profiling us/test':>18} {'us/phase':>9}")
+    print(
+        f"{len(PHASES):>7} {disabled * 1e6:>17.2f} {enabled * 1e6:>18.2f} "
+        f"{(enabled - disabled) / len(PHASES) * 1e6:>9.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TESTS)
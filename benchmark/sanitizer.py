@@ -0,0 +1,49 @@
+"""
+Time of preparing fuzz values for pycurl with the one pass sanitizer and with the former character by character
+chopping (the reference implementation of the unit tests)
+
+Usage: python -m benchmark.sanitizer [value length in bytes]
+"""
+import random
+import sys
+from timeit import timeit
+
+from apifuzzer.fuzzer_target.request_base_functions import FuzzerTargetBase
+from test.legacy_implementations import LegacyChopping
+
+DEFAULT_LENGTH = 10 * 1024
+
+
+def fuzz_value(length, rejected_ratio=0.01):
+    """
+    :return: printable ASCII value with some characters pycurl rejects
+    :rtype: str
+    """
+    rand = random.Random(length)
+    return "".join(
+        rand.choice("\x00é中") if rand.random() < rejected_ratio else chr(rand.randint(0x21, 0x7e))
+        for _ in range(length)
+    )
+
+
+def main(length):
+    value = fuzz_value(length)
+    # the worst case of chopping: everything is removed from the left, then from the right
+    worst_value = "a" * (length - 1) + "\x00"
+    legacy, sanitizer = LegacyChopping(), FuzzerTargetBase(auth_headers={})
+    print(f"{'case':>24} {'chopping ms':>12} {'sanitizer ms':>13}")
+    cases = [
+        ("url", lambda target: target.format_pycurl_url(f"http://127.0.0.1:5000/{value}/end")),
+        ("query param", lambda target: target.format_pycurl_query_param("http://127.0.0.1:5000/", {"id": value})),
+        ("header", lambda target: target.format_pycurl_header({"X-Fuzz": value})),
+        ("url worst case", lambda target: target.format_pycurl_url(f"http://127.0.0.1:5000/{worst_value}")),
+    ]
+    for name, case in cases:
+        assert case(legacy) == case(sanitizer)
+        legacy_time = timeit(lambda: case(legacy), number=1)
+        sanitizer_time = timeit(lambda: case(sanitizer), number=10) / 10
+        print(f"{name:>24} {legacy_time * 1000:>12.2f} {sanitizer_time * 1000:>13.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_LENGTH)
@@ -0,0 +1,85 @@
+"""
+Generates OpenAPI v3 definitions with the given number of operations, for measuring the preparation of large APIs
+
+Usage: python -m benchmark.spec_generator OPERATIONS OUTPUT_FILE
+"""
+import json
+import sys
+
+METHODS = ("get", "post", "put", "delete")
+
+
+def _body_operation(index):
+    return {
+        "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}],
+        "requestBody": {
+            "content": {
+                "application/json": {"schema": {"$ref": "#/components/schemas/Item"}},
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            f"file_{index}": {"type": "string", "format": "binary"},
+                            "description": {"type": "string"},
+                        },
+                    }
+                },
+            }
+        },
+        "responses": {"200": {"description": "OK"}},
+    }
+
+
+def _query_operation(index):
+    return {
+        "parameters": [
+            {"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}},
+            {"name": f"filter_{index}", "in": "query", "schema": {"type": "string"}},
+            {"name": "limit", "in": "query", "schema": {"type": "integer", "default": 10}},
+            {"name": "X-Request-Id", "in": "header", "schema": {"type": "string", "format": "uuid"}},
+        ],
+        "responses": {"200": {"description": "OK", "content": {"application/json": {"schema": {
+            "$ref": "#/components/schemas/Item"}}}}},
+    }
+
+
+def generate_spec(operations):
+    """
+    :param operations: number of operations, every resource has 4 methods, half of them with request body
+    :type operations: int
+    :return: OpenAPI v3 definition
+    :rtype: dict
+    """
+    paths = dict()
+    for index in range(operations):
+        method = METHODS[index % len(METHODS)]
+        resource = paths.setdefault(f"/resource_{index // len(METHODS)}/{{id}}", dict())
+        resource[method] = _body_operation(index) if method in ("post", "put") else _query_operation(index)
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": f"Generated API with {operations} operations", "version": "1.0.0"},
+        "servers": [{"url": "http://127.0.0.1:5000/"}],
+        "paths": paths,
+        "components": {
+            "schemas": {
+                "Item": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "integer", "format": "int64"},
+                        "name": {"type": "string", "example": "item"},
+                        "tags": {"type": "string", "enum": ["a", "b", "c"]},
+                        "price": {"type": "number", "format": "double"},
+                    },
+                }
+            }
+        },
+    }
+
+
+def write_spec(operations, path):
+    with open(path, "w") as f:
+        json.dump(generate_spec(operations), f)
+
+
+if __name__ == "__main__":
+    write_spec(int(sys.argv[1]), sys.argv[2])
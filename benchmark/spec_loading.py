@@ -0,0 +1,70 @@
+"""
+Time of parsing large JSON and YAML API definitions with the parsers used before (ruamel.yaml in
+get_api_definition_from_file, json and PyYAML's pure Python safe_load in json_ref_dict) and with
+apifuzzer.spec_loader, and time of resolving the references of the YAML definition with the json_ref_dict loader and
+the apifuzzer.spec_loader one
+
+Usage: python -m benchmark.spec_loading [operations ...]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+from json_ref_dict import materialize, RefDict
+from json_ref_dict.loader import loader
+from ruamel.yaml import YAML
+
+from apifuzzer.spec_loader import parse_api_definition, load_api_document, clear_document_cache
+from benchmark.spec_generator import generate_spec
+
+DEFAULT_SIZES = (1000, 5000)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def resolve(spec_file):
+    clear_document_cache()
+    return materialize(RefDict(spec_file))
+
+
+def main(sizes):
+    print(f"{'operations':>11} {'format':>6} {'parser':>22} {'s':>7}")
+    for operations in sizes:
+        spec = generate_spec(operations)
+        json_content = json.dumps(spec).encode()
+        yaml_content = yaml.dump(spec, Dumper=yaml.CSafeDumper).encode()
+        cases = [
+            ("json", "json.loads", json.loads, json_content),
+            ("json", "spec_loader", parse_api_definition, json_content),
+            ("yaml", "ruamel.yaml safe", YAML(typ="safe").load, yaml_content.decode()),
+            ("yaml", "yaml.safe_load", yaml.safe_load, yaml_content),
+            ("yaml", "spec_loader", parse_api_definition, yaml_content),
+        ]
+        for content_format, parser, parse, content in cases:
+            parsed, parse_time = timed(parse, content)
+            assert parsed == spec
+            print(f"{operations:>11} {content_format:>6} {parser:>22} {parse_time:>7.3f}")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            spec_file = os.path.join(tmp_dir, "openapi.yaml")
+            with open(spec_file, "wb") as f:
+                f.write(yaml_content)
+            resolved, resolve_time = timed(resolve, spec_file)
+            loader.unregister(load_api_document)
+            try:
+                default_resolved, default_resolve_time = timed(resolve, spec_file)
+            finally:
+                loader.register(load_api_document)
+            assert resolved == default_resolved
+        print(f"{operations:>11} {'yaml':>6} {'resolve json_ref_dict':>22} {default_resolve_time:>7.3f}")
+        print(f"{operations:>11} {'yaml':>6} {'resolve spec_loader':>22} {resolve_time:>7.3f}")
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,38 @@
+"""
+Time of generating the fuzz templates from API definitions of different sizes, the time per operation should not grow
+with the size of the definition
+
+Usage: python -m benchmark.template_generation [operations ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from apifuzzer.openapi_template_generator import OpenAPITemplateGenerator
+from benchmark.spec_generator import write_spec
+
+DEFAULT_SIZES = (1000, 5000, 20000)
+
+
+def main(sizes):
+    print(f"{'operations':>11} {'templates':>10} {'load s':>8} {'generate s':>11} {'us/operation':>13}")
+    for operations in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            spec_file = os.path.join(tmp_dir, "openapi.json")
+            write_spec(operations, spec_file)
+            start = time.perf_counter()
+            # the definition is loaded and its references are resolved in the constructor
+            template_generator = OpenAPITemplateGenerator(api_definition_url=None, api_definition_file=spec_file)
+            load_time = time.perf_counter() - start
+            start = time.perf_counter()
+            template_generator.process_api_resources()
+            generate_time = time.perf_counter() - start
+        print(
+            f"{operations:>11} {len(template_generator.templates):>10} {load_time:>8.2f} {generate_time:>11.2f} "
+            f"{generate_time / operations * 1e6:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
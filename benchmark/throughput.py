@@ -0,0 +1,198 @@
+"""
+End-to-end throughput of the fuzzer: runs the whole Fuzzer.prepare() / run() pipeline against local targets (the Flask
+test application and a stdlib HTTP stub) with the bundled and generated API definitions, and reports the tests per
+second, the prepare time, the peak RSS and the bytes written to the report directory. Every case runs in a fresh
+process, so the peak RSS belongs to the case.
+
+The results can be saved as JSON and compared to a saved baseline, the exit code is 1 if a metric is worse than the
+baseline by more than the threshold.
+
+Usage: python -m benchmark.throughput [--output results.json] [--baseline baseline.json] [--threshold 0.2]
+                                      [--repeat N] [case ...]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmark.spec_generator import write_spec
+from benchmark.utils import REPO_DIR, TEST_API_DIR, flask_test_application, stub_test_application
+
+# name: API definition (bundled file or number of generated operations), target, number of tests (all if None)
+CASES = {
+    "openapi_v2-flask": (os.path.join(TEST_API_DIR, "openapi_v2.json"), "flask", None),
+    "openapi_v3-flask": (os.path.join(TEST_API_DIR, "openapi_v3.json"), "flask", None),
+    "openapi_v2-stub": (os.path.join(TEST_API_DIR, "openapi_v2.json"), "stub", None),
+    "generated_8-stub": (8, "stub", None),
+    # large definition, the preparation dominates, only the first tests are executed
+    "generated_2000-stub": (2000, "stub", 2000),
+}
+TARGETS = {"flask": flask_test_application, "stub": stub_test_application}
+# metric: True if higher is better
+METRICS = {"tests_per_s": True, "prepare_s": False, "peak_rss_mb": False, "report_bytes": False}
+DEFAULT_THRESHOLD = 0.2
+
+
+def directory_size(path):
+    return sum(
+        os.path.getsize(os.path.join(directory, file_name))
+        for directory, _, file_names in os.walk(path)
+        for file_name in file_names
+    )
+
+
+def run_case(name, url):
+    """
+    Runs the case in the current process
+    :return: measured metrics
+    :rtype: dict
+    """
+    from apifuzzer.fuzzer import Fuzzer
+
+    api_definition, _, max_tests = CASES[name]
+    work_dir = tempfile.mkdtemp(prefix="apifuzzer_benchmark_")
+    try:
+        if isinstance(api_definition, int):
+            api_definition_file = os.path.join(work_dir, "openapi.json")
+            write_spec(api_definition, api_definition_file)
+        else:
+            api_definition_file = api_definition
+        report_dir = os.path.join(work_dir, "reports")
+        prog = Fuzzer(
+            report_dir=report_dir,
+            test_level=1,
+            log_level="critical",
+            basic_output=True,
+            alternate_url=url,
+            api_definition_file=api_definition_file,
+            spec_cache=False,
+            headless=True,
+        )
+        start = time.perf_counter()
+        prog.prepare()
+        prepare_time = time.perf_counter() - start
+        tests = sum(template.num_mutations() for template in prog.templates)
+        start = time.perf_counter()
+        if max_tests is not None and max_tests < tests:
+            tests = max_tests
+            prog._fuzz(prog._build_model(), report_dir, None, test_list=f"0-{max_tests - 1}")
+        else:
+            prog.run()
+        run_time = time.perf_counter() - start
+        return {
+            "tests": tests,
+            "tests_per_s": tests / run_time,
+            "prepare_s": prepare_time,
+            "run_s": run_time,
+            # kilobytes on Linux
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "report_bytes": directory_size(report_dir),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def measure_case(name, url, repeat):
+    """
+    Runs the case in fresh processes
+    :return: the best value of each metric
+    :rtype: dict
+    """
+    runs = list()
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmark.throughput", "--run_case", name, "--url", url],
+            capture_output=True, text=True, cwd=REPO_DIR, check=True,
+        )
+        runs.append(json.loads(result.stdout.splitlines()[-1]))
+    best = dict(runs[0])
+    for metric, higher_is_better in METRICS.items():
+        values = [run[metric] for run in runs]
+        best[metric] = max(values) if higher_is_better else min(values)
+    return best
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    :param results: results of the current run
+    :type results: dict
+    :param baseline: results of the baseline run
+    :type baseline: dict
+    :param threshold: allowed relative change in the wrong direction, e.g. 0.2 for 20%
+    :type threshold: float
+    :return: descriptions of the metrics worse than the baseline by more than the threshold
+    :rtype: list
+    """
+    regressions = list()
+    for name, result in results["cases"].items():
+        baseline_result = baseline["cases"].get(name)
+        if baseline_result is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            value, baseline_value = result[metric], baseline_result[metric]
+            if not baseline_value:
+                continue
+            change = (value - baseline_value) / baseline_value
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(f"{name} {metric}: {value:.3f} vs baseline {baseline_value:.3f} ({change:+.1%})")
+    return regressions
+
+
+def main(case_names, output=None, baseline=None, threshold=DEFAULT_THRESHOLD, repeat=1):
+    from apifuzzer.version import get_version
+
+    results = {
+        "version": get_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "cases": dict(),
+    }
+    print(f"{'case':>22} {'tests':>6} {'tests/s':>8} {'prepare s':>10} {'peak RSS MB':>12} {'report bytes':>13}")
+    for target_name, target in TARGETS.items():
+        names = [name for name in case_names if CASES[name][1] == target_name]
+        if not names:
+            continue
+        with target() as url:
+            for name in names:
+                result = results["cases"][name] = measure_case(name, url, repeat)
+                print(
+                    f"{name:>22} {result['tests']:>6} {result['tests_per_s']:>8.1f} {result['prepare_s']:>10.3f} "
+                    f"{result['peak_rss_mb']:>12.1f} {result['report_bytes']:>13}"
+                )
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(results, json.load(f), threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end throughput benchmark")
+    parser.add_argument("cases", nargs="*", help=f"cases to run, default is all: {', '.join(CASES)}")
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument("--baseline", help="compare the results to this JSON file saved by an earlier run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed relative regression of the metrics, default is %(default)s")
+    parser.add_argument("--repeat", type=int, default=1, help="runs of each case, the best result is kept")
+    parser.add_argument("--run_case", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    unknown_cases = [name for name in args.cases if name not in CASES]
+    if unknown_cases:
+        parser.error(f"unknown cases: {', '.join(unknown_cases)}")
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.url)))
+        sys.exit(0)
+    sys.exit(main(args.cases or list(CASES), args.output, args.baseline, args.threshold, args.repeat))
@@ -0,0 +1,133 @@
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_API_DIR = os.path.join(REPO_DIR, "test", "test_api")
+
+
+def get_free_port():
+    """
+    :return: TCP port which is free on the loopback interface
+    :rtype: int
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"Nothing listens on port {port} after {timeout} seconds")
+
+
+@contextmanager
+def flask_test_application(port=None):
+    """
+    Starts the Flask test application (test/test_application.py) in a separate process
+    :param port: port to listen on, a free one is picked if not set
+    :return: url of the application
+    """
+    port = port or get_free_port()
+    cmd = [
+        sys.executable,
+        "-c",
+        f"from test.test_application import app; app.run(port={port}, threaded=True)",
+    ]
+    proc = subprocess.Popen(
+        cmd, cwd=REPO_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_port(port)
+        yield f"http://127.0.0.1:{port}/"
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """
+    Minimal target: answers every request immediately, every fourth one with 500 so some reports are written
+    """
+
+    protocol_version = "HTTP/1.1"
+    # the headers and the body are written separately, without this the delayed ACK holds every response for 40ms
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        status = 500 if len(self.path) % 4 == 0 else 200
+        body = b'{"status": %d}' % status
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = do_HEAD = do_OPTIONS = _respond
+
+    def log_message(self, format, *args):  # pylint: disable=W0622
+        pass
+
+
+def serve_stub(port):
+    ThreadingHTTPServer(("127.0.0.1", port), StubRequestHandler).serve_forever()
+
+
+@contextmanager
+def stub_test_application(port=None):
+    """
+    Starts the stdlib HTTP stub target in a separate process
+    :param port: port to listen on, a free one is picked if not set
+    :return: url of the application
+    """
+    port = port or get_free_port()
+    cmd = [sys.executable, "-c", f"from benchmark.utils import serve_stub; serve_stub({port})"]
+    proc = subprocess.Popen(cmd, cwd=REPO_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port)
+        yield f"http://127.0.0.1:{port}/"
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def run_fuzzer(api_definition_file, url, **fuzzer_kwargs):
+    """
+    Runs the whole fuzzer pipeline
+    :return: number of tests, prepare time and run time in seconds
+    :rtype: tuple
+    """
+    from apifuzzer.fuzzer import Fuzzer
+
+    report_dir = fuzzer_kwargs.pop("report_dir", None) or tempfile.mkdtemp()
+    prog = Fuzzer(
+        report_dir=report_dir,
+        test_level=1,
+        log_level=fuzzer_kwargs.pop("log_level", "critical"),
+        basic_output=True,
+        alternate_url=url,
+        api_definition_file=api_definition_file,
+        **fuzzer_kwargs,
+    )
+    start = time.perf_counter()
+    prog.prepare()
+    prepare_time = time.perf_counter() - start
+    tests = sum(template.num_mutations() for template in prog.templates)
+    start = time.perf_counter()
+    prog.run()
+    run_time = time.perf_counter() - start
+    return tests, prepare_time, run_time
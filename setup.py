@@ -48,7 +48,7 @@ setup_options = dict(
     author_email='peter.kiss@linuxadm.hu',
     url='https://github.com/KissPeter/APIFuzzer/',
     scripts=['APIFuzzer'],
-    packages=find_packages(exclude=["test"]),
+    packages=find_packages(exclude=["test", "benchmark"]),
     install_requires=get_requirements(),
     license="GNU General Public License v3.0",
     classifiers=[  # https://pypi.org/classifiers/
@@ -0,0 +1,161 @@
+"""
+Former implementations of the optimized code, kept unchanged as reference for the parity tests and the benchmarks
+"""
+import pycurl
+from bitstring import Bits
+from kitty.model.low_level.encoder import strToBytes
+
+from apifuzzer.custom_fuzzers import RandomBitsField, Utf8Chars
+from apifuzzer.fuzz_utils import container_name_to_param
+from apifuzzer.fuzzer_target.request_base_functions import FuzzerTargetBase
+from apifuzzer.move_json_parts import JsonSectionAbove
+from apifuzzer.utils import secure_randint
+
+
+class LegacyJsonSectionAbove(JsonSectionAbove):
+    """
+    Walks the whole definition again until no section is moved up, every dictionary is resolved recursively the same
+    way
+    """
+
+    def _resolve(self, data):
+        schema_fount = False
+        if isinstance(data, dict):
+            return_data = dict()
+            for key, value in data.items():
+                if key == self.section_to_up and value:
+                    schema_fount = True
+                    if isinstance(value, dict):
+                        return_data.update(value)
+                    else:
+                        return_data = value
+                elif isinstance(value, dict):
+                    return_data[key] = self.resolve(value)
+                elif isinstance(value, list):
+                    if not return_data.get(key):
+                        return_data[key] = list()
+                    for val in value:
+                        return_data[key].append(self.resolve(data=val))
+                else:
+                    return_data[key] = value
+        else:
+            return_data = data
+        return [return_data, schema_fount]
+
+    def resolve(self, data=None):
+        if data is None:
+            data = self.api_definition
+        resolved_in_this_iteration = True
+        while resolved_in_this_iteration:
+            data, resolved_in_this_iteration = self._resolve(data)
+        return data
+
+
+class LegacyChopping(FuzzerTargetBase):
+    """
+    Removes characters from the fuzz values one by one until pycurl.setopt accepts them
+    """
+
+    def __init__(self):
+        super().__init__(auth_headers={})
+        self.chop_left = True
+        self.chop_right = True
+
+    def chop_fuzz_value(self, original_fuzz_value, fuzz_value):
+        if self.chop_left:
+            fuzz_value = fuzz_value[1:]
+            if len(fuzz_value) == 0:
+                self.chop_left = False
+                fuzz_value = original_fuzz_value
+        elif self.chop_right:
+            fuzz_value = fuzz_value[:-1]
+            if len(fuzz_value) == 1:
+                self.chop_left = False
+        return fuzz_value
+
+    def format_pycurl_query_param(self, url, query_params):
+        _dummy_curl = pycurl.Curl()
+        _tmp_query_params = dict()
+        for k, v in query_params.items():
+            original_value = v
+            self.chop_left = True
+            self.chop_right = True
+            while True:
+                _test_query_params = _tmp_query_params.copy()
+                _query_param_name = container_name_to_param(k)
+                _test_query_params[_query_param_name] = v
+                try:
+                    _dummy_curl.setopt(pycurl.URL, "{}{}".format(url, self.dict_to_query_string(_test_query_params)))
+                    _tmp_query_params[_query_param_name] = v
+                    break
+                except (UnicodeEncodeError, ValueError):
+                    if len(v):
+                        v = self.chop_fuzz_value(original_fuzz_value=original_value, fuzz_value=v)
+                    else:
+                        _tmp_query_params[_query_param_name] = ""
+                        break
+        return self.dict_to_query_string(_tmp_query_params)
+
+    def format_pycurl_url(self, url):
+        _dummy_curl = pycurl.Curl()
+        _tmp_url_list = list()
+        for part in url.split("/"):
+            original_value = part
+            self.chop_left = True
+            self.chop_right = True
+            while True:
+                try:
+                    _dummy_curl.setopt(pycurl.URL, "/".join(_tmp_url_list + [part]))
+                    _tmp_url_list.append(part)
+                    break
+                except (UnicodeEncodeError, ValueError):
+                    if len(part):
+                        part = self.chop_fuzz_value(original_fuzz_value=original_value, fuzz_value=part)
+                    else:
+                        _tmp_url_list.append("-")
+                        break
+        return "/".join(_tmp_url_list)
+
+    def format_pycurl_header(self, headers):
+        _dummy_curl = pycurl.Curl()
+        _tmp = dict()
+        for k, v in headers.items():
+            original_value = v
+            self.chop_left = True
+            self.chop_right = True
+            while True:
+                try:
+                    _dummy_curl.setopt(pycurl.HTTPHEADER, ["{}: {}".format(k, v).encode()])
+                    _tmp[k] = v
+                    break
+                except ValueError:
+                    if len(v):
+                        v = self.chop_fuzz_value(original_fuzz_value=original_value, fuzz_value=v)
+                    else:
+                        _tmp[k] = ""
+                        break
+        return ["{}: {}".format(k, v).encode() for k, v in _tmp.items()]
+
+
+class LegacyRandomBitsField(RandomBitsField):
+    def _mutate(self):
+        if self._step:
+            length = self._min_length + self._step * self._current_index
+        else:
+            length = self._random.randint(self._min_length, self._max_length)
+        current_bytes = ""
+        for _ in range(length // 8 + 1):
+            current_bytes += chr(self._random.randint(0, 255))
+        self._current_value = Bits(bytes=strToBytes(current_bytes))[:length]
+
+
+class LegacyUtf8Chars(Utf8Chars):
+    def _mutate(self):
+        current_value = list()
+        current_mutation_length = secure_randint(self.min_length, self.max_length)
+        for st in range(self.position, self.position + current_mutation_length):
+            current_value.append(chr(st))
+        self._current_value = self.to_bits("".join(current_value))
+        self.position += current_mutation_length
+        if self.position > self.MAX:
+            self.position = self.init_position()
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import json
+import threading
 from functools import wraps
 
 from flask import Flask, request
@@ -39,8 +40,28 @@ def extract(d):
     return {key: value for (key, value) in d.items()}
 
 
+class HitCounter(object):
+    """
+    Counts the requests sent by the fuzzer
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def pop(self):
+        with self._lock:
+            hits, self.hits = self.hits, 0
+        return hits
+
+
 app = Flask(__name__)
 last_request_data = LastRequestData()
+hit_counter = HitCounter()
 
 
 @app.route('/path_param/<integer_id>', methods=['GET'])
@@ -104,6 +125,17 @@ def last_call():
     return _return
 
 
+@app.route('/hit_count', methods=['GET'])
+def hit_count():
+    return json.dumps({'hits': hit_counter.pop()})
+
+
+@app.before_request
+def count_hit():
+    if request.path not in ['/last_call', '/hit_count']:
+        hit_counter.hit()
+
+
 def get_last_json(req):
     try:
         return req.json
@@ -0,0 +1,68 @@
+import os
+import threading
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+
+from test.test_utils import BaseTest
+
+
+class ArrivalRecorder(BaseHTTPRequestHandler):
+    """
+    Answers every request with an empty response and records when the requests arrived
+    """
+
+    arrivals = list()
+
+    def do_GET(self):
+        self.arrivals.append(perf_counter())
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):  # pylint: disable=W0622
+        pass
+
+
+class TestConcurrency(BaseTest):
+    api_def = {
+        "get": {
+            "parameters": [
+                {
+                    "name": "integer_id",
+                    "in": "query",
+                    "required": True,
+                    "type": "number",
+                    "format": "double"
+                }
+            ]
+        }
+    }
+
+    def junit_test_names(self, concurrency):
+        junit_report_path = os.path.join(self.report_dir, f"junit_{concurrency}.xml")
+        self.swagger['paths'] = {'/query': self.api_def}
+        self.fuzz(self.swagger, headers={}, concurrency=concurrency, junit_report_path=junit_report_path)
+        return [test_case.get('name') for test_case in ET.parse(junit_report_path).iter('testcase')]
+
+    def test_concurrent_reports_in_test_number_order(self):
+        serial_test_names = self.junit_test_names(concurrency=1)
+        concurrent_test_names = self.junit_test_names(concurrency=8)
+        assert len(serial_test_names) > 1
+        assert concurrent_test_names == serial_test_names
+
+    def test_rate_limit_spaces_concurrent_requests(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), ArrivalRecorder)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.test_app_url = f"http://127.0.0.1:{server.server_port}/"
+        self.swagger['paths'] = {'/query': self.api_def}
+        ArrivalRecorder.arrivals.clear()
+        try:
+            self.fuzz(self.swagger, headers={}, concurrency=5, max_rps=50)
+        finally:
+            server.shutdown()
+            server.server_close()
+        gaps = sorted(second - first for first, second in zip(ArrivalRecorder.arrivals, ArrivalRecorder.arrivals[1:]))
+        assert len(gaps) > 20
+        # one request every 20 ms instead of bursts of 5 requests
+        assert gaps[len(gaps) // 2] > 0.015
@@ -0,0 +1,37 @@
+import os
+import tempfile
+
+from apifuzzer.report_store import read_reports
+from test.test_utils import BaseTest
+
+
+class TestCorpus(BaseTest):
+    api_def = {
+        "get": {
+            "parameters": [
+                {"name": "name", "in": "query", "required": True, "type": "string"},
+                {"name": "integer_id", "in": "query", "required": True, "type": "integer"},
+            ]
+        }
+    }
+
+    def fuzz_and_collect(self, **fuzzer_kwargs):
+        self.report_dir = tempfile.mkdtemp()
+        self.swagger['paths'] = {'/query': self.api_def}
+        self.fuzz(self.swagger, headers={}, **fuzzer_kwargs)
+        return list(read_reports(self.report_dir))
+
+    def test_corpus_gives_the_same_tests(self):
+        corpus_dir = tempfile.mkdtemp()
+        reports = self.fuzz_and_collect(seed=42)
+        assert reports
+        assert self.fuzz_and_collect(seed=42, corpus_dir=corpus_dir) == reports
+        assert len(os.listdir(corpus_dir)) == 1
+        assert self.fuzz_and_collect(seed=42, corpus_dir=corpus_dir) == reports
+        assert self.fuzz_and_collect(seed=42, corpus_dir=corpus_dir, workers=3) == reports
+        assert len(os.listdir(corpus_dir)) == 1
+
+    def test_corpus_requires_seed(self):
+        corpus_dir = tempfile.mkdtemp()
+        assert self.fuzz_and_collect(seed=None, corpus_dir=corpus_dir)
+        assert not os.listdir(corpus_dir)
@@ -0,0 +1,33 @@
+import os
+import xml.etree.ElementTree as ET
+
+from apifuzzer.report_query import query_reports
+from apifuzzer.report_store import read_reports
+from test.test_utils import BaseTest
+
+
+class TestCrashBuckets(BaseTest):
+
+    def test_duplicate_failures_not_saved(self):
+        api_def = {
+            "get": {
+                "parameters": [
+                    {
+                        "name": "integer_id",
+                        "in": "query",
+                        "required": True,
+                        "type": "string"
+                    }
+                ]
+            }
+        }
+        self.swagger['paths'] = {'/query': api_def}
+        junit_report_path = os.path.join(self.report_dir, "junit.xml")
+        self.fuzz(self.swagger, headers={}, report_format="sqlite", bucket_reports=1,
+                  junit_report_path=junit_report_path)
+        failed_reports = [report for report in read_reports(self.report_dir, "sqlite") if report["status"] == "failed"]
+        failed_tests = int(ET.parse(junit_report_path).getroot().get("failures"))
+        assert len(failed_reports) < failed_tests
+        assert len({report["bucket"] for report in failed_reports}) == len(failed_reports)
+        _, rows = query_reports(self.report_dir, filters={"status": "failed"}, group_by=["bucket"])
+        assert all(count == 1 for _, count, _ in rows)
@@ -0,0 +1,155 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+
+from apifuzzer.base_template import BaseTemplate
+from apifuzzer.custom_fuzzers import UnicodeStrings, APIFuzzerGroup
+from apifuzzer.distributed import Coordinator, Worker
+from apifuzzer.fuzzer import Fuzzer
+from benchmark.utils import get_free_port
+from test.test_utils import BaseTest
+
+
+def test_template_to_dict_round_trip():
+    template = BaseTemplate(name="path|get")
+    template.url = "path"
+    template.method = "GET"
+    template.params.add(UnicodeStrings(name="path|get|id", value="1"))
+    template.headers.add(UnicodeStrings(name="path|get|X-Test", value=b"\x00\x01"))
+    template.data.add(APIFuzzerGroup(name="path|get|enum", value=["a", "b"]))
+    template_dict = json.loads(json.dumps(template.to_dict()))
+    assert BaseTemplate.from_dict(template_dict).to_dict() == template.to_dict()
+
+
+class TestDistributed(BaseTest):
+    api_def = {
+        "get": {
+            "parameters": [
+                {
+                    "name": "integer_id",
+                    "in": "query",
+                    "required": True,
+                    "type": "number",
+                    "format": "double"
+                }
+            ]
+        }
+    }
+
+    def new_fuzzer(self, report_dir, **kwargs):
+        return Fuzzer(api_definition_file=self.tempfile,
+                      report_dir=report_dir,
+                      test_level=1,
+                      alternate_url=self.test_app_url,
+                      log_level='info',
+                      basic_output=True,
+                      auth_headers={},
+                      junit_report_path=os.path.join(report_dir, 'junit.xml'),
+                      **kwargs)
+
+    @staticmethod
+    def collect(report_dir):
+        test_names = [t.get('name') for t in ET.parse(os.path.join(report_dir, 'junit.xml')).iter('testcase')]
+        reports = list()
+        for report_file in sorted(os.listdir(report_dir)):
+            if report_file.endswith('.json'):
+                with open(os.path.join(report_dir, report_file)) as f:
+                    reports.append(json.load(f))
+        return test_names, reports
+
+    def prepare_runs(self):
+        """
+        :return: report directory of a serial run and a prepared fuzzer for the coordinator with the same templates
+        """
+        self.swagger['paths'] = {'/query': self.api_def}
+        with open(self.tempfile, 'w') as f:
+            json.dump(self.swagger, f)
+        serial_report_dir = tempfile.mkdtemp()
+        serial = self.new_fuzzer(serial_report_dir)
+        serial.prepare()
+        coordinator_report_dir = tempfile.mkdtemp()
+        prog = self.new_fuzzer(coordinator_report_dir)
+        prog.prepare()
+        # same field order and types as the coordinator, so the serial run is comparable
+        serial.templates = [BaseTemplate.from_dict(template.to_dict()) for template in prog.templates]
+        serial.base_url = prog.base_url
+        serial.run()
+        return serial_report_dir, prog
+
+    def run_workers(self, coordinator, workers):
+        coordinator_thread = threading.Thread(target=coordinator.run)
+        coordinator_thread.start()
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=worker.run) for worker in workers]
+        for process in processes:
+            process.start()
+        coordinator_thread.join(timeout=120)
+        for process in processes:
+            process.join(timeout=30)
+        assert not coordinator_thread.is_alive()
+
+    def test_distributed_run_matches_serial_run(self):
+        serial_report_dir, prog = self.prepare_runs()
+        address = f"127.0.0.1:{get_free_port()}"
+        coordinator = Coordinator(prog, address, chunk_size=20, lease_timeout=2)
+        # a worker which leases a unit and disappears, its unit has to be re-queued
+        coordinator.lease({"worker": "lost"})
+        self.run_workers(
+            coordinator,
+            [Worker(self.new_fuzzer(tempfile.mkdtemp()), address, poll_interval=0.2) for _ in range(2)]
+        )
+        assert all(unit.attempts >= 1 for unit in coordinator.units)
+        assert coordinator.units[0].attempts == 2
+        serial_test_names, serial_reports = self.collect(serial_report_dir)
+        distributed_test_names, distributed_reports = self.collect(prog.report_dir)
+        assert len(coordinator.units) > 2
+        assert distributed_test_names == serial_test_names
+        assert distributed_reports == serial_reports
+
+    def test_reports_streamed_and_lost_lease_stops_the_unit(self):
+        serial_report_dir, prog = self.prepare_runs()
+        address = f"127.0.0.1:{get_free_port()}"
+        coordinator = Coordinator(prog, address, chunk_size=40, lease_timeout=2)
+        heartbeat, reports = coordinator.heartbeat, coordinator.reports
+        streamed = list()
+        lost = list()
+
+        def lose_first_lease(request):
+            if not lost:
+                lost.append(request["unit_id"])
+                return {"valid": False}
+            return heartbeat(request)
+
+        def count_reports(request):
+            streamed.append(len(request["reports"]))
+            return reports(request)
+
+        coordinator.heartbeat, coordinator.reports = lose_first_lease, count_reports
+        self.run_workers(
+            coordinator, [Worker(self.new_fuzzer(tempfile.mkdtemp()), address, poll_interval=0.2,
+                                 heartbeat_interval=0.05)]
+        )
+        assert lost
+        # the worker stopped the unit without completing it, the expired lease was given to the worker again
+        assert coordinator.units[lost[0]].attempts == 2
+        assert sum(streamed) > 0
+        assert self.collect(prog.report_dir) == self.collect(serial_report_dir)
+
+    def test_profiles_of_units_are_merged(self, capfd):
+        _, prog = self.prepare_runs()
+        prog.profile_file = os.path.join(tempfile.mkdtemp(), 'profile.json')
+        address = f"127.0.0.1:{get_free_port()}"
+        coordinator = Coordinator(prog, address, chunk_size=20)
+        capfd.readouterr()
+        self.run_workers(coordinator, [Worker(self.new_fuzzer(tempfile.mkdtemp()), address, poll_interval=0.2)])
+        with open(prog.profile_file) as f:
+            profile = json.load(f)
+        # the mutate phase is recorded once per test of every unit
+        assert profile["phases"]["mutate"]["count"] == sum(
+            unit.last_test - unit.first_test + 1 for unit in coordinator.units
+        )
+        # printed only once by the coordinator, not by each unit
+        assert capfd.readouterr().out.count(f"Profile saved to {prog.profile_file}") == 1
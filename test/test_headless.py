@@ -0,0 +1,79 @@
+import io
+import os
+import re
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from apifuzzer.fuzzer_target.rate_controller import RateController
+from apifuzzer.progress_interface import ProgressInterface
+from apifuzzer.report_store import read_reports
+from test.test_utils import BaseTest
+
+
+def test_progress_line():
+    stream = io.StringIO()
+    interface = ProgressInterface(interval=0, stream=stream, prefix="worker 1: ")
+    interface.set_total(4)
+    interface._start_time -= 2
+    interface.failure_detected()
+    interface.progress()
+    line = stream.getvalue().splitlines()[-1]
+    assert re.fullmatch(r"worker 1: 1/4 tests \(25\.0%\), 0\.\d req/s, 1 failures, ETA 0:00:0\d", line), line
+    interface.stop()
+    assert re.fullmatch(r"worker 1: Finished 1/4 tests in 0:00:02, 0\.\d req/s, 1 failures",
+                        stream.getvalue().splitlines()[-1])
+
+
+def test_progress_line_shows_rate_limit():
+    stream = io.StringIO()
+    interface = ProgressInterface(interval=0, stream=stream)
+    interface.set_total(4, RateController(max_rps=20, max_concurrency=4))
+    interface.progress()
+    assert stream.getvalue().splitlines()[-1].endswith(", rate limit 20.0 req/s, concurrency 4")
+    interface.set_total(4, RateController())
+    interface.progress()
+    assert "rate limit" not in stream.getvalue().splitlines()[-1]
+
+
+def test_progress_line_written_after_interval():
+    stream = io.StringIO()
+    interface = ProgressInterface(interval=3600, stream=stream)
+    interface.stop()
+    interface.set_total(10)
+    for _ in range(10):
+        interface.progress()
+    assert stream.getvalue() == ""
+    interface.stop()
+    assert stream.getvalue().startswith("Finished 10/10 tests")
+
+
+class TestHeadless(BaseTest):
+    api_def = {
+        "get": {
+            "parameters": [
+                {
+                    "name": "integer_id",
+                    "in": "query",
+                    "required": True,
+                    "type": "number",
+                    "format": "double"
+                }
+            ]
+        }
+    }
+
+    @pytest.mark.parametrize("concurrency", [1, 8])
+    def test_headless_progress_matches_reports(self, capsys, concurrency):
+        junit_report_path = os.path.join(self.report_dir, "junit.xml")
+        self.swagger['paths'] = {'/query': self.api_def}
+        self.fuzz(self.swagger, headers={}, headless=True, concurrency=concurrency,
+                  junit_report_path=junit_report_path)
+        # the JUnit report contains the environment test too
+        tests = len(list(ET.parse(junit_report_path).iter('testcase'))) - 1
+        failures = len([report for report in read_reports(self.report_dir, 'files') if report['test_number'] >= 0])
+        assert tests > 1
+        assert failures
+        last_line = capsys.readouterr().err.splitlines()[-1]
+        assert last_line.startswith(f"Finished {tests}/{tests} tests in ")
+        assert last_line.endswith(f" {failures} failures")
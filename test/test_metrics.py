@@ -0,0 +1,73 @@
+import os
+import re
+import xml.etree.ElementTree as ET
+
+from test.test_utils import BaseTest
+
+SAMPLE = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+
+
+def read_samples(path):
+    """
+    :return: metric name, labels and value of the samples in the metrics file
+    :rtype: list
+    """
+    samples = list()
+    with open(path) as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            name, labels, value = SAMPLE.match(line.strip()).groups()
+            samples.append((name, dict(re.findall(r'(\w+)="([^"]*)"', labels or "")), float(value)))
+    return samples
+
+
+def total(samples, name, **labels):
+    return sum(value for sample_name, sample_labels, value in samples
+               if sample_name == name and labels.items() <= sample_labels.items())
+
+
+class TestMetrics(BaseTest):
+    api_def = {
+        "get": {
+            "parameters": [
+                {
+                    "name": "integer_id",
+                    "in": "query",
+                    "required": True,
+                    "type": "number",
+                    "format": "double"
+                }
+            ]
+        }
+    }
+
+    def fuzz_with_metrics(self, workers):
+        junit_report_path = os.path.join(self.report_dir, "junit.xml")
+        metrics_file = os.path.join(self.report_dir, "apifuzzer.prom")
+        self.swagger['paths'] = {'/query': self.api_def}
+        self.fuzz(self.swagger, headers={}, workers=workers, junit_report_path=junit_report_path,
+                  metrics_file=metrics_file)
+        # the environment test is counted too
+        tests = len(list(ET.parse(junit_report_path).iter('testcase')))
+        return tests, metrics_file
+
+    def test_metrics_file_counts_every_request(self):
+        tests, metrics_file = self.fuzz_with_metrics(workers=1)
+        samples = read_samples(metrics_file)
+        assert tests > 1
+        assert total(samples, "apifuzzer_requests_total") == tests
+        assert total(samples, "apifuzzer_requests_total", template="query|get", method="GET", status="500")
+        assert total(samples, "apifuzzer_tests_total") == tests
+        assert total(samples, "apifuzzer_request_latency_seconds_count") == tests
+        assert total(samples, "apifuzzer_report_write_seconds_count") == tests - total(
+            samples, "apifuzzer_tests_total", result="passed")
+
+    def test_sharded_metrics_files(self):
+        tests, metrics_file = self.fuzz_with_metrics(workers=2)
+        stem, extension = os.path.splitext(metrics_file)
+        shard_samples = [read_samples(f"{stem}_{index}{extension}") for index in range(2)]
+        assert not os.path.exists(metrics_file)
+        assert sum(total(samples, "apifuzzer_requests_total") for samples in shard_samples) == tests
+        assert total(shard_samples[1], "apifuzzer_tests_total", shard="1") == total(
+            shard_samples[1], "apifuzzer_tests_total")
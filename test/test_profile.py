@@ -0,0 +1,45 @@
+import json
+import os
+
+import pytest
+
+from apifuzzer.phase_profiler import PHASES
+from apifuzzer.report_store import read_reports
+from test.test_utils import BaseTest
+
+
+class TestProfile(BaseTest):
+    api_def = {
+        "get": {
+            "parameters": [
+                {
+                    "name": "integer_id",
+                    "in": "query",
+                    "required": True,
+                    "type": "number",
+                    "format": "double"
+                }
+            ]
+        }
+    }
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_profile_covers_every_test(self, capsys, tmp_path, workers):
+        profile_file = str(tmp_path / "profile.json")
+        self.swagger['paths'] = {'/query': self.api_def}
+        self.fuzz(self.swagger, headers={}, workers=workers, profile_file=profile_file)
+        with open(profile_file) as f:
+            profile = json.load(f)
+        assert os.listdir(tmp_path) == ["profile.json"]
+        saved_reports = len(list(read_reports(self.report_dir)))
+        assert set(profile["phases"]) == set(PHASES)
+        # the environment test is not mutated
+        tests = profile["phases"]["mutate"]["count"]
+        assert tests > 1
+        assert profile["phases"]["render"]["count"] == tests + 1
+        assert profile["phases"]["save_report"]["count"] == saved_reports
+        assert list(profile["templates"]["network"]) == ["query|get"]
+        assert profile["wall_time"] > profile["phases"]["render"]["total"]
+        output = capsys.readouterr().out
+        assert f"Profile saved to {profile_file}" in output
+        assert "slowest phases by template" in output
@@ -0,0 +1,102 @@
+import json
+import os
+from time import perf_counter
+
+import pycurl
+import requests
+
+from apifuzzer.fuzzer_target.fuzz_request_sender import FuzzerTarget, PendingRequest
+from apifuzzer.fuzzer_target.request_engine import CurlMultiEngine
+from apifuzzer.fuzzer_target.retry_policy import RetryPolicy
+from benchmark.utils import get_free_port, stub_test_application
+from test.test_utils import BaseTest
+
+
+def test_backoff_grows_exponentially_with_jitter():
+    policy = RetryPolicy(max_retries=5, backoff_base=0.1, backoff_max=1)
+    for retries, limit in enumerate([0.1, 0.2, 0.4, 0.8, 1, 1]):
+        backoffs = [policy.backoff(retries) for _ in range(20)]
+        assert all(0 <= backoff <= limit for backoff in backoffs)
+        assert len(set(backoffs)) > 1
+
+
+def test_retried_errors():
+    policy = RetryPolicy(max_retries=2)
+    assert policy.should_retry(pycurl.error(pycurl.E_COULDNT_CONNECT, ""), 0)
+    assert not policy.should_retry(pycurl.error(pycurl.E_COULDNT_CONNECT, ""), 2)
+    assert policy.should_retry(pycurl.error(pycurl.E_SEND_ERROR, ""), 0, uploaded=0)
+    assert not policy.should_retry(pycurl.error(pycurl.E_SEND_ERROR, ""), 0, uploaded=10)
+    for code in pycurl.E_OPERATION_TIMEDOUT, pycurl.E_GOT_NOTHING, pycurl.E_RECV_ERROR:
+        assert not policy.should_retry(pycurl.error(code, ""), 0)
+        assert RetryPolicy(retry_on=(code,)).should_retry(pycurl.error(code, ""), 0)
+
+
+def test_transport_error_retried(tmp_path):
+    target = FuzzerTarget(
+        name="target",
+        base_url=f"http://127.0.0.1:{get_free_port()}",
+        report_dir=str(tmp_path),
+        auth_headers={},
+        junit_report_path=None,
+        max_retries=2,
+    )
+    target.retry_policy.backoff_base = 0.01
+    target.pre_test(0)
+    target.transmit(url="query", method="GET", params={"integer_id": "1"})
+    assert target.report.get("retries") == 2
+    assert "connect" in target.report.get("exception")
+    target.teardown()
+
+
+def test_delayed_request_does_not_block_the_others():
+    with stub_test_application() as url:
+        engine = CurlMultiEngine()
+        pending_requests = list()
+        for test_number in range(2):
+            pending_request = PendingRequest(test_number, None, None)
+            pending_request.curl = pycurl.Curl()
+            pending_request.curl.setopt(pycurl.URL, url)
+            pending_request.curl.setopt(pycurl.WRITEDATA, pending_request.resp_buff_body)
+            pending_requests.append(pending_request)
+        start = perf_counter()
+        engine.add(pending_requests[0], delay=0.5)
+        engine.add(pending_requests[1])
+        assert engine.in_flight() == 2
+        assert engine.wait() == [pending_requests[1]]
+        assert perf_counter() - start < 0.5
+        assert engine.wait() == [pending_requests[0]]
+        assert perf_counter() - start >= 0.5
+        assert pending_requests[0].transport_error is None
+        assert engine.in_flight() == 0
+        engine.close()
+
+
+class TestRetry(BaseTest):
+
+    def test_each_test_sent_once(self):
+        api_def = {
+            "get": {
+                "parameters": [
+                    {
+                        "name": "integer_id",
+                        "in": "query",
+                        "required": True,
+                        "type": "number",
+                        "format": "double"
+                    }
+                ]
+            }
+        }
+        self.swagger['paths'] = {'/query': api_def}
+        requests.get(f'{self.test_app_url}hit_count', timeout=1)
+        self.fuzz(self.swagger, headers={})
+        hits = requests.get(f'{self.test_app_url}hit_count', timeout=1).json()['hits']
+        reports = list()
+        for report_file in os.listdir(self.report_dir):
+            with open(os.path.join(self.report_dir, report_file)) as f:
+                reports.append(json.load(f))
+        assert len(reports) > 1
+        assert all(report['retries'] == 0 for report in reports)
+        # requests with fuzzed url which curl refused to send (e.g. illegal characters) don't reach the server
+        sent_reports = [report for report in reports if 'exception' not in report]
+        assert hits == len(sent_reports)
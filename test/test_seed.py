@@ -0,0 +1,34 @@
+import tempfile
+
+from apifuzzer.report_store import read_reports
+from test.test_utils import BaseTest
+
+
+class TestSeed(BaseTest):
+    api_def = {
+        "get": {
+            "parameters": [
+                {"name": "name", "in": "query", "required": True, "type": "string"},
+                {"name": "email", "in": "query", "required": True, "type": "string", "format": "email"},
+                {"name": "integer_id", "in": "query", "required": True, "type": "integer"},
+            ]
+        }
+    }
+
+    def fuzz_and_collect(self, seed, workers=1):
+        self.report_dir = tempfile.mkdtemp()
+        self.swagger['paths'] = {'/query': self.api_def}
+        self.fuzz(self.swagger, headers={}, seed=seed, workers=workers)
+        return list(read_reports(self.report_dir))
+
+    def test_same_seed_gives_the_same_tests(self):
+        reports = self.fuzz_and_collect(seed=42)
+        assert len(reports) > 3
+        assert all(report["seed"] == 42 for report in reports)
+        assert self.fuzz_and_collect(seed=42) == reports
+        assert self.fuzz_and_collect(seed=42, workers=3) == reports
+
+    def test_reports_without_seed(self):
+        reports = self.fuzz_and_collect(seed=None)
+        assert reports
+        assert not [report for report in reports if "seed" in report]
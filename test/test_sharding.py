@@ -0,0 +1,56 @@
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+
+from apifuzzer.report_store import read_reports
+from apifuzzer.sharding import split_test_range
+from test.test_utils import BaseTest
+
+
+def test_split_test_range():
+    assert split_test_range(10, 3) == [(0, 3), (4, 6), (7, 9)]
+    assert split_test_range(2, 4) == [(0, 0), (1, 1)]
+    assert split_test_range(5, 1) == [(0, 4)]
+
+
+class TestSharding(BaseTest):
+    api_def = {
+        "get": {
+            "parameters": [
+                {
+                    "name": "integer_id",
+                    "in": "query",
+                    "required": True,
+                    "type": "number",
+                    "format": "double"
+                }
+            ]
+        }
+    }
+
+    def fuzz_and_collect(self, workers, report_format='files'):
+        """
+        :return: JUnit test case names and the JSON reports ordered by test number
+        """
+        report_dir = tempfile.mkdtemp()
+        self.report_dir = report_dir
+        junit_report_path = os.path.join(report_dir, "junit.xml")
+        self.swagger['paths'] = {'/query': self.api_def}
+        self.fuzz(self.swagger, headers={}, workers=workers, junit_report_path=junit_report_path,
+                  report_format=report_format)
+        test_names = [test_case.get('name') for test_case in ET.parse(junit_report_path).iter('testcase')]
+        return test_names, list(read_reports(report_dir, report_format))
+
+    def test_sharded_run_matches_serial_run(self):
+        serial_test_names, serial_reports = self.fuzz_and_collect(workers=1)
+        sharded_test_names, sharded_reports = self.fuzz_and_collect(workers=3)
+        assert len(serial_test_names) > 3
+        assert sharded_test_names == serial_test_names
+        assert sharded_reports == serial_reports
+
+    def test_sharded_report_stores_match_serial_file_reports(self):
+        _, serial_reports = self.fuzz_and_collect(workers=1)
+        assert len(serial_reports) > 3
+        for report_format in 'jsonl', 'sqlite':
+            _, sharded_reports = self.fuzz_and_collect(workers=3, report_format=report_format)
+            assert sharded_reports == serial_reports, report_format
@@ -79,11 +79,12 @@ class BaseTest:
                 header_found = True
         assert header_found
 
-    def fuzz(self, api_resources, headers):
+    def fuzz(self, api_resources, headers, **fuzzer_kwargs):
         """
         Call APIFuzzer with the given api definition
         :type api_resources: dict
         :param headers: headers to add fuzz request
+        :param fuzzer_kwargs: additional Fuzzer parameters
         """
         if headers is None:
             self.generate_random_auth_headers()
@@ -98,7 +99,8 @@ class BaseTest:
                       test_result_dst=None,
                       log_level='Debug',
                       basic_output=False,
-                      auth_headers=self.auth_headers
+                      auth_headers=self.auth_headers,
+                      **fuzzer_kwargs
                       )
         prog.prepare()
         prog.run()
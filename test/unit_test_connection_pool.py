@@ -0,0 +1,31 @@
+from apifuzzer.fuzzer_target.connection_pool import CurlHandlePool
+
+
+def test_pool_key():
+    assert CurlHandlePool.pool_key("http://127.0.0.1:5000/a/b") == ("http", "127.0.0.1", 5000)
+    assert CurlHandlePool.pool_key("HTTPS://example.com/a") == ("https", "example.com", 443)
+    assert CurlHandlePool.pool_key("http://example.com:notaport/a") is None
+    assert CurlHandlePool.pool_key("not an url") is None
+
+
+def test_handle_reused_for_same_host():
+    pool = CurlHandlePool()
+    key, _curl = pool.acquire("http://127.0.0.1:5000/first")
+    pool.release(key, _curl)
+    same_key, same_curl = pool.acquire("http://127.0.0.1:5000/second?param=1")
+    assert same_key == key
+    assert same_curl is _curl
+    pool.release(same_key, same_curl)
+    other_key, other_curl = pool.acquire("http://127.0.0.1:5001/first")
+    assert other_curl is not _curl
+    pool.release(other_key, other_curl)
+    pool.close()
+
+
+def test_fresh_connections():
+    pool = CurlHandlePool(fresh_connections=True)
+    key, _curl = pool.acquire("http://127.0.0.1:5000/first")
+    pool.release(key, _curl)
+    _, new_curl = pool.acquire("http://127.0.0.1:5000/first")
+    assert new_curl is not _curl
+    pool.close()
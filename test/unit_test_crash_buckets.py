@@ -0,0 +1,38 @@
+from apifuzzer.crash_buckets import CrashBuckets, normalize_response
+
+
+def failed_report(response, status_code=500, template="query|GET"):
+    return {"status": "failed", "status_code": status_code, "template": template, "response": response}
+
+
+def test_volatile_tokens_masked():
+    assert normalize_response("invalid literal for int() with base 10: '0\x00\x10'") == \
+        normalize_response("invalid literal for int() with base 10: 'abc'")
+    assert normalize_response("request 6f1c2a3e-1b2c-4d5e-8f90-0123456789ab failed at 2024-01-02T10:11:12.123Z") == \
+        "request <uuid> failed at <timestamp>"
+    assert normalize_response("object at 0x7f3a2c1b, trace deadbeef42, line 42") == \
+        "object at <hex>, trace <hex>, line <n>"
+    assert normalize_response("KeyError: name") != normalize_response("KeyError: type")
+
+
+def test_first_reports_of_bucket_kept():
+    buckets = CrashBuckets(max_reports=2)
+    kept = [buckets.add(test_number, failed_report(f"ValueError: '{test_number}'"))[1] for test_number in range(5)]
+    assert kept == [True, True, False, False, False]
+    bucket, keep = buckets.add(5, failed_report("ValueError: 'x'", template="pets|POST"))
+    assert keep and bucket.first_test == 5
+    bucket, keep = buckets.add(6, failed_report("ValueError: 'x'", status_code=502))
+    assert keep
+    summary = buckets.summary()
+    assert [(bucket["count"], bucket["saved"], bucket["first_test"]) for bucket in summary] == \
+        [(5, 2, 0), (1, 1, 5), (1, 1, 6)]
+    assert len({bucket["bucket"] for bucket in summary}) == 3
+
+
+def test_transport_errors_bucketed_by_exception():
+    buckets = CrashBuckets(max_reports=1)
+    report = {"status": "error", "template": "query|GET", "exception": "Failed to connect to 127.0.0.1 port 41234"}
+    first, keep = buckets.add(0, report)
+    assert keep
+    second, keep = buckets.add(1, dict(report, exception="Failed to connect to 127.0.0.1 port 41235"))
+    assert second is first and not keep
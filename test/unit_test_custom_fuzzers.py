@@ -0,0 +1,84 @@
+from random import Random
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from apifuzzer.custom_fuzzers import RandomBitsField, RandomStream, Utf8Chars, batched_randint_supported, utf8_chars
+from test.legacy_implementations import LegacyRandomBitsField, LegacyUtf8Chars
+
+
+def mutations(field):
+    values = list()
+    while field.mutate():
+        values.append(field.render())
+    return values
+
+
+def test_batched_randint_supported():
+    assert batched_randint_supported()
+
+
+@settings(max_examples=200, deadline=None)
+@given(seed=st.integers(0, 2 ** 32), calls=st.lists(st.tuples(st.booleans(), st.integers(1, 2000)), max_size=20))
+def test_random_stream(seed, calls):
+    expected, stream = Random(seed), RandomStream(Random(seed))
+    for randbytes, n in calls:
+        if randbytes:
+            assert stream.randbytes(n) == bytes(expected.randint(0, 255) for _ in range(n))
+        else:
+            assert stream.randbelow(n) == expected.randrange(n)
+
+
+@pytest.mark.parametrize("length", [1, 4, 64, 1024, 5000])
+def test_random_bits_field_mutations(length):
+    field, legacy_field = RandomBitsField("x" * length, "field"), LegacyRandomBitsField("x" * length, "legacy")
+    for _ in range(2):
+        values = mutations(field)
+        assert values == mutations(legacy_field)
+        assert len(values) == 80
+        field.reset()
+        legacy_field.reset()
+
+
+@pytest.mark.parametrize("step", [1, 5, 64])
+def test_random_bits_field_mutations_with_step(step):
+    field, legacy_field = RandomBitsField("x" * 100, "field"), LegacyRandomBitsField("x" * 100, "legacy")
+    field._step = legacy_field._step = step
+    assert mutations(field) == mutations(legacy_field)
+
+
+def test_random_bits_field_skip():
+    field, legacy_field = RandomBitsField("x" * 64, "field"), LegacyRandomBitsField("x" * 64, "legacy")
+    assert field.skip(10) == legacy_field.skip(10)
+    assert mutations(field) == mutations(legacy_field)
+
+
+@settings(max_examples=200, deadline=None)
+@given(start=st.integers(0, Utf8Chars.MAX), length=st.integers(0, 3000))
+def test_utf8_chars(start, length):
+    expected = "".join(chr(code_point) for code_point in range(start, start + length)
+                       if code_point <= Utf8Chars.MAX and not 0xD800 <= code_point < 0xE000)
+    assert utf8_chars(start, start + length) == expected.encode()
+
+
+@pytest.mark.parametrize("position", [0, 0x7F, 0x7FF, 0x4E00, 0xE000, 0xFFFF, 0x10000, 0x10FE00])
+def test_utf8_chars_field_mutations(position):
+    # secure_randint excludes the maximum, the mutations are 100 characters long
+    field = Utf8Chars("x", "field", min_length=100, max_length=101)
+    legacy_field = LegacyUtf8Chars("x", "legacy", min_length=100, max_length=101)
+    for _ in range(3):
+        field.position = legacy_field.position = position
+        assert field.mutate() and legacy_field.mutate()
+        assert field.render() == legacy_field.render()
+        position += 100
+
+
+def test_utf8_chars_field_skips_unencodable_code_points():
+    field = Utf8Chars("x", "field", min_length=2, max_length=3)
+    field.position = 0xD7FE
+    field.mutate()
+    assert field.render().bytes == "퟾퟿".encode()
+    field.position = Utf8Chars.MAX - 1
+    field.mutate()
+    assert field.render().bytes == "\U0010fffe\U0010ffff".encode()
+    assert field.position <= Utf8Chars.MAX
@@ -0,0 +1,41 @@
+from apifuzzer.fuzz_model import APIFuzzerModel, LazyTemplate
+from test.unit_test_template_generator import generate_templates
+
+
+def build_model(templates, lazy):
+    model = APIFuzzerModel()
+    for template in templates:
+        model.connect(LazyTemplate(template) if lazy else template.compile_template())
+    return model
+
+
+def walk(model, nodes=()):
+    """
+    :return: template name, mutated field and mutation index of the field in every test of the model
+    """
+    tests = list()
+    while model.mutate():
+        assert sum(node._template is not None for node in nodes) <= 1
+        field_info = model.get_test_info()["node"]["field"]
+        tests.append((model.get_sequence_str(), field_info["path"], field_info["mutation"]["current_index"]))
+    return tests
+
+
+def test_lazy_model_has_same_tests(tmp_path):
+    templates = generate_templates(tmp_path, 8)
+    eager_model = build_model(templates, lazy=False)
+    expected = walk(eager_model)
+    lazy_model = build_model(templates, lazy=True)
+    nodes = [connection.dst for connection in lazy_model._graph[lazy_model._root_id]]
+    assert lazy_model.num_mutations() == eager_model.num_mutations() == len(expected)
+    assert all(node._template is None for node in nodes)
+    assert walk(lazy_model, nodes) == expected
+    assert all(node._template is None for node in nodes[:-1])
+
+
+def test_lazy_model_skip(tmp_path):
+    templates = generate_templates(tmp_path, 8)
+    expected = walk(build_model(templates, lazy=False))
+    lazy_model = build_model(templates, lazy=True)
+    lazy_model.skip(len(expected) // 2)
+    assert walk(lazy_model) == expected[len(expected) // 2:]
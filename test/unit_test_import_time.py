@@ -0,0 +1,15 @@
+import pytest
+
+from benchmark.import_time import import_times, HEAVY_MODULES
+
+# cumulative import time of the own modules of the CLI, the interpreter startup (site) is not included
+MAX_IMPORT_TIME_MS = 100
+
+
+@pytest.mark.parametrize("args", [["--version"], ["--help"], ["--no_such_option"]])
+def test_cli_starts_without_heavy_imports(args):
+    times = import_times(*args)
+    assert "argparse" in times
+    assert not [module for module in times if module.split(".")[0] in HEAVY_MODULES]
+    own_import_time = sum(cumulative for module, cumulative in times.items() if module.startswith("apifuzzer."))
+    assert own_import_time / 1000 < MAX_IMPORT_TIME_MS
@@ -0,0 +1,63 @@
+import copy
+import json
+import os
+
+import pytest
+from hypothesis import given, settings, strategies as st
+from json_ref_dict import materialize, RefDict
+
+from apifuzzer.move_json_parts import JsonSectionAbove
+from benchmark.json_section_above import nested_schemas
+from test.legacy_implementations import LegacyJsonSectionAbove
+
+TEST_API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_api")
+
+# no None in the lists: the recursive implementation resolved the whole definition again in place of them
+definitions = st.recursive(
+    st.one_of(st.booleans(), st.integers(), st.text(max_size=3)),
+    lambda children: st.one_of(
+        st.lists(children, max_size=3),
+        st.dictionaries(st.sampled_from(["schema", "a", "b", "required"]), children, max_size=4),
+    ),
+    max_leaves=30,
+)
+
+
+def resolve_or_error(resolver_class, data):
+    try:
+        return resolver_class(data).resolve()
+    except Exception as e:
+        return type(e)
+
+
+@pytest.mark.parametrize("api_definition", ["openapi_v2", "openapi_v3"])
+def test_resolved_definition(api_definition):
+    data = materialize(RefDict(os.path.join(TEST_API_DIR, f"{api_definition}.json")))
+    with open(os.path.join(TEST_API_DIR, f"{api_definition}_resolved.json")) as f:
+        expected = json.load(f)
+    assert JsonSectionAbove(data).resolve() == expected
+
+
+def test_deeply_nested_schemas():
+    resolved = JsonSectionAbove(nested_schemas(5000)).resolve()
+    assert resolved["title"] == "level 4999"
+    assert resolved["examples"]["title"] == "level 4998"
+
+
+def test_none_in_list():
+    assert JsonSectionAbove({"a": [None, {"schema": {"b": 1}}]}).resolve() == {"a": [None, {"b": 1}]}
+
+
+@settings(max_examples=500, deadline=None)
+@given(data=definitions)
+def test_resolve_parity(data):
+    legacy = resolve_or_error(LegacyJsonSectionAbove, copy.deepcopy(data))
+    assert resolve_or_error(JsonSectionAbove, copy.deepcopy(data)) == legacy
+    if isinstance(data, dict):
+        # the dictionaries nested deeper than the recursion limit are resolved with the explicit stack
+        resolver = JsonSectionAbove(copy.deepcopy(data))
+        try:
+            stack_result = resolver._resolve_with_stack(copy.deepcopy(data))
+        except Exception as e:
+            stack_result = type(e)
+        assert stack_result == legacy
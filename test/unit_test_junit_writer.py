@@ -0,0 +1,52 @@
+import xml.etree.ElementTree as ET
+
+from junit_xml import TestCase as JUnitTestCase
+
+from apifuzzer.junit_writer import JUnitStreamWriter, NO_TEST_CASE_NAME
+
+
+def failed_test_case(name):
+    test_case = JUnitTestCase(name=name, status="failed", elapsed_sec=0.5)
+    test_case.add_failure_info(message='{"request_url": "/query?id=\x00\ud800<>&"}')
+    return test_case
+
+
+def test_counters_written_on_close(tmp_path):
+    path = str(tmp_path / "junit.xml")
+    writer = JUnitStreamWriter(path)
+    for test_number in range(1200):
+        writer.add(failed_test_case(f"{test_number}: /query"))
+    writer.add(JUnitTestCase(name="error", status="error", elapsed_sec=0.25))
+    writer.close()
+    writer.close()
+    root = ET.parse(path).getroot()
+    suite = root.find("testsuite")
+    for element in (root, suite):
+        assert element.get("tests") == "1201"
+        assert element.get("failures") == "1200"
+        assert element.get("errors") == "0"
+        assert float(element.get("time")) == 600.25
+    assert suite.get("name") == "API Fuzzer"
+    test_cases = list(suite.iter("testcase"))
+    assert len(test_cases) == 1201
+    assert test_cases[0].find("failure").get("message") == '{"request_url": "/query?id=<>&"}'
+
+
+def test_no_test_case(tmp_path):
+    path = str(tmp_path / "junit.xml")
+    JUnitStreamWriter(path).close()
+    suite = ET.parse(path).getroot().find("testsuite")
+    assert suite.get("tests") == "1"
+    assert [test_case.get("name") for test_case in suite.iter("testcase")] == [NO_TEST_CASE_NAME]
+
+
+def test_test_cases_on_disk_before_close(tmp_path):
+    path = str(tmp_path / "junit.xml")
+    writer = JUnitStreamWriter(path)
+    writer.add(failed_test_case("0: /query"))
+    with open(path) as f:
+        content = f.read()
+    # the document of a killed fuzzer is not closed, but the finished test cases can be recovered
+    root = ET.fromstring(content + "\t</testsuite>\n</testsuites>\n")
+    assert [test_case.get("name") for test_case in root.iter("testcase")] == ["0: /query"]
+    writer.close()
@@ -0,0 +1,49 @@
+import logging
+import multiprocessing
+
+from apifuzzer.utils import set_logger, get_logger, flush_logs, LazyString, SampleFilter
+
+
+def test_lazy_string_computed_only_if_emitted():
+    calls = list()
+
+    def expensive(value):
+        calls.append(value)
+        return value * 2
+
+    logger = get_logger("lazy")
+    set_logger("warning", basic_output=True)
+    logger.debug("Value: %s", LazyString(expensive, 1))
+    assert calls == []
+    assert str(LazyString(expensive, 2)) == "4"
+    assert calls == [2]
+
+
+def test_sample_filter_keeps_warnings():
+    sample_filter = SampleFilter(0.1)
+    records = [logging.LogRecord("test", logging.DEBUG, __file__, 1, "debug", None, None) for _ in range(100)]
+    assert sum(sample_filter.filter(record) for record in records) == 10
+    warning = logging.LogRecord("test", logging.WARNING, __file__, 1, "warning", None, None)
+    assert all(sample_filter.filter(warning) for _ in range(10))
+
+
+def _log_in_child(message):
+    get_logger("child").warning(message)
+    flush_logs()
+
+
+def test_queue_written_after_flush(capfd):
+    set_logger("info", basic_output=True, log_queue=True)
+    try:
+        get_logger("queue").info("from the fuzzer thread")
+        flush_logs()
+        # the forked process gets its own listener thread
+        child = multiprocessing.get_context("fork").Process(target=_log_in_child, args=("from the forked process",))
+        child.start()
+        child.join()
+        assert child.exitcode == 0
+    finally:
+        set_logger("warning", basic_output=True)
+    output = capfd.readouterr().out
+    assert "from the fuzzer thread" in output
+    assert "from the forked process" in output
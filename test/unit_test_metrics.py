@@ -0,0 +1,57 @@
+import os
+import urllib.request
+
+from apifuzzer.metrics import FuzzMetrics, MetricsRegistry, MetricsServer, TextfileExporter, shard_path
+
+
+def test_render_counter_and_histogram():
+    registry = MetricsRegistry(const_labels={"shard": 1})
+    requests = registry.counter("requests_total", "Requests", ("template", "status"))
+    latency = registry.histogram("latency_seconds", "Latency", (0.1, 1))
+    requests.inc(('get "a"\\b', 500))
+    requests.inc(('get "a"\\b', 500))
+    requests.inc(("post", 200))
+    for value in 0.05, 0.1, 0.5, 3:
+        latency.observe(value)
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{shard="1",template="get \\"a\\"\\\\b",status="500"} 2',
+        'requests_total{shard="1",template="post",status="200"} 1',
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{shard="1",le="0.1"} 2',
+        'latency_seconds_bucket{shard="1",le="1"} 3',
+        'latency_seconds_bucket{shard="1",le="+Inf"} 4',
+        'latency_seconds_sum{shard="1"} 3.65',
+        'latency_seconds_count{shard="1"} 4',
+    ]
+    assert requests.get(("post", 200)) == 1
+    assert latency.count() == 4
+
+
+def test_metrics_server():
+    metrics = FuzzMetrics()
+    metrics.transport_errors.inc((7,))
+    server = MetricsServer(metrics.registry, 0).start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            body = response.read().decode()
+    finally:
+        server.stop()
+    assert 'apifuzzer_transport_errors_total{code="7"} 1' in body.splitlines()
+    assert "# TYPE apifuzzer_request_latency_seconds histogram" in body
+
+
+def test_textfile_exporter(tmp_path):
+    metrics = FuzzMetrics()
+    path = shard_path(str(tmp_path / "apifuzzer.prom"), 2)
+    assert path.endswith("apifuzzer_2.prom")
+    exporter = TextfileExporter(metrics.registry, path, interval=3600).start()
+    metrics.tests.inc(("failed",))
+    exporter.stop()
+    with open(path) as f:
+        assert 'apifuzzer_tests_total{result="failed"} 1' in f.read().splitlines()
+    assert [p.name for p in tmp_path.iterdir()] == ["apifuzzer_2.prom"]
+    assert os.stat(path).st_mode & 0o777 == 0o644
@@ -0,0 +1,117 @@
+import json
+import os
+
+from apifuzzer.fuzz_model import APIFuzzerModel, CorpusTemplate, LazyTemplate
+from apifuzzer.mutation_corpus import MutationCorpus, corpus_key
+from apifuzzer.openapi_template_generator import OpenAPITemplateGenerator
+from apifuzzer.server_fuzzer import render_template_fields
+from apifuzzer.utils import get_logger
+from benchmark.spec_generator import generate_spec
+
+LOGGER = get_logger("unit_test_mutation_corpus")
+
+
+def generate_templates(tmp_path, operations, seed):
+    spec_file = str(tmp_path / "openapi.json")
+    with open(spec_file, "w") as f:
+        json.dump(generate_spec(operations), f)
+    template_generator = OpenAPITemplateGenerator(api_definition_url=None, api_definition_file=spec_file, seed=seed)
+    template_generator.process_api_resources()
+    return template_generator.templates
+
+
+def walk(model):
+    """
+    :return: template name, kitty test info and rendered payload of every test of the model
+    """
+    tests = list()
+    while model.mutate():
+        node = model.get_sequence()[-1].dst
+        payload = node.payload() if isinstance(node, CorpusTemplate) else render_template_fields(node, LOGGER)
+        tests.append((model.get_sequence_str(), model.get_test_info()["node"], payload))
+    return tests
+
+
+def build_model(templates, corpus=None):
+    model = APIFuzzerModel()
+    for template in templates:
+        model.connect(CorpusTemplate(template, corpus) if corpus else LazyTemplate(template))
+    return model
+
+
+def test_corpus_has_same_tests(tmp_path):
+    templates = generate_templates(tmp_path, 4, seed=3)
+    corpus = MutationCorpus.load_or_build(str(tmp_path / "corpus"), templates, seed=3)
+    expected = walk(build_model(templates))
+    corpus_model = build_model(templates, corpus)
+    assert corpus_model.num_mutations() == len(expected)
+    assert walk(corpus_model) == expected
+    assert walk(build_model(templates, MutationCorpus(corpus.path))) == expected
+
+
+def test_corpus_skip(tmp_path):
+    templates = generate_templates(tmp_path, 4, seed=3)
+    corpus = MutationCorpus.load_or_build(str(tmp_path / "corpus"), templates, seed=3)
+    expected = walk(build_model(templates))
+    for count in 1, len(expected) // 2, len(expected) - 1:
+        corpus_model = build_model(templates, corpus)
+        corpus_model.skip(count)
+        assert walk(corpus_model) == expected[count:]
+
+
+def test_corpus_template_reset(tmp_path):
+    templates = generate_templates(tmp_path, 1, seed=3)
+    corpus = MutationCorpus.load_or_build(str(tmp_path / "corpus"), templates, seed=3)
+    node = CorpusTemplate(templates[0], corpus)
+    unmodified = node.payload()
+    assert node.mutate()
+    assert node.payload() != unmodified
+    assert node.skip(node.num_mutations()) == node.num_mutations() - 1
+    assert not node.mutate()
+    node.reset()
+    assert node.payload() == unmodified
+
+
+def test_corpus_key(tmp_path):
+    templates = generate_templates(tmp_path, 2, seed=3)
+    assert corpus_key(templates, 3) == corpus_key(generate_templates(tmp_path, 2, seed=3), 3)
+    assert corpus_key(templates, 3) != corpus_key(templates, 4)
+    assert corpus_key(templates, 3) != corpus_key(generate_templates(tmp_path, 2, seed=4), 3)
+    assert corpus_key(templates, 3) != corpus_key(templates[:1], 3)
+
+
+def test_corpus_is_built_once(tmp_path):
+    corpus_dir = str(tmp_path / "corpus")
+    templates = generate_templates(tmp_path, 2, seed=3)
+    path = MutationCorpus.load_or_build(corpus_dir, templates, seed=3).path
+    modified = os.stat(path).st_mtime_ns
+    assert MutationCorpus.load_or_build(corpus_dir, templates, seed=3).path == path
+    assert os.stat(path).st_mtime_ns == modified
+    assert os.listdir(corpus_dir) == [os.path.basename(path)]
+
+
+def test_invalid_corpus_is_built_again(tmp_path):
+    corpus_dir = str(tmp_path / "corpus")
+    templates = generate_templates(tmp_path, 2, seed=3)
+    path = MutationCorpus.load_or_build(corpus_dir, templates, seed=3).path
+    with open(path, "wb") as f:
+        f.write(b"garbage")
+    corpus = MutationCorpus.load_or_build(corpus_dir, templates, seed=3)
+    assert corpus.num_mutations(templates[0].name) == templates[0].num_mutations()
+
+
+def test_corpus_template_structure(tmp_path):
+    templates = generate_templates(tmp_path, 1, seed=3)
+    corpus = MutationCorpus.load_or_build(str(tmp_path / "corpus"), templates, seed=3)
+    model = build_model(templates, corpus)
+    expected = LazyTemplate(templates[0])
+    expected.num_mutations()
+    assert model.mutate()
+    assert expected.mutate()
+    structure = model.get_template_info()
+    assert structure["mutation"] == expected.get_structure()["mutation"]
+    assert structure["name"] == templates[0].name
+    assert len(structure["fields"]) == len(expected.get_structure()["fields"])
+    # the kitty template is not compiled for the web interface
+    assert model.get_sequence()[-1].dst._template is None
+    corpus.close()
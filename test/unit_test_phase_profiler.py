@@ -0,0 +1,39 @@
+import json
+
+from apifuzzer.phase_profiler import PhaseProfiler, PhaseStats, BUCKET_BASE
+
+
+def test_percentiles_within_bucket_accuracy():
+    stats = PhaseStats()
+    durations = [i / 10000 for i in range(1, 1001)]
+    for duration in durations:
+        stats.add(duration)
+    assert stats.count == 1000
+    assert stats.max == 0.1
+    for percent, expected in (50, 0.05), (90, 0.09), (99, 0.099):
+        assert expected <= stats.percentile(percent) <= expected * BUCKET_BASE
+    assert stats.percentile(100) == 0.1
+    assert PhaseStats().percentile(50) == 0.0
+
+
+def test_merge_profiles_of_shards(tmp_path):
+    shards = [PhaseProfiler(), PhaseProfiler()]
+    for index, profiler in enumerate(shards):
+        for _ in range(10):
+            profiler.record("network", "get|get", 0.002 * (index + 1))
+            profiler.record("render", None, 0)
+        profiler.wall_time = index + 1
+        profiler.write(str(tmp_path / f"{index}.json"))
+    merged = PhaseProfiler()
+    for index in range(2):
+        with open(tmp_path / f"{index}.json") as f:
+            merged.merge(json.load(f))
+    result = merged.to_dict()
+    assert result["wall_time"] == 2
+    assert result["phases"]["network"]["count"] == 20
+    assert abs(result["phases"]["network"]["total"] - 0.06) < 1e-9
+    assert result["phases"]["network"]["max"] == 0.004
+    assert result["templates"]["render"]["None"]["count"] == 20
+    table = merged.format_table().splitlines()
+    assert table[2].split()[:3] == ["render", "all", "20"]
+    assert table[3].split()[:3] == ["network", "all", "20"]
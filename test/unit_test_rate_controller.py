@@ -0,0 +1,82 @@
+from time import perf_counter
+
+import pycurl
+
+from apifuzzer.fuzzer_target.rate_controller import RateController
+
+
+def record_window(controller, latency, status_code=200):
+    for _ in range(controller.window):
+        controller.wait()
+        controller.record(latency, status_code)
+
+
+def test_disabled_without_limits():
+    controller = RateController(max_concurrency=8)
+    record_window(controller, latency=10, status_code=503)
+    assert controller.rps is None
+    assert controller.concurrency == 8
+    assert controller.summary()["errors"] == controller.window
+
+
+def test_max_rps_paces_requests():
+    controller = RateController(max_rps=50)
+    start = perf_counter()
+    for _ in range(11):
+        controller.wait()
+    assert perf_counter() - start >= 0.19
+
+
+def test_reserve_returns_the_delay_without_waiting():
+    controller = RateController(max_rps=10)
+    start = perf_counter()
+    delays = [controller.reserve() for _ in range(5)]
+    assert perf_counter() - start < 0.1
+    assert delays[0] == 0
+    assert all(0.09 < delay - previous < 0.11 for previous, delay in zip(delays[1:], delays[2:]))
+    assert RateController().reserve() == 0
+
+
+def test_multiplicative_decrease_additive_increase():
+    controller = RateController(max_rps=1000, target_latency=0.5, max_concurrency=8)
+    record_window(controller, latency=1.0)
+    assert controller.rps == 500
+    assert controller.concurrency == 4
+    record_window(controller, latency=0.1, status_code=503)
+    assert controller.rps == 250
+    assert controller.concurrency == 2
+    record_window(controller, latency=0.1, status_code=500)
+    assert controller.rps == 251
+    assert controller.concurrency == 3
+    summary = controller.summary()
+    assert summary["decreases"] == 2
+    assert summary["lowest_rps_limit"] == 250
+
+
+def test_increase_stops_at_max_rps():
+    controller = RateController(max_rps=1000, target_latency=1, max_concurrency=2, rps_step=600)
+    record_window(controller, latency=2)
+    record_window(controller, latency=0.1)
+    assert controller.rps == 1000
+    record_window(controller, latency=0.1)
+    assert controller.rps == 1000
+    assert controller.concurrency == 2
+
+
+def test_unlimited_rate_limited_from_observed_throughput():
+    controller = RateController(target_latency=0.5)
+    record_window(controller, latency=0.1)
+    assert controller.rps is None
+    record_window(controller, latency=1.0)
+    assert controller.rps is not None
+    assert controller.rps < controller.requests / (controller._finished - controller._started)
+
+
+def test_only_overload_errors_count():
+    controller = RateController(max_rps=100)
+    controller.record(0.1, 0, pycurl.error(pycurl.E_URL_MALFORMAT, "Illegal characters found in URL"))
+    controller.record(0.1, 500)
+    assert controller.errors == 0
+    controller.record(0.1, 0, pycurl.error(pycurl.E_COULDNT_CONNECT, "Connection refused"))
+    controller.record(0.1, 503)
+    assert controller.errors == 2
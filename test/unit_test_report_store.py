@@ -0,0 +1,104 @@
+import os
+import sqlite3
+
+from apifuzzer.report_query import query_reports
+from apifuzzer.report_store import JsonlReportStore, FileReportStore, SqliteReportStore, read_reports, \
+    merge_report_stores
+
+
+def write_reports(store, test_numbers):
+    for test_number in test_numbers:
+        store.write(test_number, {"test_number": test_number, "response": "x" * 50})
+    store.close()
+
+
+def test_jsonl_segments_rotate(tmp_path):
+    store = JsonlReportStore(str(tmp_path), segment_size=200)
+    write_reports(store, range(-1, 9))
+    segments = JsonlReportStore.read_index(str(tmp_path))
+    assert len(segments) > 1
+    assert segments[0]["first_test"] == -1
+    assert segments[-1]["last_test"] == 8
+    assert sum(segment["records"] for segment in segments) == 10
+    assert all(segment["size"] == os.path.getsize(tmp_path / segment["file"]) for segment in segments)
+    assert [report["test_number"] for report in read_reports(str(tmp_path), "jsonl")] == list(range(-1, 9))
+
+
+def test_jsonl_reports_of_killed_run(tmp_path):
+    store = JsonlReportStore(str(tmp_path), segment_size=200)
+    for test_number in range(3):
+        store.write(test_number, {"test_number": test_number})
+    # the store is not closed, like in a killed run
+    assert [segment["file"] for segment in JsonlReportStore.read_index(str(tmp_path))] == ["reports-0000.jsonl"]
+    assert [report["test_number"] for report in read_reports(str(tmp_path), "jsonl")] == [0, 1, 2]
+    os.remove(tmp_path / JsonlReportStore.INDEX_FILE)
+    with open(tmp_path / "reports-0000.jsonl", "a") as f:
+        f.write('{"test_number":')
+    assert [report["test_number"] for report in read_reports(str(tmp_path), "jsonl")] == [0, 1, 2]
+
+
+def test_jsonl_rerun_keeps_earlier_reports(tmp_path):
+    write_reports(JsonlReportStore(str(tmp_path), segment_size=200), range(5))
+    write_reports(JsonlReportStore(str(tmp_path), segment_size=200), range(5, 10))
+    assert [report["test_number"] for report in read_reports(str(tmp_path), "jsonl")] == list(range(10))
+    segments = JsonlReportStore.read_index(str(tmp_path))
+    assert sum(segment["records"] for segment in segments) == 10
+
+
+def test_jsonl_merge(tmp_path):
+    store_dirs = [str(tmp_path / str(shard)) for shard in range(3)]
+    for shard, store_dir in enumerate(store_dirs):
+        write_reports(JsonlReportStore(store_dir, segment_size=200), range(shard * 5, shard * 5 + 5))
+    report_dir = str(tmp_path / "merged")
+    merge_report_stores(store_dirs, report_dir, "jsonl")
+    assert [report["test_number"] for report in read_reports(report_dir, "jsonl")] == list(range(15))
+    segment_files = [segment["file"] for segment in JsonlReportStore.read_index(report_dir)]
+    assert segment_files == [JsonlReportStore.segment_name(index) for index in range(len(segment_files))]
+    assert sorted(os.listdir(report_dir)) == sorted(segment_files + [JsonlReportStore.INDEX_FILE])
+
+
+def test_files_store(tmp_path):
+    write_reports(FileReportStore(str(tmp_path)), range(-1, 3))
+    assert len(os.listdir(tmp_path)) == 4
+    assert [report["test_number"] for report in read_reports(str(tmp_path))] == list(range(-1, 3))
+
+
+def write_findings(store, test_numbers):
+    for test_number in test_numbers:
+        store.write(test_number, {
+            "test_number": test_number,
+            "template": "pets|post",
+            "request_method": "POST" if test_number % 2 else "GET",
+            "request_url": f"http://127.0.0.1:5000/pets?id={test_number}",
+            "status_code": 500 if test_number % 3 else 400,
+            "status": "failed" if test_number % 3 else "passed",
+        }, latency=test_number / 1000)
+    store.close()
+
+
+def test_sqlite_merge_and_query(tmp_path):
+    store_dirs = [str(tmp_path / str(shard)) for shard in range(2)]
+    for shard, store_dir in enumerate(store_dirs):
+        write_findings(SqliteReportStore(store_dir, batch_size=7), range(shard * 50, shard * 50 + 50))
+    report_dir = str(tmp_path / "merged")
+    merge_report_stores(store_dirs, report_dir, "sqlite")
+    assert [report["test_number"] for report in read_reports(report_dir, "sqlite")] == list(range(100))
+    columns, rows = query_reports(
+        report_dir, filters={"status": "FAILED", "method": "post", "path": "/pets"}, group_by=["status_code"]
+    )
+    assert columns == ["status_code", "count", "max_latency"]
+    assert rows == [(500, 33, 0.097)]
+    _, rows = query_reports(report_dir, filters={"status_code": 400}, min_latency=0.05, limit=2)
+    assert [row[0] for row in rows] == [51, 54]
+
+
+def test_sqlite_triage_query_uses_index(tmp_path):
+    write_findings(SqliteReportStore(str(tmp_path)), range(10))
+    connection = sqlite3.connect(os.path.join(str(tmp_path), SqliteReportStore.DATABASE_FILE))
+    plan = connection.execute(
+        "EXPLAIN QUERY PLAN SELECT status_code, COUNT(*) FROM reports "
+        "WHERE status = ? AND method = ? AND path = ? GROUP BY status_code",
+        ("failed", "POST", "/pets"),
+    ).fetchall()
+    connection.close()
+    assert "COVERING INDEX reports_triage" in str(plan)
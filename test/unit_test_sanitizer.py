@@ -0,0 +1,46 @@
+from hypothesis import given, settings, strategies as st
+
+from apifuzzer.fuzzer_target.request_base_functions import FuzzerTargetBase
+from apifuzzer.fuzzer_target.sanitizer import URL_SANITIZER, HEADER_SANITIZER
+from test.legacy_implementations import LegacyChopping
+
+# mostly ASCII, with the characters pycurl rejects
+fuzz_text = st.text(
+    alphabet=st.one_of(
+        st.characters(min_codepoint=0x20, max_codepoint=0x7e),
+        st.sampled_from(["\x00", "\x7f", "\x80", "é", "中", "\U0001f600", "\ud800", "/", "?", "&"]),
+    ),
+    max_size=40,
+)
+
+
+def test_sanitize():
+    assert URL_SANITIZER.sanitize("abc") == "abc"
+    assert URL_SANITIZER.sanitize("ab\x00cd") == "cd"
+    assert URL_SANITIZER.sanitize("abé") == "ab"
+    assert URL_SANITIZER.sanitize("éaéb") == "b"
+    assert URL_SANITIZER.sanitize("é") == ""
+    assert HEADER_SANITIZER.sanitize("abé") == "abé"
+    assert HEADER_SANITIZER.sanitize("ab\x00") == "ab"
+
+
+@settings(max_examples=300, deadline=None)
+@given(url=st.lists(fuzz_text, max_size=4).map("/".join))
+def test_url_parity(url):
+    url = "http://127.0.0.1:5000/" + url
+    assert FuzzerTargetBase(auth_headers={}).format_pycurl_url(url) == LegacyChopping().format_pycurl_url(url)
+
+
+@settings(max_examples=300, deadline=None)
+@given(url=fuzz_text, query_params=st.dictionaries(fuzz_text, fuzz_text, max_size=4))
+def test_query_param_parity(url, query_params):
+    url = "http://127.0.0.1:5000/" + url
+    assert FuzzerTargetBase(auth_headers={}).format_pycurl_query_param(url, query_params) == \
+        LegacyChopping().format_pycurl_query_param(url, query_params)
+
+
+@settings(max_examples=300, deadline=None)
+@given(headers=st.dictionaries(fuzz_text.filter(lambda k: "\ud800" not in k), fuzz_text, max_size=4))
+def test_header_parity(headers):
+    assert FuzzerTargetBase(auth_headers={}).format_pycurl_header(headers) == \
+        LegacyChopping().format_pycurl_header(headers)
@@ -0,0 +1,70 @@
+import os
+from random import Random
+
+from apifuzzer.base_template import BaseTemplate
+from apifuzzer.custom_fuzzers import RandomBitsField, Utf8Chars
+from apifuzzer.openapi_template_generator import OpenAPITemplateGenerator
+from apifuzzer.utils import secure_randint
+
+TEST_API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_api")
+
+
+def mutations(field, count=10):
+    values = list()
+    for _ in range(count):
+        assert field.mutate()
+        values.append(field.render())
+    return values
+
+
+def templates(seed, api_definition="openapi_v2.json"):
+    template_generator = OpenAPITemplateGenerator(
+        api_definition_url=None, api_definition_file=os.path.join(TEST_API_DIR, api_definition), seed=seed
+    )
+    template_generator.process_api_resources()
+    return [template.to_dict() for template in template_generator.templates]
+
+
+def test_secure_randint_with_seeded_generator():
+    rand, expected = Random(42), Random(42)
+    assert [secure_randint(0, 10, rand) for _ in range(20)] == [expected.randrange(0, 10) for _ in range(20)]
+    assert 0 <= secure_randint(0, 10) < 10
+
+
+def test_templates_depend_on_the_seed_only():
+    for api_definition in "openapi_v2.json", "openapi_v3.json":
+        assert templates(7, api_definition) == templates(7, api_definition)
+    fields = [
+        field
+        for template in templates(7, "openapi_v3.json")
+        for place_fields in template["fields"].values()
+        for field in place_fields
+    ]
+    assert [field["seed"] for field in fields if field["type"] == "RandomBitsField"]
+    assert not [field for field in fields if field["type"] == "UnicodeStrings" and "seed" in field]
+
+
+def test_seeded_utf8_chars_repeats_the_mutations_after_reset():
+    field = Utf8Chars("abc", "field", min_length=1, max_length=20, seed=5)
+    first = mutations(field)
+    field.reset()
+    assert mutations(field) == first
+    assert mutations(Utf8Chars("abc", "other", min_length=1, max_length=20, seed=5)) == first
+    assert mutations(Utf8Chars("abc", "other", min_length=1, max_length=20, seed=6)) != first
+
+
+def test_seeded_random_bits_field():
+    assert mutations(RandomBitsField("x" * 32, "field", seed=5)) == mutations(RandomBitsField("x" * 32, "b", seed=5))
+    assert mutations(RandomBitsField("x" * 32, "field", seed=5)) != mutations(RandomBitsField("x" * 32, "field"))
+
+
+def test_template_description_keeps_the_seeds():
+    template = BaseTemplate("template")
+    template.url = "/test"
+    template.method = "GET"
+    template.params.add(Utf8Chars("abc", "utf8", seed=1))
+    template.params.add(RandomBitsField("abc", "bits", seed=2))
+    template.params.add(RandomBitsField("abc", "unseeded"))
+    description = template.to_dict()
+    assert [field.get("seed") for field in description["fields"]["params"]] == [2, None, 1]
+    assert BaseTemplate.from_dict(description).to_dict() == description
@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+
+from apifuzzer.openapi_template_generator import OpenAPITemplateGenerator
+from apifuzzer.spec_cache import SpecCache
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Cached API", "version": "1.0.0"},
+    "paths": {
+        "/items": {
+            "post": {
+                "requestBody": {"content": {"application/json": {"schema": {"$ref": "item.json#/Item"}}}},
+                "responses": {"200": {"description": "OK"}},
+            }
+        }
+    },
+}
+
+
+def write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def write_item(path, properties):
+    write_json(path, {"Item": {"type": "object", "properties": properties}})
+
+
+@pytest.fixture
+def spec_file(tmp_path):
+    write_item(str(tmp_path / "item.json"), {"name": {"type": "string"}})
+    spec_file = str(tmp_path / "openapi.json")
+    write_json(spec_file, SPEC)
+    return spec_file
+
+
+def generate(spec_file, cache_dir, calls):
+    class CountingGenerator(OpenAPITemplateGenerator):
+        def resolve_api_definition(self):
+            calls.append(self.api_definition_reference)
+            return super().resolve_api_definition()
+
+    return CountingGenerator(api_definition_url=None, api_definition_file=spec_file, spec_cache=SpecCache(cache_dir))
+
+
+def body_properties(template_generator):
+    content = template_generator.api_resources["paths"]["/items"]["post"]["requestBody"]["content"]
+    return sorted(content["application/json"]["properties"])
+
+
+def test_unchanged_definition_loaded_from_cache(spec_file, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    calls = list()
+    resolved = generate(spec_file, cache_dir, calls).api_resources
+    assert len(calls) == 1
+    assert len(os.listdir(cache_dir)) == 1
+    assert generate(spec_file, cache_dir, calls).api_resources == resolved
+    assert len(calls) == 1
+
+
+def test_changed_reference_resolved_again(spec_file, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    calls = list()
+    assert body_properties(generate(spec_file, cache_dir, calls)) == ["name"]
+    write_item(str(tmp_path / "item.json"), {"name": {"type": "string"}, "price": {"type": "number"}})
+    assert body_properties(generate(spec_file, cache_dir, calls)) == ["name", "price"]
+    assert body_properties(generate(spec_file, cache_dir, calls)) == ["name", "price"]
+    assert len(calls) == 2
+
+
+def test_changed_definition_resolved_again(spec_file, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    calls = list()
+    generate(spec_file, cache_dir, calls)
+    write_json(spec_file, dict(SPEC, info={"title": "Changed API", "version": "1.0.1"}))
+    assert generate(spec_file, cache_dir, calls).api_resources["info"]["title"] == "Changed API"
+    assert len(calls) == 2
+
+
+def test_broken_cache_file(spec_file, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    calls = list()
+    resolved = generate(spec_file, cache_dir, calls).api_resources
+    cache_file = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+    with open(cache_file, "wb") as f:
+        f.write(b"broken")
+    assert generate(spec_file, cache_dir, calls).api_resources == resolved
+    assert generate(spec_file, cache_dir, calls).api_resources == resolved
+    assert len(calls) == 2
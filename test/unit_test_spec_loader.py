@@ -0,0 +1,73 @@
+import json
+import os
+
+import pytest
+import yaml
+
+from apifuzzer import spec_loader
+from apifuzzer.exceptions import FailedToParseFileException
+from apifuzzer.fuzz_utils import get_api_definition_from_file
+from apifuzzer.openapi_template_generator import OpenAPITemplateGenerator
+from apifuzzer.spec_loader import parse_api_definition
+
+TEST_API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_api")
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b'{"openapi": "3.0.0", "paths": {"/a": [1, 2]}}',
+        b'\n  {"openapi": "3.0.0", "paths": {"/a": [1, 2]}}',
+        b'\xef\xbb\xbf{"openapi": "3.0.0", "paths": {"/a": [1, 2]}}',
+        b"openapi: 3.0.0\npaths:\n  /a:\n  - 1\n  - 2\n",
+        b"---\nopenapi: 3.0.0\npaths: {/a: [1, 2]}\n",
+        b"{openapi: 3.0.0, paths: {/a: [1, 2]}}",
+    ],
+)
+def test_parse_api_definition(content):
+    assert parse_api_definition(content) == {"openapi": "3.0.0", "paths": {"/a": [1, 2]}}
+
+
+def test_yaml_definition_resolved_like_json(tmp_path):
+    json_file = os.path.join(TEST_API_DIR, "openapi_v3.json")
+    yaml_file = str(tmp_path / "openapi_v3.yaml")
+    with open(json_file) as f, open(yaml_file, "w") as yaml_f:
+        yaml.safe_dump(json.load(f), yaml_f)
+    json_resources = OpenAPITemplateGenerator(api_definition_url=None, api_definition_file=json_file).api_resources
+    yaml_resources = OpenAPITemplateGenerator(api_definition_url=None, api_definition_file=yaml_file).api_resources
+    assert yaml_resources == json_resources
+
+
+def test_documents_parsed_once(tmp_path, monkeypatch):
+    spec_file = str(tmp_path / "openapi.yaml")
+    with open(tmp_path / "item.yaml", "w") as f:
+        f.write("Item:\n  type: object\n  properties:\n    name:\n      type: string\n")
+    with open(spec_file, "w") as f:
+        f.write(
+            "openapi: 3.0.0\npaths:\n  /items:\n    post:\n      requestBody:\n        content:\n"
+            "          application/json:\n            schema:\n              $ref: 'item.yaml#/Item'\n"
+            "          application/xml:\n            schema:\n              $ref: 'item.yaml#/Item'\n"
+        )
+    parsed = list()
+
+    def counting_parse(content):
+        parsed.append(content)
+        return parse_api_definition(content)
+
+    monkeypatch.setattr(spec_loader, "parse_api_definition", counting_parse)
+    resources = OpenAPITemplateGenerator(api_definition_url=None, api_definition_file=spec_file).api_resources
+    assert resources["paths"]["/items"]["post"]["requestBody"]["content"]["application/xml"]["properties"] == {
+        "name": {"type": "string"}
+    }
+    assert len(parsed) == 2
+
+
+def test_get_api_definition_from_file(tmp_path):
+    spec_file = str(tmp_path / "openapi.yaml")
+    with open(spec_file, "w") as f:
+        f.write("openapi: 3.0.0\n")
+    assert get_api_definition_from_file(spec_file) == {"openapi": "3.0.0"}
+    with open(spec_file, "w") as f:
+        f.write("openapi: [3.0.0\n")
+    with pytest.raises(FailedToParseFileException):
+        get_api_definition_from_file(spec_file, logger=lambda message: None)
@@ -0,0 +1,52 @@
+import json
+
+from apifuzzer.openapi_template_generator import OpenAPITemplateGenerator
+from benchmark.spec_generator import generate_spec
+
+
+def generate_templates(tmp_path, operations):
+    spec_file = str(tmp_path / "openapi.json")
+    with open(spec_file, "w") as f:
+        json.dump(generate_spec(operations), f)
+    template_generator = OpenAPITemplateGenerator(api_definition_url=None, api_definition_file=spec_file)
+    template_generator.process_api_resources()
+    return template_generator.templates
+
+
+def field_names(template):
+    return sorted(
+        field.get_name().split("|")[-1] for place, fields in template.field_to_param.items()
+        if place != "content_type" for field in fields
+    )
+
+
+def test_request_body_templates_have_own_fields(tmp_path):
+    templates = {template.name: template for template in generate_templates(tmp_path, 8)}
+    assert len(templates) == 16
+    for resource_index in range(2):
+        resource = f"resource_{resource_index}+{{id}}"
+        for method_index, method in enumerate(("post", "put")):
+            operation_index = resource_index * 4 + method_index + 1
+            json_template = templates[f"{resource}|{method}-json"]
+            assert json_template.url == resource
+            assert json_template.method == method.upper()
+            assert json_template.content_type == "application/json"
+            assert field_names(json_template) == ["id", "name", "price", "tags"]
+            form_template = templates[f"{resource}|{method}-form-data"]
+            assert form_template.content_type == "multipart/form-data"
+            assert field_names(form_template) == ["description", f"file_{operation_index}"]
+            assert field_names(templates[f"{resource}|{method}"]) == ["id"]
+
+
+def test_templates_in_definition_order(tmp_path):
+    names = [template.name for template in generate_templates(tmp_path, 4)]
+    assert names == [
+        "resource_0+{id}|post-json",
+        "resource_0+{id}|post-form-data",
+        "resource_0+{id}|put-json",
+        "resource_0+{id}|put-form-data",
+        "resource_0+{id}|get",
+        "resource_0+{id}|post",
+        "resource_0+{id}|put",
+        "resource_0+{id}|delete",
+    ]
@@ -0,0 +1,28 @@
+from benchmark.throughput import compare, measure_case, METRICS
+from benchmark.utils import stub_test_application
+
+
+def results(**metrics):
+    case = {"tests_per_s": 100.0, "prepare_s": 1.0, "peak_rss_mb": 50.0, "report_bytes": 1000}
+    case.update(metrics)
+    return {"cases": {"case": case}}
+
+
+def test_compare_with_baseline():
+    baseline = results()
+    assert compare(results(tests_per_s=85.0, prepare_s=1.1, peak_rss_mb=40.0), baseline, threshold=0.2) == []
+    regressions = compare(results(tests_per_s=70.0, report_bytes=1500), baseline, threshold=0.2)
+    assert regressions == [
+        "case tests_per_s: 70.000 vs baseline 100.000 (-30.0%)",
+        "case report_bytes: 1500.000 vs baseline 1000.000 (+50.0%)",
+    ]
+    # new cases and metrics missing from the baseline are not compared
+    assert compare(results(), {"cases": {"case": dict(results()["cases"]["case"], prepare_s=0)}}) == []
+    assert compare(results(), {"cases": {}}) == []
+
+
+def test_measure_case_against_stub_target():
+    with stub_test_application() as url:
+        result = measure_case("openapi_v2-stub", url, repeat=1)
+    assert result["tests"] == 819
+    assert all(result[metric] > 0 for metric in METRICS)